@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexIfPostgres
+from apps.common.search import build_search_document
+
+
+def fill_search_document(apps, schema_editor):
+    ContractsModel = apps.get_model('app_contracts', 'ContractsModel')
+    contracts = list(ContractsModel.objects.select_related('customer', 'po', 'quotation', 'invoice'))
+    for contract in contracts:
+        contract.search_document = build_search_document(
+            contract.contract_id,
+            contract.po.po_id,
+            contract.quotation.quotation_id,
+            contract.invoice.invoice_id,
+            contract.customer.customer_id,
+            contract.customer.company_name,
+            contract.customer.contact_person_name,
+        )
+    ContractsModel.objects.bulk_update(contracts, ['search_document'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_contracts', '0004_search_indexes'),
+        ('app_customers', '0002_search_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0002_search_indexes'),
+        ('app_po', '0002_search_indexes'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractsmodel',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        AddIndexIfPostgres(
+            model_name='contractsmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('search_document', output_field=models.TextField())), name='gin_trgm_ops'), name='contract_search_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='contractsmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('search_document', config='simple'), name='contract_search_vector'),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+    ]
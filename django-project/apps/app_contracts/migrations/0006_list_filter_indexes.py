@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_contracts', '0005_search_document'),
+        ('app_customers', '0003_list_filter_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0003_search_document'),
+        ('app_po', '0003_search_document'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contractsmodel',
+            index=models.Index(fields=['-end_contract', '-contract_id'], name='contract_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractsmodel',
+            index=models.Index(fields=['status', '-end_contract', '-contract_id'], name='contract_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractsmodel',
+            index=models.Index(fields=['status', 'start_contract'], name='contract_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractsmodel',
+            index=models.Index(fields=['start_contract'], name='contract_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractsmodel',
+            index=models.Index(condition=models.Q(('status', 'Active')), fields=['end_contract'], name='contract_active_end_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # coding=utf-8
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 # Import external models
@@ -8,6 +9,7 @@ from apps.app_employee.models import EmployeesModel
 from apps.app_quotations.models import QuotationInformationModel
 from apps.app_invoices.models import InvoiceModel
 from apps.app_po.models import PurchaseOrderModel, ApprovedPOModel
+from apps.common.search import trigram_index, search_vector_index, build_search_document
 
 # Generate Contract Number
 class GenerateContractNumber(models.Model):
@@ -72,13 +74,37 @@ class ContractsModel(models.Model):
         null=True,
         verbose_name='ເອກະສານສັນຍາ'
     )
+    # Denormalized search box text (own, customer and related document IDs), kept current by signals
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     class Meta:
         verbose_name = 'ຈັດການສັນຍາ'
         verbose_name_plural = 'ຈັດການສັນຍາ'
+        indexes = [
+            trigram_index('search_document', name='contract_search_trgm'),
+            search_vector_index('search_document', name='contract_search_vector'),
+            # list page: default order, status filter, status + start_contract range
+            models.Index(fields=['-end_contract', '-contract_id'], name='contract_end_idx'),
+            models.Index(fields=['status', '-end_contract', '-contract_id'], name='contract_status_end_idx'),
+            models.Index(fields=['status', 'start_contract'], name='contract_status_start_idx'),
+            models.Index(fields=['start_contract'], name='contract_start_idx'),
+            # active contracts by expiry date
+            models.Index(fields=['end_contract'], condition=Q(status='Active'), name='contract_active_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.contract_id} - ລູກຄ້າ  {self.customer.company_name}"
+
+    def build_search_document(self):
+        return build_search_document(
+            self.contract_id,
+            self.po.po_id,
+            self.quotation.quotation_id,
+            self.invoice.invoice_id,
+            self.customer.customer_id,
+            self.customer.company_name,
+            self.customer.contact_person_name,
+        )
     
     # def save(self, *args, **kwargs):
     #     today = timezone.now().date()
@@ -1,21 +1,35 @@
-from .models import ContractsModel, GenerateContractNumber
+from .models import ContractsModel
+from apps.app_customers.models import CustomersModel
+from apps.common.search import refresh_search_documents
+from apps.common.facets import track_status_counts
+from apps.common.numbering import next_number
 from django.dispatch import receiver
 from django.db.models.signals import pre_save, post_save, post_delete
-from django.db import transaction
 from django.utils import timezone
 
-# Text Prefix
-PREFIX = 'TVS-CON'
+# Cached per-status counts for the filter bar
+track_status_counts(ContractsModel)
 
 # Auto Generate Contract Number
 @receiver(pre_save, sender=ContractsModel)
 def contract_id_generator(sender, instance, **kwargs):
     if not instance.contract_id:
-        with transaction.atomic():
-            generator, created = GenerateContractNumber.objects.select_for_update().get_or_create(pk=1)
-            generator.auto_generate_number += 1
-            generator.save()
-            instance.contract_id = f"{PREFIX}{generator.auto_generate_number:07d}"
+        instance.contract_id = next_number('contract')
+
+# Search document, after contract_id is generated
+@receiver(pre_save, sender=ContractsModel)
+def update_contract_search_document(sender, instance, update_fields=None, **kwargs):
+    # partial saves (e.g. totals) do not touch the searched fields
+    if update_fields is None or 'search_document' in update_fields:
+        instance.search_document = instance.build_search_document()
+
+# Customer renamed, refresh the contracts that show the customer name
+@receiver(post_save, sender=CustomersModel)
+def refresh_contract_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(
+            ContractsModel.objects.filter(customer=instance).select_related('customer', 'po', 'quotation', 'invoice')
+        )
 
 # Notification
 @receiver([post_save, post_delete], sender=ContractsModel)
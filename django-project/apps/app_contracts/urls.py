@@ -19,7 +19,9 @@ urlpatterns = [
     path('', views.ContractsListView.as_view(), name='home'),
     path('delete_contract/<str:contract_id>/', views.ContractDeleteView.as_view(), name='delete'),
     path('contract_details/<str:contract_id>/', views.ContractDetailsView.as_view(), name='contract_details'),
-    path('contract_details/update_contract/<str:contract_id>/', views.UpdateContractView.as_view(), name='update_contract')
+    path('contract_details/update_contract/<str:contract_id>/', views.UpdateContractView.as_view(), name='update_contract'),
+    path('contract_details/deal_pack/<str:contract_id>/', views.GenerateDealPackPDF.as_view(), name='deal_pack_pdf'),
+    path('contract_details/docx/<str:contract_id>/', views.GenerateContractDocx.as_view(), name='contract_docx'),
 ]
 
 # when user go to path /app_name/ it will show api root page (endpoints list)
@@ -33,29 +33,33 @@ from apps.app_employee.models import EmployeesModel
 from apps.app_quotations.models import QuotationInformationModel
 from apps.app_invoices.models import InvoiceModel
 from apps.app_po.models import PurchaseOrderModel
+from apps.common.pagination import KeysetPaginationMixin
+from apps.common.search import search_documents, order_by_rank
+from apps.common.facets import status_choices_with_counts
+from apps.common.bundles import DocumentBundleMixin
+from apps.common.conditional import ConditionalPageMixin
+from apps.common.views import DealPackPdfMixin, DocumentDocxMixin
 
 
 logger = logging.getLogger(__name__)
 
 # Home View 
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class ContractsListView(LoginRequiredMixin, ListView):
+class ContractsListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     login_url = 'users:login'
     model = ContractsModel
     template_name = 'app_contracts/home.html'
     context_object_name = 'all_contracts'
+    # search_document already holds the IDs and customer names, no join needed
+    search_fields = ('search_document',)
+    search_vector_fields = ('search_document',)
 
     def get_queryset(self):
         queryset = super().get_queryset()
         # search function 
         search = self.request.GET.get('search', '')
         if search:
-            queryset = queryset.filter(
-                Q(contract_id__icontains = search ) |
-                Q(customer__company_name__icontains = search) |
-                Q(customer__contact_person_name__icontains = search) |
-                Q(po__po_id__icontains = search)
-            )
+            queryset = search_documents(queryset, search, self.search_fields, self.search_vector_fields)
 
         # Order by status 
         status = self.request.GET.get('status', '')
@@ -73,15 +77,15 @@ class ContractsListView(LoginRequiredMixin, ListView):
         elif end_contract:
             queryset = queryset.filter(start_contract__lte = end_contract)
         
-        # Default order by
-        queryset = queryset.order_by('-end_contract')
+        # Default order by, best search matches first
+        queryset = order_by_rank(queryset, '-end_contract')
         return queryset
     
     def get_context_data(self, **kwargs):
         context =  super().get_context_data(**kwargs)
         context['title'] = 'ລາຍການສັນຍາທັ່ງຫມົດ'
         context['search'] = self.request.GET.get('search', '')
-        context['status_list'] = ContractsModel.ContractStatus.choices
+        context['status_list'] = status_choices_with_counts(ContractsModel)
         return context
         
 
@@ -227,13 +231,14 @@ class ContractsCreateView(LoginRequiredMixin, View):
     
 # View Contract Details
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class ContractDetailsView(LoginRequiredMixin, DetailView):
+class ContractDetailsView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     template_name = 'app_contracts/contract_details.html'
     model = ContractsModel
     context_object_name = 'all_contracts'
     slug_field = 'contract_id'
     slug_url_kwarg = 'contract_id'
+    bundle_kind = 'contract'
 
 
 # Update Contract View
@@ -327,4 +332,22 @@ class ContractDeleteView(LoginRequiredMixin, DeleteView):
         context = super().get_context_data(**kwargs)
         context['title'] = f"ລຶບສັນຍາ {self.kwargs.get('contract_id')}"
 
-        return context
\ No newline at end of file
+        return context
+
+
+# Quotation, invoice and PO of the contract in one PDF
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class GenerateDealPackPDF(LoginRequiredMixin, DealPackPdfMixin, View):
+    login_url = 'users:login'
+    bundle_kind = 'contract'
+    pdf_url_kwarg = 'contract_id'
+
+
+# Editable Word version of the contract, for the legal team
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class GenerateContractDocx(LoginRequiredMixin, DocumentDocxMixin, View):
+    login_url = 'users:login'
+    bundle_kind = 'contract'
+    docx_url_kwarg = 'contract_id'
+    docx_template = 'app_contracts/docx/contract.docx'
+    docx_filename = 'contract_{id}.docx'
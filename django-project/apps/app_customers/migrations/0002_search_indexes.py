@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexIfPostgres
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexIfPostgres(
+            model_name='customersmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('customer_id', output_field=models.TextField())), name='gin_trgm_ops'), name='customer_id_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='customersmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('company_name', output_field=models.TextField())), name='gin_trgm_ops'), name='customer_company_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='customersmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('contact_person_name', output_field=models.TextField())), name='gin_trgm_ops'), name='customer_contact_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='customersmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('company_name', 'contact_person_name', config='simple'), name='customer_search_vector'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customersmodel',
+            index=models.Index(fields=['-create_at', '-id'], name='customer_create_idx'),
+        ),
+    ]
@@ -5,9 +5,8 @@ from django.dispatch import receiver
 
 # Models
 from apps.users.models import User
-
-# PREFIX
-PREFIX = 'CUS_ID'
+from apps.common.search import trigram_index, search_vector_index
+from apps.common.numbering import next_number
 
 
 class CustomersIdGenerator(models.Model):
@@ -40,6 +39,15 @@ class CustomersModel(models.Model):
         verbose_name = 'ຂໍ້ມູນກ່ຽວກັບລູກຄ້າ'
         verbose_name_plural = 'ຂໍ້ມູນກ່ຽວກັບລູກຄ້າ'
         ordering = ('-create_at',)
+        # search box indexes (PostgreSQL only), see apps.common.search
+        indexes = [
+            trigram_index('customer_id', name='customer_id_trgm'),
+            trigram_index('company_name', name='customer_company_trgm'),
+            trigram_index('contact_person_name', name='customer_contact_trgm'),
+            search_vector_index('company_name', 'contact_person_name', name='customer_search_vector'),
+            # list page order
+            models.Index(fields=['-create_at', '-id'], name='customer_create_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer_id} -ບໍລິສັດ {self.company_name} -ຜູ້ຕິດຕໍ່ {self.contact_person_name}"
@@ -48,8 +56,4 @@ class CustomersModel(models.Model):
 @receiver(pre_save, sender=CustomersModel)
 def customer_id_generator(sender, instance, **kwargs):
     if instance._state.adding and not instance.customer_id:
-        with transaction.atomic():
-            generator, created = CustomersIdGenerator.objects.select_for_update().get_or_create(id=1)
-            generator.customer_running_number += 1
-            generator.save()
-            instance.customer_id = f"{PREFIX}{generator.customer_running_number:05d}"
+        instance.customer_id = next_number('customer')
@@ -12,26 +12,26 @@ from django.shortcuts import get_object_or_404
 # Import Forms and Models
 from .forms import CustomersModelForm
 from .models import CustomersModel
+from apps.common.pagination import KeysetPaginationMixin
+from apps.common.search import search_documents, order_by_rank
 
 
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class HomeView(LoginRequiredMixin, ListView):
+class HomeView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     login_url = 'users:login' #Set url for Login Request
     model = CustomersModel
     template_name = 'app_customers/home.html'
     context_object_name = 'customers'
+    search_fields = ('customer_id', 'company_name', 'contact_person_name')
+    search_vector_fields = ('company_name', 'contact_person_name')
 
     #Search / Filter Functionz
     def get_queryset(self):
         queryset = super().get_queryset()
         search = self.request.GET.get('search', '')
         if search:
-            queryset = queryset.filter(
-                customer_id__icontains=search
-            ) | queryset.filter(
-                company_name__icontains=search
-            )
-        return queryset
+            queryset = search_documents(queryset, search, self.search_fields, self.search_vector_fields)
+        return order_by_rank(queryset, *CustomersModel._meta.ordering)
 
     #Sender the Searched term to template
     def get_context_data(self, **kwargs):
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexIfPostgres
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_employee', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexIfPostgres(
+            model_name='employeesmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('employee_name', output_field=models.TextField())), name='gin_trgm_ops'), name='employee_name_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='employeesmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('employee_lastname', output_field=models.TextField())), name='gin_trgm_ops'), name='employee_lastname_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='employeesmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('department', output_field=models.TextField())), name='gin_trgm_ops'), name='employee_department_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='employeesmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('employee_name', 'employee_lastname', 'department', config='simple'), name='employee_search_vector'),
+        ),
+    ]
@@ -5,6 +5,7 @@ import uuid
 
 ##################### Import Model
 from apps.users.models import User
+from apps.common.search import trigram_index, search_vector_index
 
 
 class EmployeesModel(models.Model):
@@ -20,6 +21,13 @@ class EmployeesModel(models.Model):
         verbose_name = 'ຂໍ້ມູນພະນັກງານ'
         verbose_name_plural = 'ຂໍ້ມູນພະນັກງານ'
         ordering = ('employee_id',)
+        # search box indexes (PostgreSQL only), see apps.common.search
+        indexes = [
+            trigram_index('employee_name', name='employee_name_trgm'),
+            trigram_index('employee_lastname', name='employee_lastname_trgm'),
+            trigram_index('department', name='employee_department_trgm'),
+            search_vector_index('employee_name', 'employee_lastname', 'department', name='employee_search_vector'),
+        ]
 
     def __str__(self):
         return f"{self.employee_name.capitalize()} {self.employee_lastname.upper()}, ພະແນກ: {self.department}"
@@ -22,10 +22,12 @@ from django_ratelimit.decorators import ratelimit
 #Import forms and models
 from .forms import EmployeesModelForm
 from .models import EmployeesModel
+from apps.common.pagination import KeysetPaginationMixin
+from apps.common.search import search_documents, order_by_rank
 
 
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class HomeView(LoginRequiredMixin, ListView):
+class HomeView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     CBV for listing all employee.
     """
@@ -33,19 +35,15 @@ class HomeView(LoginRequiredMixin, ListView):
     model = EmployeesModel
     template_name = 'app_employee/home.html'
     context_object_name = 'all_employee'
+    search_fields = ('employee_name', 'employee_lastname', 'department')
+    search_vector_fields = ('employee_name', 'employee_lastname', 'department')
 
     def get_queryset(self):
         queryset = super().get_queryset()
         search = self.request.GET.get('search', '')
         if search:
-            queryset = queryset.filter(
-                employee_name__icontains = search
-            ) | queryset.filter(
-                employee_lastname__icontains = search
-            ) | queryset.filter(
-                department__icontains = search
-            )
-        return queryset
+            queryset = search_documents(queryset, search, self.search_fields, self.search_vector_fields)
+        return order_by_rank(queryset, *EmployeesModel._meta.ordering)
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search'] = self.request.GET.get('search', '')
@@ -1,6 +1,7 @@
 # coding=utf-8
 from django.contrib import admin
 from apps.app_employee.models import EmployeesModel
+from apps.common.pdf_archive import rerender_archived_pdfs
 from .models import InvoiceModel
 
 @admin.register(InvoiceModel)
@@ -8,6 +9,7 @@ class InvoiceModelAdmin(admin.ModelAdmin):
     list_display = ['invoice_id', 'quotation__customer__company_name', 'issue_date', 'due_date', 'status', 'created_by']
     list_filter = ['issue_date', 'due_date', 'status']
     readonly_fields = ['invoice_id',]
+    actions = [rerender_archived_pdfs('invoice', 'invoice_id')]
 
     def save_model(self, request, obj, form, change):
         try:
@@ -6,4 +6,11 @@ class AppInvoicesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = 'apps.app_invoices'
     verbose_name = 'ແອັບຈັດການໃບເກັບເງິນ'
-    label = 'app_invoices'
\ No newline at end of file
+    label = 'app_invoices'
+
+    def ready(self):
+        import apps.app_invoices.signals
+        # PDF views known to the archive re-render action and the warm-up (apps.common.pdf_archive)
+        from apps.common.pdf_archive import register_pdf_views
+        from .views import GenerateInvoicePDF, GenerateInvoicePDFNoSig
+        register_pdf_views(GenerateInvoicePDF, GenerateInvoicePDFNoSig)
@@ -17,4 +17,11 @@ class InvoiceModelForm(forms.ModelForm):
                 field.widget = forms.DateInput(attrs={
                     'class':'form-control w3-input w3-border w3-round-large w3-margin-bottom',
                     'type':'date'
-                })
\ No newline at end of file
+                })
+
+class InvoiceListFilterForm(forms.Form):
+    """GET filters of the invoice list page, also used by the bulk PDF export"""
+    search = forms.CharField(required=False)
+    status = forms.CharField(required=False)
+    start_date = forms.DateField(required=False)
+    end_date = forms.DateField(required=False)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexIfPostgres
+from apps.common.search import build_search_document
+
+
+def fill_search_document(apps, schema_editor):
+    InvoiceModel = apps.get_model('app_invoices', 'InvoiceModel')
+    invoices = list(InvoiceModel.objects.select_related('quotation__customer'))
+    for invoice in invoices:
+        customer = invoice.quotation.customer
+        invoice.search_document = build_search_document(
+            invoice.invoice_id,
+            invoice.quotation.quotation_id,
+            customer.customer_id,
+            customer.company_name,
+            customer.contact_person_name,
+        )
+    InvoiceModel.objects.bulk_update(invoices, ['search_document'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0002_search_indexes'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoicemodel',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        AddIndexIfPostgres(
+            model_name='invoicemodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('search_document', output_field=models.TextField())), name='gin_trgm_ops'), name='invoice_search_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='invoicemodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('search_document', config='simple'), name='invoice_search_vector'),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0003_search_document'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['-issue_date', '-id'], name='invoice_issue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(fields=['status', '-issue_date', '-id'], name='invoice_status_issue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoicemodel',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'unpaid'])), fields=['due_date'], name='invoice_outstanding_due_idx'),
+        ),
+    ]
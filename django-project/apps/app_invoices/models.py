@@ -1,16 +1,38 @@
 # coding=utf-8
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from decimal import Decimal
 from apps.app_quotations.models import QuotationInformationModel
 from apps.app_employee.models import EmployeesModel
 from apps.app_customers.models import CustomersModel
+from apps.common.search import trigram_index, search_vector_index, build_search_document, search_documents
 
 
 #Generate invoice number
 class GenerateInvoiceNumber(models.Model):
     auto_invoice_number = models.BigIntegerField(default=0)
 
+# Query plans of Invoice
+class InvoiceQuerySet(models.QuerySet):
+    def filter_list(self, search='', status='', start_date='', end_date=''):
+        """
+        Filters of the invoice list page (search box, status, issue_date range)
+        - shared by the list page and the bulk PDF export, so both see the same invoices
+        """
+        queryset = self
+        if search:
+            queryset = search_documents(queryset, search, ('search_document',), ('search_document',))
+        if status:
+            queryset = queryset.filter(status=status)
+        if start_date and end_date:
+            queryset = queryset.filter(issue_date__range=[start_date, end_date])
+        elif start_date:
+            queryset = queryset.filter(issue_date__gte=start_date)
+        elif end_date:
+            queryset = queryset.filter(issue_date__lte=end_date)
+        return queryset
+
 # Main Invoice Models
 class InvoiceModel(models.Model):
     class InvoiceStatus(models.TextChoices):
@@ -44,12 +66,39 @@ class InvoiceModel(models.Model):
     )
     invoice_signatured = models.FileField(upload_to='invoice_docs/', blank=True, null=True, verbose_name='ໃບເກັບເງິນທີ່ຮັບຮອງແລ້ວ ຫລື ໃບສັ່ງຊື້ຈາກລູກຄ້າ')
     customer_payment = models.FileField(upload_to='invoice_docs/', blank=True, null=True, verbose_name='ຫລັກຖານການຈ່າຍເງິນຂອງລູກຄ້າ')
+    # Denormalized search box text (own, customer and related document IDs), kept current by signals
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    objects = InvoiceQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'ການຈັດການ ໃບເກັບເງິນ'
         verbose_name_plural = 'ການຈັດການ ໃບເກັບເງິນ'
         ordering = ['-due_date']
+        indexes = [
+            trigram_index('search_document', name='invoice_search_trgm'),
+            search_vector_index('search_document', name='invoice_search_vector'),
+            # list page: default order and issue_date range, status filter (+ range)
+            models.Index(fields=['-issue_date', '-id'], name='invoice_issue_idx'),
+            models.Index(fields=['status', '-issue_date', '-id'], name='invoice_status_issue_idx'),
+            # outstanding invoices by due date, the only rows anyone chases
+            models.Index(
+                fields=['due_date'],
+                condition=Q(status__in=['pending', 'unpaid']),
+                name='invoice_outstanding_due_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.invoice_id} - ບໍລິສັດ {self.quotation.customer.company_name}"
+
+    def build_search_document(self):
+        customer = self.quotation.customer
+        return build_search_document(
+            self.invoice_id,
+            self.quotation.quotation_id,
+            customer.customer_id,
+            customer.company_name,
+            customer.contact_person_name,
+        )
     
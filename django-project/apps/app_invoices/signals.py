@@ -1,16 +1,33 @@
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.db import transaction
-from .models import InvoiceModel, GenerateInvoiceNumber
+from apps.app_customers.models import CustomersModel
+from apps.common.search import refresh_search_documents
+from apps.common.facets import track_status_counts
+from apps.common.numbering import next_number
+from .models import InvoiceModel
 
-PREFIX = 'INV'
+# Cached per-status counts for the filter bar
+track_status_counts(InvoiceModel)
 
 # Auto Generate Invoice Number
 @receiver(pre_save, sender=InvoiceModel)
 def generate_invoice_number(sender, instance, **kwargs):
     if not instance.invoice_id:
-        with transaction.atomic():
-            generator, created = GenerateInvoiceNumber.objects.select_for_update().get_or_create(pk=1)
-            generator.auto_invoice_number += 1
-            generator.save()
-            instance.invoice_id = f"{PREFIX}{generator.auto_invoice_number:07d}"
\ No newline at end of file
+        instance.invoice_id = next_number('invoice')
+
+
+# Search document, after the invoice number is generated
+@receiver(pre_save, sender=InvoiceModel)
+def update_invoice_search_document(sender, instance, update_fields=None, **kwargs):
+    # partial saves (e.g. totals) do not touch the searched fields
+    if update_fields is None or 'search_document' in update_fields:
+        instance.search_document = instance.build_search_document()
+
+
+# Customer renamed, refresh the invoices that show the customer name
+@receiver(post_save, sender=CustomersModel)
+def refresh_invoice_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(
+            InvoiceModel.objects.filter(quotation__customer=instance).select_related('quotation__customer')
+        )
@@ -1,4 +1,42 @@
 # coding=utf-8
+import datetime
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+
+from .views import export_filename, list_filters
+
+
+class InvoiceListFiltersTests(TestCase):
+    def test_invalid_dates_are_left_out(self):
+        filters = list_filters({'search': 'INV', 'start_date': 'abc', 'end_date': '2026-01-31'})
+        self.assertEqual(filters, {'search': 'INV', 'status': '', 'end_date': datetime.date(2026, 1, 31)})
+
+    def test_export_filename(self):
+        self.assertEqual(export_filename({}), 'invoices.zip')
+        self.assertEqual(
+            export_filename({'start_date': datetime.date(2026, 1, 1), 'end_date': datetime.date(2026, 1, 31)}),
+            'invoices_2026-01-01_2026-01-31.zip',
+        )
+        self.assertEqual(export_filename({'start_date': None, 'end_date': datetime.date(2026, 1, 31)}), 'invoices_2026-01-31.zip')
+
+
+class ExportInvoicePDFTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user(username='export', password='export'))
+
+    def test_invalid_date_is_a_bad_request(self):
+        response = self.client.get(reverse('app_invoices:export_invoice_pdf'), {'start_date': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_filename_from_the_dates(self):
+        response = self.client.get(
+            reverse('app_invoices:export_invoice_pdf'), {'start_date': '2026-01-01', 'end_date': '2026-01-31'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="invoices_2026-01-01_2026-01-31.zip"')
 
-# Create your tests here.
+    def test_list_page_ignores_an_invalid_date(self):
+        response = self.client.get(reverse('app_invoices:home'), {'start_date': 'abc'})
+        self.assertEqual(response.status_code, 200)
@@ -15,6 +15,7 @@ router = DefaultRouter()
 
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('export_pdf/', views.ExportInvoicePDF.as_view(), name='export_invoice_pdf'),
     path('<str:invoice_id>/', views.CreateInvoice.as_view(), name='create_invoice'),
     path('', views.InvoiceListView.as_view(), name='home'),
     path('delete_invoice/<str:invoice_id>/', views.DeleteInvoiceView.as_view(), name='delete_invoice'),
@@ -10,7 +10,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.staticfiles import finders
 from django.db.models import Q
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
@@ -21,16 +21,31 @@ from django_ratelimit.decorators import ratelimit
 from weasyprint import HTML
 from .signals import generate_invoice_number
 from .models import InvoiceModel
-from .forms import InvoiceModelForm
+from .forms import InvoiceModelForm, InvoiceListFilterForm
 from apps.app_quotations.models import QuotationInformationModel
 from apps.app_employee.models import EmployeesModel
+from apps.common.pagination import KeysetPaginationMixin
+from apps.common.search import search_documents, order_by_rank
+from apps.common.facets import status_choices_with_counts
+from apps.common.bundles import DocumentBundleMixin, load_document_bundle
+from apps.common.conditional import ConditionalPageMixin
+from apps.common.views import DocumentPdfMixin
+from apps.common.pdf_export import pdf_zip_response
 
 
 
+# GET parameters of the invoice list filters, see InvoiceQuerySet.filter_list
+# - values that do not validate (e.g. ?start_date=abc) are left out
+def list_filters(params):
+    form = InvoiceListFilterForm(params)
+    form.is_valid()
+    return form.cleaned_data
+
+
 # Class Base Views
 # Home
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class InvoiceListView(LoginRequiredMixin, ListView):
+class InvoiceListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     login_url = 'users:login'
     model = InvoiceModel
     template_name = 'app_invoices/home.html'
@@ -38,34 +53,11 @@ class InvoiceListView(LoginRequiredMixin, ListView):
 
     #Search / Filter Function
     def get_queryset(self):
-        queryset = super().get_queryset()
-        # Search 
-        search = self.request.GET.get('search', '')
-        if search:
-            queryset = queryset.filter(
-                Q(invoice_id__icontains=search) |
-                Q(quotation__customer__company_name__icontains=search) |
-                Q(quotation__customer__contact_person_name__icontains=search) |
-                Q(quotation__quotation_id__icontains=search)
-            )
-        # Order by Status
-        status = self.request.GET.get('status', '')
-        if status:
-            queryset = queryset.filter(status=status)
-
-        # Order by Monthly
-        start_date = self.request.GET.get('start_date', '')
-        end_date = self.request.GET.get('end_date', '')
-
-        if start_date and end_date:
-            queryset = queryset.filter(issue_date__range=[start_date, end_date])
-        elif start_date:
-            queryset = queryset.filter(issue_date__gte=start_date)
-        elif end_date:
-            queryset = queryset.filter(issue_date__lte=end_date)
-
-        # Default Order by
-        queryset = queryset.order_by('-issue_date')
+        # Search, status and issue_date range, shared with the bulk PDF export
+        queryset = super().get_queryset().filter_list(**list_filters(self.request.GET))
+
+        # Default Order by, best search matches first
+        queryset = order_by_rank(queryset, '-issue_date')
 
         # Return Queryset
         return queryset
@@ -74,7 +66,7 @@ class InvoiceListView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         context['search'] = self.request.GET.get('search', '')
         context['title'] = 'ລາຍການໃບເກັບເງິນທັງຫມົດ'
-        context['status_list'] = InvoiceModel.InvoiceStatus.choices
+        context['status_list'] = status_choices_with_counts(InvoiceModel)
         return context
 
 # Create and Update from app quotations 
@@ -173,41 +165,30 @@ class CreateInvoice(LoginRequiredMixin, View):
 
 # One Invoice Details View
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class InvoiceDetailsView(LoginRequiredMixin, DetailView):
+class InvoiceDetailsView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     model = InvoiceModel
     template_name = 'app_invoices/invoice_details.html'
     context_object_name = 'invoice'
     slug_field = 'invoice_id'
     slug_url_kwarg = 'invoice_id'
+    bundle_kind = 'invoice'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        invoice = self.object
-        quotation = invoice.quotation
-
-        # Related objects
-        items_qs = quotation.items.all()
-        additional_expenses_qs = quotation.additional_payments.all()
-        additional_expense = additional_expenses_qs.first() if additional_expenses_qs.exists() else None
-
-        # Calculate totals
-        total_price = quotation.total_all_products or 0
-        it_service_amount = additional_expense.it_service_output if additional_expense else 0
-        vat_amount = additional_expense.vat_output if additional_expense else 0
-        grand_total = additional_expense.grand_total if additional_expense else total_price
+        bundle = self.bundle
 
         # Update context
         context.update({
             'title': 'ລາຍລະອຽດຂອງໃບເກັບເງິນ',
-            'invoice': invoice,
-            'quotation': quotation,
-            'items': items_qs,
-            'additional_expense': additional_expense,
-            'total_price': total_price,
-            'it_service_amount': it_service_amount,
-            'vat_amount': vat_amount,
-            'grand_total': grand_total,
+            'invoice': bundle.invoice,
+            'quotation': bundle.quotation,
+            'items': bundle.items,
+            'additional_expense': bundle.additional_expense,
+            'total_price': bundle.total_price,
+            'it_service_amount': bundle.it_service_amount,
+            'vat_amount': bundle.vat_amount,
+            'grand_total': bundle.grand_total,
         })
         return context
 
@@ -275,22 +256,20 @@ class DeleteInvoiceView(LoginRequiredMixin, DeleteView):
     ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), 
     name='dispatch'
 )
-class OneInvoiceDetailsView(LoginRequiredMixin, DetailView):
+class OneInvoiceDetailsView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     model = InvoiceModel
     template_name = 'app_invoices/components/invoice_view_form.html'
     context_object_name = 'generate_invoice_form'
-
-    def get_object(self, queryset=None):
-        invoice_id = self.kwargs.get('invoice_id')
-        return get_object_or_404(InvoiceModel, invoice_id=invoice_id)
+    slug_url_kwarg = 'invoice_id'
+    bundle_kind = 'invoice'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'ໃບເກັບເງິນ'
         context['employee'] = getattr(self.request.user, 'employee', None)
-        context['quotation'] = self.object.quotation
-        context['additional_expense'] = self.object.quotation.additional_payments.first()
+        context['quotation'] = self.bundle.quotation
+        context['additional_expense'] = self.bundle.additional_expense
         return context
     
 
@@ -300,32 +279,20 @@ class OneInvoiceDetailsView(LoginRequiredMixin, DetailView):
     ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True),
     name='dispatch'
 )
-class GenerateInvoicePDF(LoginRequiredMixin, View):
+class GenerateInvoicePDF(LoginRequiredMixin, DocumentPdfMixin, View):
     login_url = 'users:login'
     template_name = 'app_invoices/components/invoice_generate_pdf_with_sig.html'
-
-    def get(self, request, *args, **kwargs):
-        # Get Invoice Object
-        invoice_id = kwargs.get('invoice_id')
-        invoice = get_object_or_404(InvoiceModel, invoice_id=invoice_id)
-
-        # Get Context
-        context = {
-            'generate_invoice_form':invoice,
-            'employee':getattr(request.user, 'employee', None),
+    bundle_kind = 'invoice'
+    pdf_url_kwarg = 'invoice_id'
+    pdf_filename = 'invoice_{id}.pdf'
+    pdf_stylesheets = ('app_invoices/css/pdf_generator.css',)
+
+    def get_pdf_context(self, bundle):
+        return {
+            'generate_invoice_form':bundle.invoice,
+            'bundle': bundle,
             'STATIC_ROOT':settings.STATIC_ROOT,
         }
-        # Render HTML Content
-        html_string = render_to_string(self.template_name, context)
-
-        # Create HTTP response with pdf
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="invoice_{invoice_id}.pdf'
-
-        # Generate pdf using weasyprint
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        html.write_pdf(response)
-        return response
     
 
 
@@ -334,27 +301,41 @@ class GenerateInvoicePDF(LoginRequiredMixin, View):
     ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True),
     name='dispatch'
 )
-class GenerateInvoicePDFNoSig(LoginRequiredMixin, View):
+class GenerateInvoicePDFNoSig(LoginRequiredMixin, DocumentPdfMixin, View):
     login_url = 'users:login'
     template_name = 'app_invoices/components/invoice_generate_pdf_without_sig.html'
+    bundle_kind = 'invoice'
+    pdf_url_kwarg = 'invoice_id'
+    pdf_filename = 'invoice_{id}.pdf'
+    pdf_stylesheets = ('app_invoices/css/pdf_generator.css',)
+
+    def get_pdf_context(self, bundle):
+        return {
+            'generate_invoice_form':bundle.invoice,
+            'bundle': bundle,
+        }
 
-    def get(self, request, *args, **kwargs):
-        # Get Invoice Object
-        invoice_id = kwargs.get('invoice_id')
-        invoice = get_object_or_404(InvoiceModel, invoice_id=invoice_id)
 
-        # Get Context
-        context = {
-            'generate_invoice_form':invoice,
-        }
-        # Render HTML Content
-        html_string = render_to_string(self.template_name, context)
+# Month end export: the PDFs of every invoice matching the list filters, in one ZIP
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class ExportInvoicePDF(LoginRequiredMixin, View):
+    login_url = 'users:login'
+
+    def get(self, request, *args, **kwargs):
+        # Unlike the list page, a bad filter must not export every invoice
+        form = InvoiceListFilterForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text(), content_type='text/plain; charset=utf-8')
+        filters = form.cleaned_data
+        invoice_ids = list(
+            InvoiceModel.objects.filter_list(**filters)
+            .order_by('issue_date', 'id')
+            .values_list('invoice_id', flat=True)
+        )
+        view_class = GenerateInvoicePDFNoSig if request.GET.get('signature') == '0' else GenerateInvoicePDF
+        return pdf_zip_response(view_class, invoice_ids, export_filename(filters))
 
-        # Create HTTP response with pdf
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="invoice_{invoice_id}.pdf'
 
-        # Generate pdf using weasyprint
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        html.write_pdf(response)
-        return response
\ No newline at end of file
+def export_filename(filters):
+    period = '_'.join(value.isoformat() for value in (filters.get('start_date'), filters.get('end_date')) if value)
+    return f'invoices_{period}.zip' if period else 'invoices.zip'
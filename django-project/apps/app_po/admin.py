@@ -1,6 +1,7 @@
 # coding=utf-8
 from django.contrib import admin
 from apps.app_employee.models import EmployeesModel
+from apps.common.pdf_archive import rerender_archived_pdfs
 from .models import PoIdGeneratorModel, PurchaseOrderModel, PurchaseOrderItemsModel, ApprovedPOModel, SuppliersModel
 
 @admin.register(ApprovedPOModel)
@@ -41,6 +42,7 @@ class PurchaseOrderModelAdmin(admin.ModelAdmin):
     autocomplete_fields = ["quotation", "created_by"]
     inlines = [PurchaseOrderItemsInline]
     readonly_fields = ['po_id']
+    actions = [rerender_archived_pdfs('po', 'po_id')]
     exclude = [
         'created_at_log',
         'updated_at_log',
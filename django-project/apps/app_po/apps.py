@@ -9,4 +9,8 @@ class AppPoConfig(AppConfig):
     label = 'app_po'
 
     def ready(self):
-        import apps.app_po.signals
\ No newline at end of file
+        import apps.app_po.signals
+        # PDF views known to the archive re-render action and the warm-up (apps.common.pdf_archive)
+        from apps.common.pdf_archive import register_pdf_views
+        from .views import GeneratePoPdfView
+        register_pdf_views(GeneratePoPdfView)
\ No newline at end of file
@@ -5,6 +5,7 @@ from django.forms import inlineformset_factory
 # Model 
 from .models import PurchaseOrderModel, PurchaseOrderItemsModel, PoIdGeneratorModel
 from apps.app_customers.models import CustomerTenantModel
+from apps.common.forms import BulkInlineFormSet
 
 # Purchase Order Information ModelForm
 # app_po/forms.py
@@ -48,6 +49,7 @@ PoItemsFormSet = inlineformset_factory(
     PurchaseOrderModel,
     PurchaseOrderItemsModel,
     form = PurchaseOrderItemsModelForm,
+    formset = BulkInlineFormSet,
     extra=1,
     can_delete=True,
 )
\ No newline at end of file
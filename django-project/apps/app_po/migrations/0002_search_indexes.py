@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:48
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0002_search_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0002_search_indexes'),
+        ('app_po', '0001_initial'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexIfPostgres
+from apps.common.search import build_search_document
+
+
+def fill_search_document(apps, schema_editor):
+    PurchaseOrderModel = apps.get_model('app_po', 'PurchaseOrderModel')
+    pos = list(PurchaseOrderModel.objects.select_related('customer', 'quotation__customer', 'invoice'))
+    for po in pos:
+        customer = po.customer or po.quotation.customer
+        po.search_document = build_search_document(
+            po.po_id,
+            po.quotation.quotation_id,
+            po.invoice.invoice_id if po.invoice else None,
+            customer.customer_id,
+            customer.company_name,
+            customer.contact_person_name,
+        )
+    PurchaseOrderModel.objects.bulk_update(pos, ['search_document'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0002_search_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0003_search_document'),
+        ('app_po', '0002_search_indexes'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseordermodel',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        AddIndexIfPostgres(
+            model_name='purchaseordermodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('search_document', output_field=models.TextField())), name='gin_trgm_ops'), name='po_search_trgm'),
+        ),
+        AddIndexIfPostgres(
+            model_name='purchaseordermodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('search_document', config='simple'), name='po_search_vector'),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+    ]
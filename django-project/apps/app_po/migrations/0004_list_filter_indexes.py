@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0003_list_filter_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_invoices', '0004_list_filter_indexes'),
+        ('app_po', '0003_search_document'),
+        ('app_quotations', '0003_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseordermodel',
+            index=models.Index(fields=['-start_date', '-id'], name='po_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseordermodel',
+            index=models.Index(fields=['status', '-start_date', '-id'], name='po_status_start_idx'),
+        ),
+    ]
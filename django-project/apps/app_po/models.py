@@ -10,6 +10,8 @@ from apps.app_customers.models import CustomersModel, CustomerTenantModel
 from apps.app_employee.models import EmployeesModel
 from apps.app_quotations.models import QuotationInformationModel
 from apps.app_invoices.models import InvoiceModel
+from apps.common.search import trigram_index, search_vector_index, build_search_document
+from apps.common.pricing import line_total
 
 
 # ----------------------------
@@ -160,24 +162,46 @@ class PurchaseOrderModel(models.Model):
         editable=False,
         verbose_name='ລາຄາລວມທັງໝົດ'
     )
+    # Denormalized search box text (own, customer and related document IDs), kept current by signals
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     class Meta:
         verbose_name = 'ໃບສັ່ງຊື້'
         verbose_name_plural = 'ໃບສັ່ງຊື້'
         ordering = ['-po_id']
+        indexes = [
+            trigram_index('search_document', name='po_search_trgm'),
+            search_vector_index('search_document', name='po_search_vector'),
+            # list page: default order and start_date range, status filter (+ range)
+            models.Index(fields=['-start_date', '-id'], name='po_start_idx'),
+            models.Index(fields=['status', '-start_date', '-id'], name='po_status_start_idx'),
+        ]
 
     def __str__(self):
         customer = self.quotation.customer.company_name if self.quotation and self.quotation.customer else 'ບໍ່ມີລູກຄ້າ'
         return f"PO {self.po_id} - {customer}"
 
+    def build_search_document(self):
+        customer = self.customer or self.quotation.customer
+        return build_search_document(
+            self.po_id,
+            self.quotation.quotation_id,
+            self.invoice.invoice_id if self.invoice else None,
+            customer.customer_id,
+            customer.company_name,
+            customer.contact_person_name,
+        )
+
     def calculate_total_all_products(self):
         total_sum = self.items.aggregate(total=Sum('total_one_product'))['total']
         if total_sum is None:
             total_sum = Decimal('0.00')
 
-        if self.total_all_products != total_sum:
-            self.total_all_products = total_sum
-            super(PurchaseOrderModel, self).save(update_fields=['total_all_products'])
+        # Compared in the database, this instance may predate the last recompute
+        self.total_all_products = total_sum
+        PurchaseOrderModel._base_manager.filter(pk=self.pk).exclude(total_all_products=total_sum).update(
+            total_all_products=total_sum
+        )
 
 # ----------------------------
 # Purchase Order Items
@@ -206,17 +230,13 @@ class PurchaseOrderItemsModel(models.Model):
         verbose_name = 'ລາຍການໃນໃບສັ່ງຊື້'
         verbose_name_plural = 'ລາຍການໃນໃບສັ່ງຊື້'
 
+    # also called by BulkInlineFormSet (apps.common.forms), that saves without save()
+    def calculate_row_totals(self):
+        self.total_one_product = line_total(self.price, self.qty, self.period)
+
     def save(self, *args, **kwargs):
-        if self.price is not None and self.qty is not None and self.period is not None:
-            self.total_one_product = self.price * self.qty * self.period
-        else:
-            self.total_one_product = Decimal('0.00')
+        self.calculate_row_totals()
         super().save(*args, **kwargs)
-        self.purchase_order.calculate_total_all_products()
-    def delete(self, *args, **kwargs):
-        common_info = self.purchase_order
-        super().delete(*args, **kwargs)
-        common_info.calculate_total_all_products()
 
     def __str__(self):
         return f"{self.product_name} ({self.qty} x {self.price})"
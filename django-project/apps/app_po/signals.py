@@ -1,24 +1,48 @@
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.db import transaction
-from .models import PoIdGeneratorModel, PurchaseOrderModel, PurchaseOrderItemsModel
+from django.db.models import Q
+from apps.app_customers.models import CustomersModel
+from apps.common.search import refresh_search_documents
+from apps.common.facets import track_status_counts
+from apps.common.forms import formset_bulk_saved
+from apps.common.numbering import next_number
+from apps.common.totals import mark_totals_dirty
+from .models import PurchaseOrderModel, PurchaseOrderItemsModel
 
-PREFIX = 'PO'
+# Cached per-status counts for the filter bar
+track_status_counts(PurchaseOrderModel)
 
-# Update total_all_product when save/delete item
+# Update total_all_product when save/delete item, once per transaction
 @receiver([post_save, post_delete], sender=PurchaseOrderItemsModel)
 def update_total_all_product(sender, instance, **kwargs):
-    po = instance.purchase_order
-    if po.pk:
-        po.calculate_total_all_products()
+    mark_totals_dirty(instance.purchase_order)
+
+
+@receiver(formset_bulk_saved, sender=PurchaseOrderItemsModel)
+def update_total_all_product_bulk(sender, parent, **kwargs):
+    mark_totals_dirty(parent)
 
 
 # Auto-Generate po_id before save
 @receiver(pre_save, sender=PurchaseOrderModel)
 def po_id_generator(sender, instance, **kwargs):
     if not instance.pk and not instance.po_id:  # เช็คว่าเป็นการ create
-        with transaction.atomic():
-            generator, created = PoIdGeneratorModel.objects.select_for_update().get_or_create(pk=1)
-            generator.po_number_generator += 1
-            generator.save()
-            instance.po_id = f"{PREFIX}-{generator.po_number_generator:07d}"
+        instance.po_id = next_number('po')
+
+
+# Search document, after po_id is generated
+@receiver(pre_save, sender=PurchaseOrderModel)
+def update_po_search_document(sender, instance, update_fields=None, **kwargs):
+    # partial saves (e.g. totals) do not touch the searched fields
+    if update_fields is None or 'search_document' in update_fields:
+        instance.search_document = instance.build_search_document()
+
+
+# Customer renamed, refresh the POs that show the customer name
+@receiver(post_save, sender=CustomersModel)
+def refresh_po_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(
+            PurchaseOrderModel.objects.filter(Q(customer=instance) | Q(quotation__customer=instance))
+            .select_related('customer', 'quotation__customer', 'invoice')
+        )
@@ -22,6 +22,7 @@ urlpatterns = [
     path('po_details/update/<str:po_id>/', views.PurchaseOrderUpdateView.as_view(), name='update_po'),
     path('po_details/view_po_form/<str:po_id>/', views.OnePoDetailsView.as_view(), name='po_view_form'),
     path('po_details/view_po_form/download_pdf/<str:po_id>/', views.GeneratePoPdfView.as_view(), name='generate_po_pdf'),
+    path('po_details/view_po_form/deal_pack/<str:po_id>/', views.GeneratePoDealPackPDF.as_view(), name='deal_pack_pdf'),
 ]
 
 # when user go to path /app_name/ it will show api root page (endpoints list)
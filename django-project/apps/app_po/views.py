@@ -27,6 +27,13 @@ from apps.app_quotations.models import QuotationInformationModel
 from apps.app_employee.models import EmployeesModel
 from apps.app_invoices.models import InvoiceModel
 from apps.app_customers.models import CustomerTenantModel
+from apps.common.pagination import KeysetPaginationMixin
+from apps.common.search import search_documents, order_by_rank
+from apps.common.facets import status_choices_with_counts
+from apps.common.bundles import DocumentBundleMixin, load_document_bundle
+from apps.common.conditional import ConditionalPageMixin
+from apps.common.forms import BulkInlineFormSet
+from apps.common.views import DealPackPdfMixin, DocumentPdfMixin
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,11 +42,14 @@ logger = logging.getLogger(__name__)
 # Class Base Views
 # Home
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class HomeView(LoginRequiredMixin, ListView):
+class HomeView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     login_url = 'users:login'
     model = PurchaseOrderModel
     template_name = 'app_po/home.html'
     context_object_name = 'all_po'
+    # search_document already holds the IDs and customer names, no join needed
+    search_fields = ('search_document',)
+    search_vector_fields = ('search_document',)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -47,11 +57,7 @@ class HomeView(LoginRequiredMixin, ListView):
         # Search / Filter
         search = self.request.GET.get('search', '')
         if search:
-            queryset = queryset.filter(
-                Q(po_id__icontains=search) |
-                Q(customer__company_name__icontains=search) |
-                Q(customer__contact_person_name__icontains=search)
-            )
+            queryset = search_documents(queryset, search, self.search_fields, self.search_vector_fields)
         
         status = self.request.GET.get('status', '')
         if status:
@@ -59,14 +65,14 @@ class HomeView(LoginRequiredMixin, ListView):
         start_date = self.request.GET.get('start_date', '')
         if start_date:
             queryset = queryset.filter(start_date__gte=start_date)
-        # Default order
-        return queryset.order_by('-start_date')
+        # Default order, best search matches first
+        return order_by_rank(queryset, '-start_date')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'ລາຍການໃບສັ່ງຊື້ສິນຄ້າ'
         context['search'] = self.request.GET.get('search', '')
-        context['status_list'] = PurchaseOrderModel.PoStatus.choices
+        context['status_list'] = status_choices_with_counts(PurchaseOrderModel)
         return context
 
 
@@ -115,6 +121,7 @@ class PurchaseOrderCreateView(LoginRequiredMixin, View):
             parent_model=PurchaseOrderModel,
             model=PurchaseOrderItemsModel,
             form=PoItemsFormSet.form,  # Custom form for PO items
+            formset=BulkInlineFormSet,  # Rows saved in bulk
             extra=len(initial_items),   # Number of extra blank forms = number of quotation items
             can_delete=False            # Prevent deletion of items in formset
         )
@@ -284,13 +291,14 @@ class DeleteView(LoginRequiredMixin, DeleteView):
 
 # Details View
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class InvoiceDetailsView(LoginRequiredMixin, DetailView):
+class InvoiceDetailsView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     model = PurchaseOrderModel
     template_name  = 'app_po/components/po_details.html'
     context_object_name = 'purchase_order'
     slug_field = 'po_id'
     slug_url_kwarg = 'po_id'
+    bundle_kind = 'po'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -340,6 +348,7 @@ class PurchaseOrderUpdateView(LoginRequiredMixin, View):
             PurchaseOrderModel,
             PurchaseOrderItemsModel,
             form=PoItemsFormSet.form,
+            formset=BulkInlineFormSet,
             extra=1,
             can_delete=True,
             min_num=1,
@@ -468,49 +477,44 @@ class PurchaseOrderUpdateView(LoginRequiredMixin, View):
 
 
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class OnePoDetailsView(LoginRequiredMixin, DetailView):
+class OnePoDetailsView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     model = PurchaseOrderModel
     template_name = 'app_po/components/po_view_form.html'
     context_object_name = 'generate_po_form'
+    slug_url_kwarg = 'po_id'
+    bundle_kind = 'po'
 
-    def get_object(self, queryset = None):
-        po_id = self.kwargs.get('po_id')
-        return get_object_or_404(PurchaseOrderModel, po_id=po_id)
-    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context = {
+        context.update({
             'title':f'ລາຍລະອຽດໃບສັ່ງຊື້ {self.kwargs.get("po_id")}',
-            'generate_po_form': self.get_object(),
             'employee': getattr(self.request.user, 'employee', None),
-        }
+        })
         return context
 
     
 # Generate PO PDF with Signature
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class GeneratePoPdfView(LoginRequiredMixin, View):
+class GeneratePoPdfView(LoginRequiredMixin, DocumentPdfMixin, View):
     login_url = 'users:login'
     template_name = 'app_po/components/po_pdf_generator.html'
+    bundle_kind = 'po'
+    pdf_url_kwarg = 'po_id'
+    pdf_filename = 'po_{id}.pdf'
+    pdf_stylesheets = ('app_po/css/app_po_pdf_generator.css',)
 
-    def get(self, request, *args, **kwargs):
-        po_id = self.kwargs.get('po_id')
-        po = get_object_or_404(PurchaseOrderModel, po_id=po_id)
-
-        context = {
-            'generate_po_form':po,
-            'employee': getattr(self.request.user, 'employee', None),
+    def get_pdf_context(self, bundle):
+        return {
+            'generate_po_form':bundle.purchase_order,
+            'bundle': bundle,
             'STATIC_ROOT': settings.STATIC_ROOT
         }
-        # Render HTML Content
-        html_string = render_to_string(self.template_name, context)
 
-        # Create HTTP Response with PDF
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="po_{po_id}.pdf'
 
-        # Generate PDF Using weasyprint
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        html.write_pdf(response)
-        return response
+# Quotation, invoice and PO in one PDF
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class GeneratePoDealPackPDF(LoginRequiredMixin, DealPackPdfMixin, View):
+    login_url = 'users:login'
+    bundle_kind = 'po'
+    pdf_url_kwarg = 'po_id'
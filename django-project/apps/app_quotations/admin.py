@@ -1,5 +1,6 @@
 from django.contrib import admin
 from apps.app_employee.models import EmployeesModel
+from apps.common.pdf_archive import rerender_archived_pdfs
 from .models import (
     GenerateQuotationID,
     QuotationInformationModel,
@@ -61,6 +62,7 @@ class QuotationInformationModelAdmin(admin.ModelAdmin):
     autocomplete_fields = ["customer", "created_by"]
     inlines = [QuotationItemsInline, AdditionalExpensesInline]
     readonly_fields = ['quotation_id']
+    actions = [rerender_archived_pdfs('quotation', 'quotation_id')]
     
     # Hide these fields on add/edit form
     exclude = [
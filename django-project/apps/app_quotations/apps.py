@@ -10,4 +10,8 @@ class AppQuotationsSmallConfig(AppConfig):
 
     def ready(self):
         # Import Signals to Django register signals on app load
-        import apps.app_quotations.signals
\ No newline at end of file
+        import apps.app_quotations.signals
+        # PDF views known to the archive re-render action and the warm-up (apps.common.pdf_archive)
+        from apps.common.pdf_archive import register_pdf_views
+        from .views import GenerateQuotationPDF, GenerateQuotationPDFNoSig
+        register_pdf_views(GenerateQuotationPDF, GenerateQuotationPDFNoSig)
\ No newline at end of file
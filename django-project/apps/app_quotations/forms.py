@@ -9,6 +9,7 @@ from .models import (
     AdditionalExpensesModel
 )
 from apps.app_customers.models import CustomersModel
+from apps.common.forms import BulkInlineFormSet
 
 
 #====================================== Class Forms ======================================
@@ -94,6 +95,7 @@ AdditionalExpensesFormSet = inlineformset_factory(
     QuotationInformationModel,
     AdditionalExpensesModel,
     form=AdditionalExpensesForm,
+    formset=BulkInlineFormSet,
     extra=1,
     max_num=1,
     can_delete=False
@@ -104,6 +106,7 @@ QuotationItemsFormSet = inlineformset_factory(
     QuotationInformationModel,
     QuotationItemsModel,
     form=QuotationItemsForm,
+    formset=BulkInlineFormSet,
     extra=1,
     can_delete=True,
 )
\ No newline at end of file
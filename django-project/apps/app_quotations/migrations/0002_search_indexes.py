@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:48
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexIfPostgres
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0002_search_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_quotations', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexIfPostgres(
+            model_name='quotationinformationmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('quotation_id', output_field=models.TextField())), name='gin_trgm_ops'), name='quotation_id_trgm'),
+        ),
+    ]
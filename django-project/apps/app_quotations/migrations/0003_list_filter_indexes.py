@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_customers', '0003_list_filter_indexes'),
+        ('app_employee', '0003_search_indexes'),
+        ('app_quotations', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quotationinformationmodel',
+            index=models.Index(fields=['-end_date', '-quotation_id'], name='quotation_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotationinformationmodel',
+            index=models.Index(fields=['status', '-end_date', '-quotation_id'], name='quotation_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotationinformationmodel',
+            index=models.Index(fields=['status', 'start_date'], name='quotation_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotationinformationmodel',
+            index=models.Index(fields=['start_date'], name='quotation_start_idx'),
+        ),
+    ]
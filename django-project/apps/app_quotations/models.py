@@ -9,11 +9,24 @@ from apps.common.mixins import (
 )
 from apps.app_customers.models import CustomersModel
 from apps.app_employee.models import EmployeesModel
+from apps.common.search import trigram_index
 
 # Generate ID of Quotation
 class GenerateQuotationID(models.Model):
     qotation_id_generator = models.BigIntegerField(default=0)
 
+# Query plans of Quotation
+class QuotationQuerySet(models.QuerySet):
+    def for_list(self):
+        """
+        Query plan for the quotation list page
+        - customer is joined in the same query
+        - items are prefetched once, sorted, and reused by every column of the row
+        """
+        return self.select_related('customer').prefetch_related(
+            models.Prefetch('items', queryset=QuotationItemsModel.objects.order_by('pk'))
+        )
+
 # Main Quotation Model
 class QuotationInformationModel(CommonInformationModelMixins):
     """
@@ -27,10 +40,20 @@ class QuotationInformationModel(CommonInformationModelMixins):
     upload_signatured_quo = models.FileField(upload_to='quotation_docs/', blank=True, null=True, verbose_name='ໃບສະເຫນີລາຄາທີ່ເຊັນຮັບຮອງແລ້ວ')
     customer_po = models.FileField(upload_to='quotation_docs/', blank=True, null=True, verbose_name='ໃບສັ່ງຊື້ຂອງລູກຄ້າ')
 
+    objects = QuotationQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'ໃບສະເຫນີລາຄາ'
         verbose_name_plural = 'ໃບສະເຫນີລາຄາ'
         ordering = ['-end_date']
+        indexes = [
+            trigram_index('quotation_id', name='quotation_id_trgm'),
+            # list page: default order, status filter, status + start_date range
+            models.Index(fields=['-end_date', '-quotation_id'], name='quotation_end_idx'),
+            models.Index(fields=['status', '-end_date', '-quotation_id'], name='quotation_status_end_idx'),
+            models.Index(fields=['status', 'start_date'], name='quotation_status_start_idx'),
+            models.Index(fields=['start_date'], name='quotation_start_idx'),
+        ]
     def __str__(self):
         return f"{self.quotation_id} - ລູກຄ້າ {self.customer.company_name}"
 
@@ -1,23 +1,25 @@
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.db import transaction
-from .models import QuotationInformationModel, QuotationItemsModel, AdditionalExpensesModel, GenerateQuotationID
+from apps.common.facets import track_status_counts
+from apps.common.forms import formset_bulk_saved
+from apps.common.numbering import next_number
+from apps.common.totals import mark_totals_dirty
+from .models import QuotationInformationModel, QuotationItemsModel, AdditionalExpensesModel
 
-PREFIX = "QUO"
+# Cached per-status counts for the filter bar
+track_status_counts(QuotationInformationModel)
 
-# Update total_all_products when save/delete item
+# Update total_all_products when save/delete item, once per transaction
 @receiver([post_save, post_delete], sender=QuotationItemsModel)
 def update_total_all_product(sender, instance, **kwargs):
-    quotation = instance.common_information
-    if quotation.pk:
-        quotation.calculate_total_all_products()
+    mark_totals_dirty(instance.common_information)
+
+@receiver(formset_bulk_saved, sender=QuotationItemsModel)
+def update_total_all_product_bulk(sender, parent, **kwargs):
+    mark_totals_dirty(parent)
 
 # Auto-Generate quotation_ID before save
 @receiver(pre_save, sender=QuotationInformationModel)
 def quotation_id_generator(sender, instance, **kwargs):
     if not instance.quotation_id:
-        with transaction.atomic():
-            generator, created = GenerateQuotationID.objects.select_for_update().get_or_create(pk=1)
-            generator.qotation_id_generator += 1
-            generator.save()
-            instance.quotation_id = f"{PREFIX}{generator.qotation_id_generator:07d}"
+        instance.quotation_id = next_number('quotation')
@@ -1,4 +1,56 @@
 # coding=utf-8
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.app_customers.models import CustomersModel
+from apps.app_employee.models import EmployeesModel
+from apps.users.models import User
+from .models import QuotationInformationModel, QuotationItemsModel
+from .views import HomeView
+
+
+@override_settings(DEBUG=True, QUERY_BUDGET_ENABLED=True)
+class HomeViewQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='sales', password='sales')
+        cls.employee = EmployeesModel.objects.create(
+            user=user, employee_name='Somsack', employee_lastname='Phommavong', department='Sales', signature='',
+        )
+        cls.customer = CustomersModel.objects.create(
+            company_name='Lao Telecom', contact_person_name='Noy', phone_number='20000000',
+            email='noy@example.com', company_address='Vientiane',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.employee.user)
+
+    def add_quotations(self, count):
+        for n in range(count):
+            quotation = QuotationInformationModel.objects.create(
+                customer=self.customer, created_by=self.employee,
+                start_date=datetime.date(2026, 1, 1), end_date=datetime.date(2026, 12, 31),
+            )
+            QuotationItemsModel.objects.bulk_create([
+                QuotationItemsModel(common_information=quotation, product_name=f'Microsoft 365 {i}', price=Decimal('125.50'))
+                for i in range(3)
+            ])
+
+    def get_home(self):
+        # The status counts are not cached, like under DEBUG's DummyCache
+        cache.clear()
+        # session and user, then the view's budget: quotations, items prefetch, status counts
+        with self.assertNumQueries(2 + HomeView.query_budget):
+            response = self.client.get(reverse('app_quotations:home'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_constant_queries(self):
+        self.add_quotations(1)
+        self.assertEqual(len(self.get_home().context['all_quotations']), 1)
+        self.add_quotations(49)
+        self.assertEqual(len(self.get_home().context['all_quotations']), HomeView.paginate_by)
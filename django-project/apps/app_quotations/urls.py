@@ -23,6 +23,7 @@ urlpatterns = [
     path('quotation_details/quotation_form/<str:quotation_id>/', views.OneQuotationDetailsView.as_view(), name='generate_quotation_form'),
     path('quotation_details/quotation_form/generate_pdf/<str:quotation_id>/', views.GenerateQuotationPDF.as_view(), name='quotation_generator_pdf'),
     path('quotation_details/quotation_form/generate_pdf_no_sig/<str:quotation_id>/', views.GenerateQuotationPDFNoSig.as_view(), name='quotation_generator_pdf_no_sig'),
+    path('quotation_details/quotation_form/generate_docx/<str:quotation_id>/', views.GenerateQuotationDocx.as_view(), name='quotation_generator_docx'),
     # path('quotation_details/quotation_form/quotation_pdf_generator/<str:quotation_id>/', views.quotation_generator_pdf, name='quotation_generator_pdf'),
     # path('quotation_details/quotation_form/quotation_generator_pdf_no_sig/<str:quotation_id>/', views.quotation_generator_pdf_no_sig, name='quotation_generator_pdf_no_sig'),
 ]
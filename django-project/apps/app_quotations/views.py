@@ -36,28 +36,36 @@ from .forms import (
 from .models import QuotationInformationModel, QuotationItemsModel, AdditionalExpensesModel
 from apps.app_customers.models import CustomersModel
 from apps.app_employee.models import EmployeesModel
+from apps.common.query_budget import QueryBudgetMixin
+from apps.common.pagination import KeysetPaginationMixin
+from apps.common.search import search_documents, order_by_rank
+from apps.common.facets import status_choices_with_counts
+from apps.common.bundles import DocumentBundleMixin, load_document_bundle
+from apps.common.conditional import ConditionalPageMixin
+from apps.common.views import DocumentDocxMixin, DocumentPdfMixin
 # from apps.users.mixins import RoleRequiredMixin
 
 
 # Class Base Views
 #====================================== Home page and list of all quotations ======================================
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class HomeView(LoginRequiredMixin, ListView):
+class HomeView(LoginRequiredMixin, QueryBudgetMixin, KeysetPaginationMixin, ListView):
     login_url = 'users:login'
     model = QuotationInformationModel
     template_name = 'app_quotations/home.html'
     context_object_name = 'all_quotations'
+    # quotations + items prefetch + the status counts of the filter bar, a GROUP BY on a cache miss
+    # (every request under DEBUG's DummyCache), constant no matter how many rows, see tests.py
+    query_budget = 3
+    search_fields = ('quotation_id', 'customer__company_name', 'customer__contact_person_name')
+    search_vector_fields = ('customer__company_name', 'customer__contact_person_name')
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().for_list()
         #Search / Filter Function
         search = self.request.GET.get('search', '')
         if search:
-            queryset = queryset.filter(
-                Q(quotation_id__icontains=search) |
-                Q(customer__company_name__icontains=search) |
-                Q(customer__contact_person_name__icontains=search)
-            )
+            queryset = search_documents(queryset, search, self.search_fields, self.search_vector_fields)
         # Order by Status
         status = self.request.GET.get('status', '')
         if status:
@@ -72,15 +80,15 @@ class HomeView(LoginRequiredMixin, ListView):
             queryset = queryset.filter(start_date__gte=start_date)
         elif end_date:
             queryset = queryset.filter(start_date__lte=end_date)
-        # Default order by
-        queryset = queryset.order_by('-end_date')
+        # Default order by, best search matches first
+        queryset = order_by_rank(queryset, '-end_date')
         return queryset
         
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search'] = self.request.GET.get('search', '')
         context['title'] = 'ລາຍການໃບສະເຫນີລາຄາ'
-        context['status_list'] = QuotationInformationModel.Status.choices
+        context['status_list'] = status_choices_with_counts(QuotationInformationModel)
         return context
 
     
@@ -224,56 +232,43 @@ class DeleteView(LoginRequiredMixin, DeleteView):
 
 # Quotation Details
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class QuotationDetailView(LoginRequiredMixin, DetailView):
+class QuotationDetailView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     model = QuotationInformationModel
     template_name = 'app_quotations/quotation_details.html'
     context_object_name = 'quotation'
     slug_field = 'quotation_id'
     slug_url_kwarg = 'quotation_id'
+    bundle_kind = 'quotation'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        quotation = self.object
-
-        # Related objects
-        quotation_items = quotation.items.all()
-        additional_expenses_qs = quotation.additional_payments.all()  # QuerySet
-
-        additional_expense = additional_expenses_qs.first() if additional_expenses_qs.exists() else None
-
-        # Calculate totals
-        total_price = quotation.total_all_products or 0
-        it_service_amount = additional_expense.it_service_output if additional_expense else 0
-        vat_amount = additional_expense.vat_output if additional_expense else 0
-        grand_total = additional_expense.grand_total if additional_expense else total_price
+        bundle = self.bundle
 
         # Update context
         context.update({
             'title': 'ລາຍລະອຽດຂອງໃບສະເຫນີລາຄາ',
-            'one_quotation': quotation,
-            'quotation_items': quotation_items,
-            'additional_expense': additional_expense,
-            'total_price': total_price,
-            'it_service_amount': it_service_amount,
-            'vat_amount': vat_amount,
-            'grand_total': grand_total,
+            'one_quotation': bundle.quotation,
+            'quotation_items': bundle.items,
+            'additional_expense': bundle.additional_expense,
+            'total_price': bundle.total_price,
+            'it_service_amount': bundle.it_service_amount,
+            'vat_amount': bundle.vat_amount,
+            'grand_total': bundle.grand_total,
         })
         return context
 
 
 # Details of One Quotation
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class OneQuotationDetailsView(LoginRequiredMixin, DetailView):
+class OneQuotationDetailsView(LoginRequiredMixin, ConditionalPageMixin, DocumentBundleMixin, DetailView):
     login_url = 'users:login'
     model = QuotationInformationModel
     template_name = 'app_quotations/components/quotation_form.html'
     context_object_name = 'generate_quotation_form'
-    
-    def get_object(self, queryset=None):
-        quotation_id = self.kwargs.get('quotation_id')
-        return get_object_or_404(QuotationInformationModel, quotation_id=quotation_id)
-    
+    slug_url_kwarg = 'quotation_id'
+    bundle_kind = 'quotation'
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'ໃບສະເຫນີລາຄາ'
@@ -283,20 +278,15 @@ class OneQuotationDetailsView(LoginRequiredMixin, DetailView):
 
 # Generate quotation pdf with weasyprint
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class GenerateQuotationPDF(LoginRequiredMixin, View):
+class GenerateQuotationPDF(LoginRequiredMixin, DocumentPdfMixin, View):
     login_url = 'users:login'
     template_name = 'app_quotations/components/quotation_pdf_generator.html'
+    bundle_kind = 'quotation'
+    pdf_url_kwarg = 'quotation_id'
+    pdf_filename = 'quotation_{id}.pdf'
+    pdf_stylesheets = ('app_quotations/css/quotation_pdf.css',)
 
-    def get(self, request, *args, **kwargs):
-        quotation_id = kwargs.get('quotation_id')
-        quotation = get_object_or_404(QuotationInformationModel, quotation_id=quotation_id)
-
-        # stylesheet path
-        css_path = os.path.join(
-            settings.BASE_DIR,
-            "apps", "app_quotations", "static", "app_quotations", "css", "quotation_pdf.css"
-        )
-
+    def get_pdf_context(self, bundle):
         # logo absolute path for WeasyPrint
         logo_paths = {
             "company_logo":os.path.join(
@@ -310,23 +300,14 @@ class GenerateQuotationPDF(LoginRequiredMixin, View):
         }
         logo_paths_uri = {key: f"file://{value}" for key, value in logo_paths.items()} # Using file:// protocol !Important
 
-        # send logo_path to context (not to WeasyTemplateResponse)
-        context = {
-            'generate_quotation_form': quotation,
-            'employee': getattr(request.user, 'employee', None),
+        # send logo_path to context, the PDF is cached so nothing user specific goes in here
+        return {
+            'generate_quotation_form': bundle.quotation,
+            'bundle': bundle,
             'STATIC_ROOT': settings.STATIC_ROOT,
             'logo_paths': logo_paths_uri,
         }
 
-        return WeasyTemplateResponse(
-            request=request,
-            template=self.template_name,
-            context=context,
-            filename=f"quotation_{quotation_id}.pdf",
-            attachment=True,
-            stylesheets=[css_path],
-        )
-
 
 
 # xhtml2pdf ທົດລອງໃຊ້ Gen PDF
@@ -364,28 +345,28 @@ class GenerateQuotationPDF(LoginRequiredMixin, View):
 
 # Generate Quotation pdf without signature 
 @method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
-class GenerateQuotationPDFNoSig(LoginRequiredMixin, View):
+class GenerateQuotationPDFNoSig(LoginRequiredMixin, DocumentPdfMixin, View):
     login_url = 'users:login'
     template_name = 'app_quotations/components/quotation_pdf_generator_no_sig.html'
+    bundle_kind = 'quotation'
+    pdf_url_kwarg = 'quotation_id'
+    pdf_filename = 'quotation_{id}.pdf'
+    pdf_stylesheets = ('app_quotations/css/quotation_pdf.css',)
 
-    def get(self, request, *args, **kwargs):
-        quotation_id = kwargs.get('quotation_id')
-        quotation = get_object_or_404(QuotationInformationModel, quotation_id=quotation_id)
-
+    def get_pdf_context(self, bundle):
         # context สำหรับ template
-        context = {
-            'generate_quotation_form': quotation,
+        return {
+            'generate_quotation_form': bundle.quotation,
+            'bundle': bundle,
         }
 
-        # render template เป็น html string
-        html_string = render_to_string(self.template_name, context)
 
-        # prepare response pdf
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="quotation_{quotation_id}.pdf"'
-
-        # generate pdf จาก html
-        HTML(string=html_string, base_url=request.build_absolute_uri()).write_pdf(response)
-
-        return response
+# Editable Word version of the quotation
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class GenerateQuotationDocx(LoginRequiredMixin, DocumentDocxMixin, View):
+    login_url = 'users:login'
+    bundle_kind = 'quotation'
+    docx_url_kwarg = 'quotation_id'
+    docx_template = 'app_quotations/docx/quotation.docx'
+    docx_filename = 'quotation_{id}.docx'
     
\ No newline at end of file
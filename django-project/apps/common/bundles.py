@@ -0,0 +1,151 @@
+# coding=utf-8
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+from django.http import Http404
+
+from apps.app_quotations.models import QuotationInformationModel, QuotationItemsModel, AdditionalExpensesModel
+from apps.app_po.models import PurchaseOrderItemsModel
+
+# How each document type is found, every document hangs off exactly one quotation
+BUNDLE_LOOKUPS = {
+    'quotation': 'quotation_id',
+    'invoice': 'invoice__invoice_id',
+    'po': 'purchase_order__po_id',
+    'contract': 'contract_quotation__contract_id',
+}
+
+
+@dataclass(frozen=True)
+class DocumentBundle:
+    """
+    One quotation with everything built from it, loaded by load_document_bundle()
+    - items/po_items are tuples, the bundle is read-only once loaded
+    - invoice/purchase_order/contract are None when not created yet
+    - the model instances are linked to each other, so template paths such as
+      invoice.quotation.items.all or contract.po.po_id hit no extra query
+    """
+    quotation: QuotationInformationModel
+    items: tuple
+    additional_expense: AdditionalExpensesModel = None
+    invoice: object = None
+    purchase_order: object = None
+    po_items: tuple = ()
+    contract: object = None
+
+    def document(self, kind):
+        """The instance of a BUNDLE_LOOKUPS kind, None when not created yet"""
+        return {
+            'quotation': self.quotation,
+            'invoice': self.invoice,
+            'po': self.purchase_order,
+            'contract': self.contract,
+        }[kind]
+
+    @property
+    def customer(self):
+        return self.quotation.customer
+
+    @property
+    def total_price(self):
+        return self.quotation.total_all_products or Decimal('0.00')
+
+    @property
+    def it_service_amount(self):
+        return self.additional_expense.it_service_output if self.additional_expense else 0
+
+    @property
+    def vat_amount(self):
+        return self.additional_expense.vat_output if self.additional_expense else 0
+
+    @property
+    def grand_total(self):
+        return self.additional_expense.grand_total if self.additional_expense else self.total_price
+
+
+def load_document_bundle(kind, document_id):
+    """
+    Load the quotation -> invoice -> PO -> contract chain of one document
+    - kind: 'quotation', 'invoice', 'po' or 'contract' (see BUNDLE_LOOKUPS)
+    - always 4 queries at most: the chain in one JOIN, then quotation items,
+      additional payments and PO items
+    - raises Http404 like get_object_or_404
+    """
+    queryset = QuotationInformationModel.objects.select_related(
+        'customer__tenant',
+        'created_by',
+        'invoice__created_by',
+        'purchase_order__customer__tenant',
+        'purchase_order__tenant',
+        'purchase_order__supplier',
+        'purchase_order__approved_by',
+        'purchase_order__created_by',
+        'contract_quotation__customer__tenant',
+        'contract_quotation__created_by',
+    ).prefetch_related(
+        Prefetch('items', queryset=QuotationItemsModel.objects.order_by('pk')),
+        Prefetch('additional_payments', queryset=AdditionalExpensesModel.objects.order_by('pk')),
+        Prefetch('purchase_order__items', queryset=PurchaseOrderItemsModel.objects.order_by('pk')),
+    )
+    quotation = queryset.filter(**{BUNDLE_LOOKUPS[kind]: document_id}).first()
+    if quotation is None:
+        raise Http404(f'No {kind} {document_id}')
+
+    invoice = _reverse_one(quotation, 'invoice')
+    purchase_order = _reverse_one(quotation, 'purchase_order')
+    contract = _reverse_one(quotation, 'contract_quotation')
+
+    # Point the documents at each other's loaded instances instead of lazy loading them again
+    if purchase_order and invoice and purchase_order.invoice_id == invoice.pk:
+        _link(purchase_order, 'invoice', invoice)
+    if contract:
+        if invoice and contract.invoice_id == invoice.pk:
+            _link(contract, 'invoice', invoice)
+        if purchase_order and contract.po_id == purchase_order.pk:
+            _link(contract, 'po', purchase_order)
+
+    payments = quotation.additional_payments.all()
+    return DocumentBundle(
+        quotation=quotation,
+        items=tuple(quotation.items.all()),
+        additional_expense=payments[0] if payments else None,
+        invoice=invoice,
+        purchase_order=purchase_order,
+        po_items=tuple(purchase_order.items.all()) if purchase_order else (),
+        contract=contract,
+    )
+
+
+def _reverse_one(obj, name):
+    # select_related caches a missing reverse one-to-one as "does not exist"
+    try:
+        return getattr(obj, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def _link(obj, name, value):
+    obj._meta.get_field(name).set_cached_value(obj, value)
+
+
+class DocumentBundleMixin:
+    """
+    DetailView mixin: the object comes from load_document_bundle()
+    - bundle_kind picks the document type, the URL kwarg is slug_url_kwarg
+    - the bundle is available as self.bundle and as `bundle` in the template
+    """
+    bundle_kind = None
+
+    def get_bundle(self):
+        if not hasattr(self, 'bundle'):
+            self.bundle = load_document_bundle(self.bundle_kind, self.kwargs[self.slug_url_kwarg])
+        return self.bundle
+
+    def get_object(self, queryset=None):
+        return self.get_bundle().document(self.bundle_kind)
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('bundle', self.get_bundle())
+        return super().get_context_data(**kwargs)
@@ -0,0 +1,110 @@
+# coding=utf-8
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from apps.app_quotations.models import QuotationInformationModel
+
+from .bundles import BUNDLE_LOOKUPS
+from .pdf import template_version
+
+# Versions self-heal after this long, covers queryset.update()/bulk writes that skip signals
+CHAIN_VERSION_TIMEOUT = 60 * 60 * 24
+# Bump after a deploy that changes the document pages (base template, includes...)
+DOCUMENT_ETAG_VERSION = getattr(settings, 'DOCUMENT_ETAG_VERSION', '1')
+
+
+def _version_key(quotation_id):
+    return f'chainver:{quotation_id}'
+
+
+def chain_version(quotation_id):
+    """
+    Time of the last change to a quotation chain (any row of its bundle), from the cache
+    - a chain without a cached version gets "now": the next request is a full response
+    """
+    key = _version_key(quotation_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), CHAIN_VERSION_TIMEOUT)
+        version = cache.get(key, time.time())
+    return version
+
+
+def touch_chains(quotation_ids):
+    """New version for these quotation chains, called from the save/delete signals after commit"""
+    now = time.time()
+    cache.set_many({_version_key(quotation_id): now for quotation_id in set(quotation_ids)}, CHAIN_VERSION_TIMEOUT)
+
+
+class ConditionalDocumentMixin:
+    """
+    Answers If-None-Match / If-Modified-Since with 304 before loading or rendering anything
+    - validators: the version of the document's quotation chain (see touch_chains()) plus
+      get_etag_parts(), e.g. the template source, so a deploy changes the ETag too
+    - runs in dispatch(), after the login check
+    - responses are Cache-Control: private, no-cache, browsers keep them and revalidate
+    """
+    def get_document_id(self):
+        raise NotImplementedError
+
+    def get_etag_parts(self):
+        return []
+
+    def get_validators(self):
+        """(etag, last_modified timestamp), None to answer without validators"""
+        quotation_id = (
+            QuotationInformationModel.objects
+            .filter(**{BUNDLE_LOOKUPS[self.bundle_kind]: self.get_document_id()})
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if quotation_id is None:
+            return None
+        version = chain_version(quotation_id)
+        state = [DOCUMENT_ETAG_VERSION, type(self).__qualname__, quotation_id, version, *self.get_etag_parts()]
+        etag = quote_etag(hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()[:32])
+        # HTTP dates have whole seconds, the ETag (sent along by browsers) is the precise one
+        return etag, int(version)
+
+    def dispatch(self, request, *args, **kwargs):
+        validators = self.get_validators() if request.method in ('GET', 'HEAD') else None
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 206, 304):
+            response.headers.setdefault('ETag', etag)
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ConditionalPageMixin(ConditionalDocumentMixin):
+    """ConditionalDocumentMixin for DocumentBundleMixin pages, they also depend on the user and the session"""
+    def get_document_id(self):
+        return self.kwargs[self.slug_url_kwarg]
+
+    def get_validators(self):
+        # A flash message is shown once, the page must be rendered to show it
+        if len(messages.get_messages(self.request)):
+            return None
+        return super().get_validators()
+
+    def get_etag_parts(self):
+        return [
+            template_version(self.template_name),
+            self.request.user.pk,
+            # the CSRF token of the forms on the page
+            self.request.META.get('CSRF_COOKIE'),
+            self.request.GET.urlencode(),
+        ]
@@ -0,0 +1,112 @@
+# coding=utf-8
+import datetime
+import io
+import os
+import re
+import threading
+import zipfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+from docx.oxml import parse_xml
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+from .pdf_styles import file_version
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+# Package parts rendered through Jinja, every other part is copied from the template as is
+TEMPLATE_PARTS = re.compile(r'^word/(document|header\d*|footer\d*)\.xml$')
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def _money(value):
+    return f'{value or 0:,.2f}'
+
+
+def _date(value, format='%d/%m/%Y'):
+    return value.strftime(format) if isinstance(value, (datetime.date, datetime.datetime)) else ''
+
+
+# autoescape: a customer called "A & B" must not break the XML
+jinja_env = Environment(autoescape=True)
+jinja_env.filters.update(money=_money, date=_date)
+
+
+@lru_cache(maxsize=None)
+def docx_template_path(name):
+    """Path of a .docx template, looked up like Django templates ('app_contracts/docx/contract.docx')"""
+    template_dirs = [*(d for engine in settings.TEMPLATES for d in engine.get('DIRS', ())), *get_app_template_dirs('templates')]
+    for directory in template_dirs:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f'DOCX template {name} not found')
+
+
+def render_docx(name, context):
+    """The .docx bytes of template `name` filled with `context`"""
+    return compiled_docx(docx_template_path(name)).render(context)
+
+
+def compiled_docx(path):
+    """
+    The CompiledDocx of `path`, built once per process
+    - built again when the file changes (size or mtime), a new template needs no restart
+    """
+    version = file_version(path)
+    with _lock:
+        cached = _compiled.get(path)
+        if cached is None or cached[0] != version:
+            cached = (version, CompiledDocx(path))
+            _compiled[path] = cached
+        return cached[1]
+
+
+class CompiledDocx:
+    """
+    A docxtpl template with its parsing done once
+    - DocxTemplate.render() unzips the package, parses the XML, cleans the Jinja tags Word
+      split across runs (patch_xml) and compiles Jinja on every call, then keeps the
+      result in the object: a DocxTemplate can not be rendered twice
+    - here patch_xml and the Jinja compile run once, render() only runs the compiled
+      templates and zips the result with the untouched parts of the template
+    - body, headers and footers are supported, images/subdocs (InlineImage, Subdoc)
+      and the column merge tags that need DocxTemplate.fix_tables are not
+    - mirrors DocxTemplate.render() of docxtpl 0.20.2 and uses its patch_xml(),
+      xml_to_string() and resolve_listing(): docxtpl is pinned to that version in
+      requirements/production.txt, check DocxRenderTests (apps.common.tests) before
+      moving the pin
+    """
+    def __init__(self, path):
+        self.docxtpl = DocxTemplate(path)
+        self.parts = []
+        self.templates = {}
+        with zipfile.ZipFile(path) as package:
+            for info in package.infolist():
+                data = package.read(info)
+                self.parts.append((info, data))
+                if TEMPLATE_PARTS.match(info.filename):
+                    xml = self.docxtpl.xml_to_string(parse_xml(data))
+                    xml = re.sub(r'<w:p([ >])', r'\n<w:p\1', self.docxtpl.patch_xml(xml))
+                    self.templates[info.filename] = jinja_env.from_string(xml)
+
+    def render(self, context):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+            for info, data in self.parts:
+                template = self.templates.get(info.filename)
+                if template is not None:
+                    data = (XML_DECLARATION + self.render_part(template, context)).encode()
+                package.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+        return output.getvalue()
+
+    def render_part(self, template, context):
+        # Same post-processing as DocxTemplate.render_xml_part()
+        xml = re.sub(r'\n<w:p([ >])', r'<w:p\1', template.render(context))
+        xml = xml.replace('{_{', '{{').replace('}_}', '}}').replace('{_%', '{%').replace('%_}', '%}')
+        return self.docxtpl.resolve_listing(xml)
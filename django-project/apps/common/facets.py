@@ -0,0 +1,91 @@
+# coding=utf-8
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_init, post_save, post_delete
+
+# Counters self-heal after this long, covers queryset.update()/bulk writes that skip signals
+FACET_TIMEOUT = 60 * 60
+STATUS_FIELD = 'status'
+
+
+def _status_key(model, status):
+    return f'facets:{model._meta.label_lower}:{status}'
+
+
+def _status_values(model):
+    return [value for value, label in model._meta.get_field(STATUS_FIELD).choices]
+
+
+def status_counts(model):
+    """
+    Number of rows per status, e.g. {'pending': 12, 'paid': 40, ...}
+    - Read from the cache, one get_many round trip
+    - Any missing counter rebuilds all of them with one GROUP BY
+    """
+    keys = {status: _status_key(model, status) for status in _status_values(model)}
+    cached = cache.get_many(keys.values())
+    if len(cached) == len(keys):
+        return {status: cached[key] for status, key in keys.items()}
+
+    counts = dict.fromkeys(keys, 0)
+    rows = model._default_manager.order_by().values_list(STATUS_FIELD).annotate(total=Count('pk'))
+    counts.update({status: total for status, total in rows if status in counts})
+    cache.set_many({keys[status]: total for status, total in counts.items()}, FACET_TIMEOUT)
+    return counts
+
+
+def status_choices_with_counts(model):
+    """Status choices as (value, label, count) for snippets/filter.html"""
+    counts = status_counts(model)
+    return [(value, label, counts.get(value, 0)) for value, label in model._meta.get_field(STATUS_FIELD).choices]
+
+
+def _bump(model, status, delta):
+    if not status:
+        return
+    try:
+        cache.incr(_status_key(model, status), delta)
+    except ValueError:
+        # Counter not cached (evicted / never read / DummyCache), next read rebuilds it
+        pass
+
+
+def _forget(model):
+    cache.delete_many([_status_key(model, status) for status in _status_values(model)])
+
+
+def _remember_status(sender, instance, **kwargs):
+    # Skip deferred status (.only()/.defer()), reading it here would cost a query per row
+    instance._facet_status = instance.__dict__.get(STATUS_FIELD)
+
+
+def _status_saved(sender, instance, created, **kwargs):
+    old, new = getattr(instance, '_facet_status', None), getattr(instance, STATUS_FIELD)
+    instance._facet_status = new
+    if created:
+        transaction.on_commit(partial(_bump, sender, new, 1))
+    elif old is None:
+        # Previous status unknown (loaded deferred), drop the counters and let the next read rebuild
+        transaction.on_commit(partial(_forget, sender))
+    elif old != new:
+        transaction.on_commit(partial(_bump, sender, old, -1))
+        transaction.on_commit(partial(_bump, sender, new, 1))
+
+
+def _status_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(_bump, sender, getattr(instance, '_facet_status', None), -1))
+
+
+def track_status_counts(model):
+    """
+    Keep status_counts(model) current from save/delete signals
+    - memcached incr/decr, applied after the transaction commits
+    - call it once per model from the app's signals module
+    """
+    uid = f'facets:{model._meta.label_lower}'
+    post_init.connect(_remember_status, sender=model, dispatch_uid=uid)
+    post_save.connect(_status_saved, sender=model, dispatch_uid=uid)
+    post_delete.connect(_status_deleted, sender=model, dispatch_uid=uid)
@@ -1,6 +1,55 @@
 # coding=utf-8
 from django import forms
-from django.forms import ModelForm
+from django.db import router, transaction
+from django.dispatch import Signal
+from django.forms import BaseInlineFormSet, ModelForm
+
+# Sent by BulkInlineFormSet after its queries, in place of the rows' post_save/post_delete
+# sender: the row model, parent: the formset's instance, objects: created, changed and deleted rows
+formset_bulk_saved = Signal()
+
+
+class BulkInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset that saves its rows in bulk: one INSERT for the new rows (bulk_create),
+    one UPDATE for the changed ones (bulk_update) and one QuerySet.delete() for the deleted ones
+    - the rows' save() and post_save signals are skipped: the model's calculate_row_totals()
+      does save()'s work in memory, receivers of formset_bulk_saved do the signals' work once
+      for the whole formset (parent total, cached PDFs)
+    - the deleted rows keep their cascades and pre/post_delete signals, like formset.save()
+    - same rows, values and return value as formset.save()
+    - for models without pre_save/post_save receivers beyond those
+    """
+    def save(self, commit=True):
+        # commit=False: the forms validated into instances, the parent set on the new ones,
+        # new_objects, changed_objects and deleted_objects filled, nothing written
+        instances = super().save(commit=False)
+        if not commit:
+            return instances
+
+        for obj in instances:
+            obj.calculate_row_totals()
+        changed = [obj for obj, changed_data in self.changed_objects]
+        fields = [field.name for field in self.model._meta.concrete_fields if not field.primary_key]
+        using = router.db_for_write(self.model, instance=self.instance)
+        manager = self.model._base_manager.db_manager(using)
+        with transaction.atomic(using=using, savepoint=False):
+            if self.new_objects:
+                manager.bulk_create(self.new_objects)
+            if changed:
+                manager.bulk_update(changed, fields)
+            if self.deleted_objects:
+                manager.filter(pk__in=[obj.pk for obj in self.deleted_objects]).delete()
+            self.save_m2m()
+
+        objects = [*self.new_objects, *changed, *self.deleted_objects]
+        if objects:
+            formset_bulk_saved.send(sender=self.model, parent=self.instance, objects=objects)
+        # Like Model.delete()
+        for obj in self.deleted_objects:
+            obj.pk = None
+        return instances
+
 
 # from .models import *
 
@@ -0,0 +1,344 @@
+import datetime
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+from urllib.parse import urlparse
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.urls import get_resolver, resolve, reverse
+
+from apps.app_customers.models import CustomersModel, CustomerTenantModel
+from apps.app_employee.models import EmployeesModel
+from apps.app_invoices.models import InvoiceModel
+from apps.app_po.models import PurchaseOrderModel
+from apps.app_quotations.models import QuotationInformationModel, QuotationItemsModel
+from apps.common.numbering import DOCUMENT_NUMBER_YEARLY, SERIES
+from apps.users.models import User
+
+SEED_PREFIX = 'BENCHW'
+BENCH_USERNAME = 'bench-writer'
+# Documents created per kind: the model the IDs live in and the ID kwarg of the success redirect URL
+KINDS = {
+    'quotation': (QuotationInformationModel, 'quotation_id'),
+    'po': (PurchaseOrderModel, 'po_id'),
+}
+LOCK_SAMPLE_INTERVAL = 0.01
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates quotations and POs with N parallel writers (threads, then processes) through the real '
+        'create views, reports throughput, p50/p99 latency and the time spent waiting on row locks, and '
+        'fails when a document ID is duplicated or skipped. Run it against a copy of the PostgreSQL '
+        'database: the created documents are deleted afterwards, the numbers they used are not given back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writers', type=int, default=8,
+            help='Parallel writers (default 8)',
+        )
+        parser.add_argument(
+            '--per-writer', type=int, default=25,
+            help='Documents each writer creates, one after the other (default 25)',
+        )
+        parser.add_argument(
+            '--modes', default='threads,processes',
+            help='Writer kinds to run, comma separated: threads, processes (default both)',
+        )
+        parser.add_argument(
+            '--kinds', default='quotation,po',
+            help=f"Documents to create, comma separated: {', '.join(KINDS)} (default all)",
+        )
+        parser.add_argument(
+            '--items', type=int, default=5,
+            help='Line items per document (default 5)',
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Keep the created documents and the bench user',
+        )
+
+    def handle(self, *args, **options):
+        modes = options['modes'].split(',')
+        kinds = options['kinds'].split(',')
+        if set(modes) - {'threads', 'processes'} or set(kinds) - set(KINDS):
+            raise CommandError('Unknown --modes or --kinds value')
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f'Database is {connection.vendor}, not PostgreSQL: writers are serialized by the database '
+                f'and lock waits are not measured'
+            ))
+
+        employee = bench_employee()
+        created = {kind: [] for kind in kinds}
+        problems = 0
+        try:
+            for mode in modes:
+                for kind in kinds:
+                    result = self.run(mode, kind, employee, options)
+                    created[kind].extend(result['ids'])
+                    problems += result['errors'] + self.check_ids(kind, result['ids'])
+        finally:
+            if not options['keep']:
+                cleanup(employee, created)
+
+        if problems:
+            raise CommandError(f'{problems} failed request(s) or numbering problem(s)')
+        self.stdout.write(self.style.SUCCESS('Every document was created with a unique, gapless ID'))
+
+    def run(self, mode, kind, employee, options):
+        writers, per_writer = options['writers'], options['per_writer']
+        count = writers * per_writer
+        if kind == 'po':
+            targets = seed_invoices(count, options['items'], employee)
+        else:
+            targets = [options['items']] * count
+        jobs = [
+            (kind, employee.user_id, writer, targets[writer::writers])
+            for writer in range(writers)
+        ]
+
+        if mode == 'threads':
+            executor = ThreadPoolExecutor(max_workers=writers)
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=writers,
+                mp_context=multiprocessing.get_context('spawn'),
+                # DJANGO_SETTINGS_MODULE comes with the environment, this module can only be
+                # imported once Django is set up
+                initializer=django.setup,
+            )
+        with executor:
+            if mode == 'processes':
+                # Start every process (django.setup(), URLconf) before the clock starts
+                list(executor.map(_ready, range(writers)))
+            sampler = LockWaitSampler()
+            sampler.start()
+            started = time.perf_counter()
+            results = [row for rows in executor.map(_writer_job, jobs) for row in rows]
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+
+        latencies = [latency for latency, status, document_id in results]
+        ids = [document_id for latency, status, document_id in results if document_id]
+        errors = len(results) - len(ids)
+        lock_wait = sampler.waited
+        self.stdout.write(
+            f'{mode:<9} {kind:<9} {writers} writers x {per_writer}: '
+            f'{len(ids) / elapsed:7.1f} docs/s  p50 {percentile(latencies, 50):7.1f}ms  '
+            f'p99 {percentile(latencies, 99):7.1f}ms  '
+            f"lock wait {'n/a' if lock_wait is None else f'{lock_wait:.2f}s'}  errors {errors}"
+        )
+        return {'ids': ids, 'errors': errors}
+
+    def check_ids(self, kind, ids):
+        """Duplicates, and numbers missing between the lowest and highest ID that no other document took"""
+        model, field = KINDS[kind]
+        series = SERIES[kind]
+        problems = 0
+
+        duplicates = len(ids) - len(set(ids))
+        if duplicates:
+            problems += duplicates
+            self.stdout.write(self.style.ERROR(f'FAIL {kind}: {duplicates} duplicated ID(s)'))
+
+        numbers = {int(document_id.rsplit('-', 1)[-1].removeprefix(series.prefix)) for document_id in ids}
+        if numbers:
+            year = datetime.date.today().year if kind in DOCUMENT_NUMBER_YEARLY else None
+            missing = [series.format(number, year) for number in range(min(numbers), max(numbers) + 1)
+                       if number not in numbers]
+            # Created meanwhile by someone else, not a gap
+            taken = set(model.objects.filter(**{f'{field}__in': missing}).values_list(field, flat=True))
+            skipped = [document_id for document_id in missing if document_id not in taken]
+            if skipped:
+                problems += len(skipped)
+                self.stdout.write(self.style.ERROR(f"FAIL {kind}: skipped {', '.join(skipped[:10])}"))
+        return problems
+
+
+class LockWaitSampler(threading.Thread):
+    """
+    Total time the database's backends spent waiting on locks (row locks of the ID counters,
+    the totals updates...), sampled from pg_stat_activity every LOCK_SAMPLE_INTERVAL seconds
+    """
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.waited = 0.0 if connection.vendor == 'postgresql' else None
+        self.stopped = threading.Event()
+
+    def run(self):
+        if self.waited is None:
+            return
+        try:
+            with connection.cursor() as cursor:
+                while not self.stopped.wait(LOCK_SAMPLE_INTERVAL):
+                    cursor.execute(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                    self.waited += cursor.fetchone()[0] * LOCK_SAMPLE_INTERVAL
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)] if ordered else 0.0
+
+
+def bench_employee():
+    user, created = User.objects.get_or_create(username=BENCH_USERNAME, defaults={'email': 'bench@example.com'})
+    if created:
+        user.set_unusable_password()
+        user.save()
+    employee, created = EmployeesModel.objects.get_or_create(user=user, defaults={
+        'employee_name': SEED_PREFIX, 'employee_lastname': SEED_PREFIX, 'department': SEED_PREFIX, 'signature': '',
+    })
+    return employee
+
+
+def seed_invoices(count, items, employee):
+    """
+    `count` quotation -> invoice chains without a PO, each with its own customer (a PO owns
+    its customer), the POs are then created from them. IDs use a prefix real data never uses.
+    """
+    start = CustomersModel.objects.filter(customer_id__startswith=SEED_PREFIX).count()
+    today = datetime.date.today()
+    price = Decimal('125.50')
+    customers = CustomersModel.objects.bulk_create([
+        CustomersModel(
+            customer_id=f'{SEED_PREFIX}{n:07d}', company_name=f'Bench Company {n}', contact_person_name='Bench Contact',
+            phone_number='20000000', email='bench@example.com', company_address='Vientiane',
+        )
+        for n in range(start, start + count)
+    ])
+    quotations = QuotationInformationModel.objects.bulk_create([
+        QuotationInformationModel(
+            quotation_id=f'{SEED_PREFIX}-Q{n:07d}', customer=customer, created_by=employee,
+            status=QuotationInformationModel.Status.COMPLETED,
+            start_date=today, end_date=today + datetime.timedelta(days=365), total_all_products=price * items * 12,
+        )
+        for n, customer in enumerate(customers, start)
+    ])
+    QuotationItemsModel.objects.bulk_create([
+        QuotationItemsModel(
+            common_information=quotation, product_name=f'Microsoft 365 Business Standard, line {i + 1}',
+            price=price, qty=1, period=12, total_one_product=price * 12,
+        )
+        for quotation in quotations for i in range(items)
+    ])
+    invoices = InvoiceModel.objects.bulk_create([
+        InvoiceModel(
+            invoice_id=f'{SEED_PREFIX}-I{n:07d}', quotation=quotation, created_by=employee,
+            status=InvoiceModel.InvoiceStatus.PENDING,
+            issue_date=today, due_date=today + datetime.timedelta(days=30),
+        )
+        for n, quotation in enumerate(quotations, start)
+    ])
+    return [invoice.invoice_id for invoice in invoices]
+
+
+def cleanup(employee, created):
+    """Delete the benchmark's documents: deleting a customer deletes its whole chain"""
+    customer_ids = set(CustomersModel.objects.filter(customer_id__startswith=SEED_PREFIX).values_list('pk', flat=True))
+    customer_ids.update(
+        QuotationInformationModel.objects.filter(quotation_id__in=created.get('quotation', []))
+        .values_list('customer_id', flat=True)
+    )
+    tenant_ids = list(CustomersModel.objects.filter(pk__in=customer_ids).exclude(tenant=None).values_list('tenant_id', flat=True))
+    CustomersModel.objects.filter(pk__in=customer_ids).delete()
+    CustomerTenantModel.objects.filter(pk__in=tenant_ids).delete()
+    employee.delete()
+    User.objects.filter(pk=employee.user_id).delete()
+
+
+def quotation_data(writer, n, items):
+    """POST data of the create quotation page"""
+    today = datetime.date.today()
+    data = {
+        'start_date': today, 'end_date': today + datetime.timedelta(days=365), 'status': 'pending',
+        'company_name': f'Bench {writer} {n}', 'contact_person_name': 'Bench Contact', 'phone_number': '20000000',
+        'email': 'bench@example.com', 'company_address': 'Vientiane',
+        'items-TOTAL_FORMS': items, 'items-INITIAL_FORMS': 0, 'items-MIN_NUM_FORMS': 0, 'items-MAX_NUM_FORMS': 1000,
+        'additional-TOTAL_FORMS': 1, 'additional-INITIAL_FORMS': 0, 'additional-MIN_NUM_FORMS': 0,
+        'additional-MAX_NUM_FORMS': 1,
+        'additional-0-it_service_percent': 10, 'additional-0-vat_percent': 10, 'additional-0-exchange_rate': 21500,
+    }
+    for i in range(items):
+        data.update({
+            f'items-{i}-product_name': f'Microsoft 365 Business Standard, line {i + 1}',
+            f'items-{i}-price': '125.50', f'items-{i}-qty': 1, f'items-{i}-period': 12,
+        })
+    return data
+
+
+def po_data(invoice_id, writer, n):
+    """POST data of the create PO page, items prefilled from the quotation like the page does"""
+    from apps.app_po.views import PurchaseOrderCreateView
+
+    invoice = InvoiceModel.objects.select_related('quotation').get(invoice_id=invoice_id)
+    view = PurchaseOrderCreateView()
+    view.quotation = invoice.quotation
+    formset = view._create_items_formset()
+    data = {formset.management_form.add_prefix(name): value for name, value in formset.management_form.initial.items()}
+    for form in formset.forms:
+        for name in form.fields:
+            value = form[name].value()
+            if value is not None:
+                data[form.add_prefix(name)] = value
+    data.update({
+        'customer': invoice.quotation.customer_id, 'quotation': invoice.quotation_id, 'invoice': invoice.pk,
+        'billing_plan': 'anual', 'start_date': datetime.date.today(), 'status': 'pending',
+        'tenant_name': f'Bench {writer} {n}', 'tenant_domain': f'bench-{writer}-{n}.example.com',
+    })
+    return data
+
+
+def _writer_job(job):
+    """
+    One writer: logs in, then creates its documents one after the other through the views
+    - [(latency ms, status code, document ID or None)], the ID comes from the success redirect
+    - runs in a thread or a spawned process, one X-Forwarded-For per writer: the views are
+      rate limited per client address
+    """
+    from django.test import Client
+
+    kind, user_pk, writer, targets = job
+    client = Client(raise_request_exception=False, HTTP_X_FORWARDED_FOR=f'10.99.{writer // 256}.{writer % 256}')
+    client.force_login(User.objects.get(pk=user_pk))
+    _, id_kwarg = KINDS[kind]
+    results = []
+    try:
+        for n, target in enumerate(targets):
+            if kind == 'quotation':
+                url, data = reverse('app_quotations:create_quotation'), quotation_data(writer, n, target)
+            else:
+                url, data = reverse('app_po:create_po_from_invoice', args=[target]), po_data(target, writer, n)
+            started = time.perf_counter()
+            response = client.post(url, data)
+            latency = (time.perf_counter() - started) * 1000
+            document_id = None
+            if response.status_code == 302:
+                document_id = resolve(urlparse(response['Location']).path).kwargs.get(id_kwarg)
+            results.append((latency, response.status_code, document_id))
+    finally:
+        connections.close_all()
+    return results
+
+
+def _ready(_):
+    # The URLconf imports every view, once per process
+    get_resolver().url_patterns
+    return os.getpid()
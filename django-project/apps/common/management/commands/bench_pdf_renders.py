@@ -0,0 +1,234 @@
+import datetime
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import time
+from decimal import Decimal
+
+import weasyprint
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.app_customers.models import CustomersModel
+from apps.app_employee.models import EmployeesModel
+from apps.app_invoices.models import InvoiceModel
+from apps.app_po.models import ApprovedPOModel, PurchaseOrderItemsModel, PurchaseOrderModel
+from apps.app_quotations.models import AdditionalExpensesModel, QuotationInformationModel, QuotationItemsModel
+from apps.common.bundles import load_document_bundle
+from apps.common.pdf import build_pdf
+from apps.common.pdf_archive import PDF_VIEWS
+
+BASELINE_PATH = os.path.join(settings.BASE_DIR, 'benchmarks', 'pdf_renders.json')
+SEED_PREFIX = 'BENCH'
+# Compared against the baseline, output size and RSS included: a heavier image or font shows there first
+METRICS = ('p50_ms', 'p95_ms', 'peak_rss_mb', 'size_kb')
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders every PDF template with 1, 50 and 500 line items (seeded, rolled back), reports '
+        'p50/p95 time, peak RSS and output size, and fails when a result is worse than the baseline '
+        'JSON by more than --tolerance.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items', default='1,50,500',
+            help='Line item counts to seed, comma separated (default 1,50,500)',
+        )
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Timed renders per template and item count, after one warm-up render (default 5)',
+        )
+        parser.add_argument(
+            '--baseline', default=BASELINE_PATH,
+            help=f'Baseline JSON file (default {os.path.relpath(BASELINE_PATH, settings.BASE_DIR)})',
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Write the results as the new baseline instead of comparing',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed regression per metric, 0.25 = 25%% worse than the baseline (default 0.25)',
+        )
+
+    def handle(self, *args, **options):
+        item_counts = [int(count) for count in options['items'].split(',')]
+        results = {}
+        with transaction.atomic():
+            for count in item_counts:
+                document_ids = seed_chain(count)
+                for view_class in PDF_VIEWS:
+                    view = view_class()
+                    bundle = load_document_bundle(view.bundle_kind, document_ids[view.bundle_kind])
+                    key = f'{os.path.basename(view.template_name)} x{count}'
+                    results[key] = measure(view, bundle, options['runs'])
+                    self.stdout.write(f'{key:<55} ' + '  '.join(f'{m} {results[key][m]:>8}' for m in METRICS))
+            transaction.set_rollback(True)
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results, options['runs'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(self.style.WARNING('No baseline yet, run again with --save-baseline to store one'))
+            return
+        regressions = self.compare(options['baseline'], results, options['tolerance'])
+        if regressions:
+            raise CommandError(f'{regressions} PDF render metric(s) regressed beyond the baseline')
+        self.stdout.write(self.style.SUCCESS('PDF renders are within the baseline'))
+
+    def compare(self, path, results, tolerance):
+        with open(path) as f:
+            baseline = json.load(f)
+        if baseline['meta']['machine'] != machine():
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded on {baseline['meta']['machine']}, numbers may not be comparable"
+            ))
+
+        regressions = 0
+        for key, metrics in results.items():
+            expected = baseline['results'].get(key)
+            if expected is None:
+                self.stdout.write(f'new  {key}')
+                continue
+            for metric in METRICS:
+                limit = expected[metric] * (1 + tolerance)
+                if metrics[metric] > limit:
+                    regressions += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'FAIL {key} {metric}: {metrics[metric]} > {expected[metric]} (+{tolerance:.0%})'
+                    ))
+        return regressions
+
+
+def measure(view, bundle, runs):
+    context = view.get_pdf_context(bundle)
+    stylesheets = view.get_stylesheets()
+    # Warm-up: fonts, parsed stylesheets and images are per process, not per render
+    build_pdf(view.template_name, context, stylesheets)
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pdf = build_pdf(view.template_name, context, stylesheets)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'p50_ms': round(percentile(timings, 50), 1),
+        'p95_ms': round(percentile(timings, 95), 1),
+        # Peak of the process so far, item counts run in ascending order so it tracks the biggest
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'size_kb': round(len(pdf) / 1024, 1),
+    }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def machine():
+    return f"{platform.machine()} {platform.system()}, Python {platform.python_version()}, " \
+           f"WeasyPrint {getattr(weasyprint, '__version__', '?')}"
+
+
+def save_baseline(path, results, runs):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        'meta': {'machine': machine(), 'runs': runs, 'created': datetime.date.today().isoformat()},
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def seed_chain(items):
+    """
+    One quotation -> invoice -> PO chain with `items` line items on the quotation and the PO
+    - bulk_create skips the ID signals, IDs use a prefix real data never uses
+    - signature and stamp images are borrowed from existing rows when there are some,
+      so the renders decode real images
+    """
+    employee = EmployeesModel.objects.exclude(signature='').first() or EmployeesModel.objects.create(
+        employee_name=SEED_PREFIX, employee_lastname=SEED_PREFIX, department=SEED_PREFIX, signature=''
+    )
+    approver = ApprovedPOModel.objects.exclude(stamp='').exclude(stamp=None).first()
+    today = datetime.date.today()
+    price = Decimal('125.50')
+
+    customer = CustomersModel.objects.bulk_create([CustomersModel(
+        customer_id=f'{SEED_PREFIX}{items:07d}',
+        company_name=f'Bench Company {items}',
+        contact_person_name='Bench Contact',
+        phone_number='20000000',
+        email='bench@example.com',
+        company_address='Vientiane',
+    )])[0]
+    quotation = QuotationInformationModel.objects.bulk_create([QuotationInformationModel(
+        quotation_id=f'{SEED_PREFIX}-Q{items:07d}',
+        customer=customer,
+        created_by=employee,
+        status='pending',
+        start_date=today,
+        end_date=today + datetime.timedelta(days=365),
+        total_all_products=price * items * 12,
+    )])[0]
+    QuotationItemsModel.objects.bulk_create([
+        QuotationItemsModel(
+            common_information=quotation,
+            product_name=f'Microsoft 365 Business Standard, licence line {i + 1}',
+            price=price,
+            qty=1,
+            period=12,
+            total_one_product=price * 12,
+        )
+        for i in range(items)
+    ])
+    # save() computes the IT service / VAT / grand total columns
+    AdditionalExpensesModel(common_information=quotation, it_service_percent=10, vat_percent=10, exchange_rate=21500).save()
+
+    invoice = InvoiceModel.objects.bulk_create([InvoiceModel(
+        invoice_id=f'{SEED_PREFIX}-I{items:07d}',
+        quotation=quotation,
+        created_by=employee,
+        status='pending',
+        issue_date=today,
+        due_date=today + datetime.timedelta(days=30),
+    )])[0]
+    po = PurchaseOrderModel.objects.bulk_create([PurchaseOrderModel(
+        po_id=f'{SEED_PREFIX}-P{items:07d}',
+        customer=customer,
+        quotation=quotation,
+        invoice=invoice,
+        created_by=employee,
+        approved_by=approver,
+        status='pending',
+        start_date=today,
+        total_all_products=price * items * 12,
+    )])[0]
+    PurchaseOrderItemsModel.objects.bulk_create([
+        PurchaseOrderItemsModel(
+            purchase_order=po,
+            product_name=f'Microsoft 365 Business Standard, licence line {i + 1}',
+            price=price,
+            qty=1,
+            period=12,
+            total_one_product=price * 12,
+        )
+        for i in range(items)
+    ])
+    return {'quotation': quotation.quotation_id, 'invoice': invoice.invoice_id, 'po': po.po_id}
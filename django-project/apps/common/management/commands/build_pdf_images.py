@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+
+from apps.common.pdf_images import PDF_STATIC_IMAGES, build_pdf_image
+from apps.common.signals import PDF_IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Builds the print sized PDF copies of every uploaded signature and stamp and of the '
+        'static logos, for the images uploaded before the copies were made on upload.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Images converted in parallel (default: CPU count)',
+        )
+
+    def handle(self, *args, **options):
+        paths = {finders.find(name) for name in PDF_STATIC_IMAGES} - {None}
+        for model, fields in PDF_IMAGE_FIELDS.items():
+            for name in fields:
+                field = model._meta.get_field(name)
+                uploads = model.objects.exclude(**{name: ''}).exclude(**{name: None}).values_list(name, flat=True)
+                paths.update(field.storage.path(upload) for upload in uploads.iterator())
+
+        before = after = missing = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {path: executor.submit(build_pdf_image, path) for path in sorted(paths)}
+            for path, future in futures.items():
+                try:
+                    derivative = future.result()
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{path}: {error}')
+                    continue
+                before += os.path.getsize(path)
+                after += os.path.getsize(derivative)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(paths) - missing - failed} images ready, {before / 1024 / 1024:.1f}MB -> {after / 1024 / 1024:.1f}MB'
+            f' ({missing} missing files, {failed} failed)'
+        ))
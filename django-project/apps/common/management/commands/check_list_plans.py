@@ -0,0 +1,220 @@
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+from apps.app_contracts.models import ContractsModel
+from apps.app_customers.models import CustomersModel
+from apps.app_employee.models import EmployeesModel
+from apps.app_invoices.models import InvoiceModel
+from apps.app_po.models import PurchaseOrderModel
+from apps.app_quotations.models import QuotationInformationModel
+from apps.common.search import build_search_document
+
+# Full table scans, per database vendor
+SEQ_SCAN_RE = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)\s*$', re.MULTILINE),
+}
+
+# List views and the GET params the filter bar sends
+LIST_VIEWS = {
+    'apps.app_quotations.views.HomeView': [
+        {},
+        {'status': 'pending'},
+        {'status': 'pending', 'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+    ],
+    'apps.app_invoices.views.InvoiceListView': [
+        {},
+        {'status': 'unpaid'},
+        {'status': 'unpaid', 'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+        {'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+    ],
+    'apps.app_po.views.HomeView': [
+        {},
+        {'status': 'pending'},
+        {'status': 'pending', 'start_date': '2024-01-01'},
+    ],
+    'apps.app_contracts.views.ContractsListView': [
+        {},
+        {'status': 'Active'},
+        {'status': 'Active', 'start_contract': '2024-01-01', 'end_contract': '2024-03-31'},
+    ],
+    'apps.app_customers.views.HomeView': [
+        {},
+    ],
+}
+
+# Search box, only indexed on PostgreSQL (trigram / tsvector)
+SEARCH_PARAMS = {'search': 'Seed Company 000042'}
+
+SEED_PREFIX = 'EXPLAIN'
+QUOTATION_STATUSES = ['pending', 'completed', 'rejected', 'cancelled', 'banned']
+INVOICE_STATUSES = ['pending', 'unpaid', 'paid', 'rejected', 'cancelled']
+PO_STATUSES = ['pending', 'completed', 'rejected', 'cancelled', 'banned']
+CONTRACT_STATUSES = ['Draft', 'Active', 'Expired', 'Banned']
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs EXPLAIN on the SQL of every list view (default list, status filter, status + date range) '
+        'over a seeded dataset and fails if any plan falls back to a sequential scan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=5000,
+            help='Documents to seed per table, 0 checks the existing data only (default 5000)',
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Keep the seeded rows, by default everything is rolled back',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print every plan, not only the failing ones',
+        )
+
+    def handle(self, *args, **options):
+        seq_scan_re = SEQ_SCAN_RE.get(connection.vendor)
+        if seq_scan_re is None:
+            raise CommandError(f'EXPLAIN check is not supported on {connection.vendor}')
+
+        with transaction.atomic():
+            if options['rows']:
+                self.stdout.write(f"Seeding {options['rows']} rows per table...")
+                seed(options['rows'])
+                analyze()
+            failures = self.check_plans(seq_scan_re, options['verbose_plans'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{failures} list query plan(s) use a sequential scan')
+        self.stdout.write(self.style.SUCCESS('All list query plans use indexes'))
+
+    def check_plans(self, seq_scan_re, verbose):
+        factory = RequestFactory()
+        failures = 0
+        for view_path, scenarios in LIST_VIEWS.items():
+            view_class = import_string(view_path)
+            if connection.vendor == 'postgresql':
+                scenarios = [*scenarios, SEARCH_PARAMS]
+            for params in scenarios:
+                view = view_class()
+                view.setup(factory.get('/', params))
+                plan = list_page_queryset(view).explain()
+                scans = seq_scan_re.findall(plan)
+                label = f'{view_path} {params or "(no filter)"}'
+                if scans:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"FAIL {label}: sequential scan on {', '.join(scans)}"))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(f'ok   {label}')
+                    if verbose:
+                        self.stdout.write(plan)
+        return failures
+
+
+def list_page_queryset(view):
+    """The exact query KeysetPaginationMixin runs for the first page"""
+    queryset = view.get_queryset()
+    ordering = view.get_keyset_ordering(queryset)
+    return queryset.order_by(*ordering)[:view.paginate_by + 1]
+
+
+def seed(rows):
+    """
+    Seed `rows` customers with a quotation, invoice, PO and contract each
+    - bulk_create skips the ID signals, so IDs are set here with a prefix real data never uses
+    - dates are spread over ~3 years and statuses rotate, so filters are selective
+    """
+    employee = EmployeesModel.objects.create(
+        employee_name=SEED_PREFIX, employee_lastname=SEED_PREFIX, department=SEED_PREFIX, signature='x.png'
+    )
+    start = datetime.date(2023, 1, 1)
+
+    customers = CustomersModel.objects.bulk_create([
+        CustomersModel(
+            customer_id=f'{SEED_PREFIX}{i:07d}',
+            company_name=f'Seed Company {i:06d}',
+            contact_person_name=f'Seed Contact {i:06d}',
+            phone_number='20000000',
+            email=f'seed{i}@example.com',
+            company_address='Vientiane',
+            create_at=start + datetime.timedelta(days=i % 1000),
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+
+    quotations = QuotationInformationModel.objects.bulk_create([
+        QuotationInformationModel(
+            quotation_id=f'{SEED_PREFIX}-Q{i:07d}',
+            customer=customer,
+            created_by=employee,
+            status=QUOTATION_STATUSES[i % len(QUOTATION_STATUSES)],
+            start_date=start + datetime.timedelta(days=i % 1000),
+            end_date=start + datetime.timedelta(days=i % 1000 + 30),
+        )
+        for i, customer in enumerate(customers)
+    ], batch_size=1000)
+
+    invoices = []
+    for i, quotation in enumerate(quotations):
+        invoice = InvoiceModel(
+            invoice_id=f'{SEED_PREFIX}-I{i:07d}',
+            quotation=quotation,
+            created_by=employee,
+            status=INVOICE_STATUSES[i % len(INVOICE_STATUSES)],
+            issue_date=quotation.start_date,
+            due_date=quotation.end_date,
+        )
+        invoice.search_document = invoice.build_search_document()
+        invoices.append(invoice)
+    invoices = InvoiceModel.objects.bulk_create(invoices, batch_size=1000)
+
+    pos = []
+    for i, (quotation, invoice) in enumerate(zip(quotations, invoices)):
+        po = PurchaseOrderModel(
+            po_id=f'{SEED_PREFIX}-P{i:07d}',
+            customer=quotation.customer,
+            quotation=quotation,
+            invoice=invoice,
+            created_by=employee,
+            status=PO_STATUSES[i % len(PO_STATUSES)],
+            start_date=quotation.start_date,
+        )
+        po.search_document = po.build_search_document()
+        pos.append(po)
+    pos = PurchaseOrderModel.objects.bulk_create(pos, batch_size=1000)
+
+    contracts = []
+    for i, (quotation, invoice, po) in enumerate(zip(quotations, invoices, pos)):
+        contract = ContractsModel(
+            contract_id=f'{SEED_PREFIX}-C{i:07d}',
+            customer=quotation.customer,
+            created_by=employee,
+            quotation=quotation,
+            invoice=invoice,
+            po=po,
+            status=CONTRACT_STATUSES[i % len(CONTRACT_STATUSES)],
+            start_contract=quotation.start_date,
+            end_contract=quotation.start_date + datetime.timedelta(days=365),
+        )
+        contract.search_document = contract.build_search_document()
+        contracts.append(contract)
+    ContractsModel.objects.bulk_create(contracts, batch_size=1000)
+
+
+def analyze():
+    """Refresh planner statistics so the seeded rows count"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for model in (CustomersModel, QuotationInformationModel, InvoiceModel, PurchaseOrderModel, ContractsModel):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        else:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.app_invoices.forms import InvoiceListFilterForm
+from apps.app_invoices.models import InvoiceModel
+from apps.app_invoices.views import GenerateInvoicePDF, GenerateInvoicePDFNoSig, export_filename
+from apps.common.pdf_export import stream_pdf_zip
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes the PDFs of every invoice matching the invoice list filters (search, status, '
+        'issue_date range) into one ZIP file, same output as the export button of the list page.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--search', default='', help='Search box text')
+        parser.add_argument('--status', default='', help='Invoice status, e.g. paid')
+        parser.add_argument('--start-date', default='', help='First issue_date, YYYY-MM-DD')
+        parser.add_argument('--end-date', default='', help='Last issue_date, YYYY-MM-DD')
+        parser.add_argument(
+            '--no-signature', action='store_true',
+            help='Use the PDF template without the signature',
+        )
+        parser.add_argument(
+            '--output',
+            help='ZIP file to write (default invoices_<start>_<end>.zip in the current directory)',
+        )
+
+    def handle(self, *args, **options):
+        form = InvoiceListFilterForm({key: options[key] for key in ('search', 'status', 'start_date', 'end_date')})
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        filters = form.cleaned_data
+        invoice_ids = list(
+            InvoiceModel.objects.filter_list(**filters)
+            .order_by('issue_date', 'id')
+            .values_list('invoice_id', flat=True)
+        )
+        view_class = GenerateInvoicePDFNoSig if options['no_signature'] else GenerateInvoicePDF
+        output = options['output'] or export_filename(filters)
+
+        self.stdout.write(f'Exporting {len(invoice_ids)} invoices to {output}...')
+        with open(output, 'wb') as f:
+            for chunk in stream_pdf_zip(view_class, invoice_ids):
+                f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}'))
@@ -0,0 +1,12 @@
+# coding=utf-8
+import os
+
+
+def rss_mb(pid='self'):
+    """Resident memory of a process in MB, None where /proc is not available (not Linux)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
@@ -1,10 +1,12 @@
 # coding=utf-8
 from django.db import models
+from dataclasses import asdict
 from decimal import Decimal
-from django.db.models import Sum
 from django.utils import timezone as tz
 from apps.app_customers.models import CustomersModel
 from apps.app_employee.models import EmployeesModel
+from .pricing import line_total, price_expenses, reprice_quotation
+from .totals import settle_totals
 
 # Common models and utilities for the Django project
 # This file can contain shared models, utilities, or constants that are used across multiple apps.
@@ -26,17 +28,10 @@ class CommonInformationModelMixins(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING, verbose_name='ສະຖານະ')
     total_all_products = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), editable=False, blank=True, null=True, verbose_name='ລາຄາລວມທັງໝົດ')
 
-    # Calculate total_all_products based on related items
+    # Calculate total_all_products based on related items, and the additional payments with it
+    # called once per transaction from the items' signals (apps.common.totals)
     def calculate_total_all_products(self):
-        total_sum = self.items.aggregate(total=Sum('total_one_product'))['total']
-        # If no items are found, total_sum will be None
-        # We set it to 0.00 if it's None to avoid errors in calculations
-        if total_sum is None:
-            total_sum = Decimal('0.00')
-        
-        if self.total_all_products != total_sum:
-            self.total_all_products = total_sum
-            super(CommonInformationModelMixins, self).save(update_fields=['total_all_products'])
+        reprice_quotation(self)
 
     
 # Common ItemsModel for shared fields
@@ -53,21 +48,15 @@ class CommonItemsModelMixins(models.Model):
     total_one_product = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('1'), editable=False, blank=True, null=True, verbose_name='ລາຄາລວມ')
 
     # Calculate total_one_product based on price and qty
+    # also called by BulkInlineFormSet (apps.common.forms), that saves without save()
+    def calculate_row_totals(self):
+        self.total_one_product = line_total(self.price, self.qty, self.period)
+
     def save(self, *args, **kwargs):
-        if self.price is not None and self.qty is not None and self.period is not None:
-            self.total_one_product = self.price * self.qty * self.period
-        else:
-            self.total_one_product = Decimal('0.00')
+        self.calculate_row_totals()
         super().save(*args, **kwargs)
-
-        # After save the item, trigger the update of total_all_products in CommonInformationModel
-        self.common_information.calculate_total_all_products()
-    # Delete
-    def delete(self, *args, **kwargs):
-        # Get the related CommonInformationModel instance
-        common_info = self.common_information
-        super().delete(*args, **kwargs)
-        common_info.calculate_total_all_products()
+        # total_all_products of CommonInformationModel is updated from the post_save/post_delete
+        # signals, once per transaction (apps.common.totals)
 
 
 
@@ -92,33 +81,17 @@ class CommonAdditionalPaymentModelMixins(models.Model):
     grand_total = models.DecimalField(max_digits=20, decimal_places=0, default=Decimal('0.00'), editable=False, blank=True, null=True, verbose_name='ລາຄາລວມທັງໝົດ (ທັງໝົດ)')
 
     # Recalculate all outputs base on the total_all_products
-    def save(self, *args, **kwargs):
-        if self.common_information and self.common_information.total_all_products is not None:
-            self.total_all_product_ref = self.common_information.total_all_products
-        else:
-            self.total_all_product_ref = Decimal('0.00')
-        base_amount = self.total_all_product_ref
+    # also called by BulkInlineFormSet (apps.common.forms), that saves without save()
+    def calculate_row_totals(self):
+        # Items saved earlier in this transaction: total_all_products must be current first
+        if self.common_information_id:
+            settle_totals(self.common_information)
+        total_all_products = self.common_information.total_all_products if self.common_information_id else None
+        # IT service, VAT, exchange rate and grand total (apps.common.pricing)
+        price = price_expenses(total_all_products, self.it_service_percent, self.vat_percent, self.exchange_rate)
+        for name, value in asdict(price).items():
+            setattr(self, name, value)
 
-        # Calculate IT service output
-        if self.it_service_percent is not None:
-            self.it_service_output = base_amount * (Decimal(self.it_service_percent) / Decimal('100'))
-        else:
-            self.it_service_output = Decimal('0.00')
-        base_amount += self.it_service_output
-
-        # Calculate VAT output
-        if self.vat_percent is not None:
-            self.vat_output = base_amount * (Decimal(self.vat_percent) / Decimal('100'))
-        else:
-            self.vat_output = Decimal('0.00')
-        base_amount += self.vat_output
-
-        # Calculate Exchange rate output
-        if self.exchange_rate is not None:
-            self.exchange_rate_output = base_amount * (Decimal(self.exchange_rate))
-        else:
-            self.exchange_rate_output = Decimal('0.00')
-        
-        # Calculate Grand total
-        self.grand_total = base_amount
+    def save(self, *args, **kwargs):
+        self.calculate_row_totals()
         super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,98 @@
+# coding=utf-8
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.utils import timezone
+
+# Series that restart every year, their numbers carry the year: QUO2026-0000001
+DOCUMENT_NUMBER_YEARLY = set(getattr(settings, 'DOCUMENT_NUMBER_YEARLY', ()))
+
+
+@dataclass(frozen=True)
+class Series:
+    prefix: str
+    width: int
+    # Counter row of the series ('app_label.Model', field), the fallback on SQLite and
+    # the start value of the PostgreSQL sequence
+    counter_model: str
+    counter_field: str
+
+    def format(self, number, year=None):
+        if year is None:
+            return f'{self.prefix}{number:0{self.width}d}'
+        return f'{self.prefix}{year}-{number:0{self.width}d}'
+
+
+SERIES = {
+    'quotation': Series('QUO', 7, 'app_quotations.GenerateQuotationID', 'qotation_id_generator'),
+    'invoice': Series('INV', 7, 'app_invoices.GenerateInvoiceNumber', 'auto_invoice_number'),
+    'po': Series('PO-', 7, 'app_po.PoIdGeneratorModel', 'po_number_generator'),
+    'contract': Series('TVS-CON', 7, 'app_contracts.GenerateContractNumber', 'auto_generate_number'),
+    'customer': Series('CUS_ID', 5, 'app_customers.CustomersIdGenerator', 'customer_running_number'),
+}
+
+# Sequences known to exist (committed) on each database, per process
+_sequences = set()
+
+
+def next_number(kind):
+    """
+    The next document number of a series, e.g. next_number('invoice') -> 'INV0000042'
+    - PostgreSQL: nextval() of a sequence, no row lock is held until the end of the
+      transaction, creates in parallel do not wait for each other. A rolled back create
+      leaves a gap in the numbers.
+    - other databases (SQLite): the counter row, locked with select_for_update()
+    - series in DOCUMENT_NUMBER_YEARLY use one sequence / counter row per year
+    """
+    series = SERIES[kind]
+    year = timezone.localdate().year if kind in DOCUMENT_NUMBER_YEARLY else None
+    model = apps.get_model(series.counter_model)
+    alias = router.db_for_write(model)
+    if connections[alias].vendor == 'postgresql':
+        number = _sequence_next(alias, kind, year, model, series)
+    else:
+        number = _counter_next(alias, model, series, year)
+    return series.format(number, year)
+
+
+def _counter_key(year):
+    # Row 1 holds the plain series, yearly series use one row per year
+    return year or 1
+
+
+def _counter_next(alias, model, series, year):
+    with transaction.atomic(using=alias):
+        counter, created = model.objects.using(alias).select_for_update().get_or_create(pk=_counter_key(year))
+        number = getattr(counter, series.counter_field) + 1
+        setattr(counter, series.counter_field, number)
+        counter.save(update_fields=[series.counter_field])
+    return number
+
+
+def _sequence_next(alias, kind, year, model, series):
+    connection = connections[alias]
+    name = f'docnum_{kind}' if year is None else f'docnum_{kind}_{year}'
+    if (alias, name) not in _sequences:
+        _create_sequence(alias, name, model, series, year)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s)', [connection.ops.quote_name(name)])
+        return cursor.fetchone()[0]
+
+
+def _create_sequence(alias, name, model, series, year):
+    """
+    Create the sequence once, it continues from the counter row, so switching a database
+    from the counter rows to sequences keeps the numbering
+    """
+    counter = model.objects.using(alias).filter(pk=_counter_key(year)).values_list(series.counter_field, flat=True).first()
+    quoted = connections[alias].ops.quote_name(name)
+    try:
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {quoted} START WITH {(counter or 0) + 1:d}')
+    except DatabaseError:
+        # Created meanwhile by another transaction, IF NOT EXISTS does not cover that race
+        pass
+    # A sequence created in a transaction that rolls back disappears with it
+    transaction.on_commit(lambda: _sequences.add((alias, name)), using=alias)
@@ -0,0 +1,18 @@
+# coding=utf-8
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexIfPostgres(AddIndex):
+    """
+    AddIndex for PostgreSQL only indexes (GIN, trigram, tsvector)
+    - Migration state is always updated, so makemigrations stays clean
+    - The index is only created on PostgreSQL, the sqlite database skips it
+    """
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
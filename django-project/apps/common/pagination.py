@@ -0,0 +1,170 @@
+# coding=utf-8
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+
+# Direction stored inside the cursor
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class KeysetPage:
+    """
+    One page of a keyset (seek) paginated list
+    - Exposes the same has_next/has_previous names as Django's Page
+    - next_querystring/previous_querystring keep every other GET param (search, status, dates)
+    """
+    def __init__(self, object_list, has_next, has_previous, next_querystring='', previous_querystring=''):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_querystring = next_querystring
+        self.previous_querystring = previous_querystring
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginationMixin:
+    """
+    Keyset pagination for ListView
+    - Pages on the ordering the view already uses (order_by() in get_queryset, or Meta.ordering)
+      plus the primary key as tie-breaker, annotations (e.g. search_rank) are allowed as sort keys
+    - Each page is one `WHERE (sort_key, pk) < (last_sort_key, last_pk) LIMIT n+1` query,
+      no OFFSET scan and no COUNT(*), so page 500 costs the same as page 1
+    - Use with snippets/pagination.html
+    """
+    paginate_by = 20
+    cursor_kwarg = 'cursor'
+
+    def get_keyset_ordering(self, queryset):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        for field in ordering:
+            if not isinstance(field, str) or field == '?':
+                raise ImproperlyConfigured(
+                    f"{self.__class__.__name__} can only keyset paginate on plain field names, got {field!r}"
+                )
+        names = [field.lstrip('-') for field in ordering]
+        if 'pk' not in names and queryset.model._meta.pk.name not in names:
+            descending = ordering[0].startswith('-') if ordering else False
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_keyset_ordering(queryset)
+        direction, values = FORWARD, None
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor:
+            direction, values = self._decode_cursor(cursor, queryset, ordering)
+
+        forward = direction == FORWARD
+        if values is not None:
+            queryset = queryset.filter(_seek_filter(ordering, values, forward))
+        if forward:
+            queryset = queryset.order_by(*ordering)
+        else:
+            queryset = queryset.order_by(*[_reverse(field) for field in ordering])
+
+        # Fetch one extra row to know if there is more in the walking direction
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        page = KeysetPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_querystring=self._querystring(FORWARD, rows[-1], ordering) if has_next and rows else '',
+            previous_querystring=self._querystring(BACKWARD, rows[0], ordering) if has_previous and rows else '',
+        )
+        return (None, page, rows, page.has_other_pages())
+
+    def _querystring(self, direction, row, ordering):
+        params = self.request.GET.copy()
+        params[self.cursor_kwarg] = _encode_cursor(direction, [_row_value(row, field) for field in ordering])
+        return params.urlencode()
+
+    def _decode_cursor(self, cursor, queryset, ordering):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+            if direction not in (FORWARD, BACKWARD) or len(values) != len(ordering):
+                raise ValueError(cursor)
+            values = [_resolve_field(queryset, field).to_python(value) for field, value in zip(ordering, values)]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            raise Http404('Invalid page cursor')
+        return direction, values
+
+
+def _encode_cursor(direction, values):
+    raw = json.dumps([direction, values], cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _reverse(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def _row_value(row, field):
+    value = row
+    for part in field.lstrip('-').split('__'):
+        value = getattr(value, part)
+    return value
+
+
+def _resolve_field(queryset, field):
+    name = field.lstrip('-')
+    # annotations such as search_rank can be sort keys too
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    model = queryset.model
+    parts = name.split('__')
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    if parts[-1] == 'pk':
+        return model._meta.pk
+    return model._meta.get_field(parts[-1])
+
+
+def _seek_filter(ordering, values, forward):
+    """
+    Rows strictly after (forward) or before (backward) the cursor row, in ordering order:
+    (a < va) OR (a = va AND b < vb) OR ... with < / > picked per field direction
+    """
+    clauses = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        descending = field.startswith('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        clauses |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+
+    # Redundant bound on the leading key lets the planner range-scan its index
+    leading = ordering[0].lstrip('-')
+    lookup = 'lte' if ordering[0].startswith('-') == forward else 'gte'
+    return Q(**{f'{leading}__{lookup}': values[0]}) & clauses
@@ -0,0 +1,187 @@
+# coding=utf-8
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import get_template, render_to_string
+from weasyprint import HTML
+
+from .pdf_admission import admitted_render
+from .pdf_fetcher import PDF_BASE_URL, local_url_fetcher
+from .pdf_styles import file_version, font_config, stylesheet
+
+logger = logging.getLogger(__name__)
+
+# Rendered PDFs, one directory per quotation chain: <PDF_CACHE_DIR>/<quotation_id>/<fingerprint>.pdf
+PDF_CACHE_DIR = getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.BASE_DIR, 'pdf_cache'))
+# Bump to drop every cached PDF, e.g. after changing a logo or a CSS file linked from a template
+PDF_CACHE_VERSION = getattr(settings, 'PDF_CACHE_VERSION', '1')
+# memcached refuses values over 1MB, bigger PDFs are only kept on disk
+PDF_CACHE_MAX_MEMCACHED = 900 * 1024
+PDF_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def render_pdf(template_name, context, bundle, stylesheets=()):
+    """
+    Render a document PDF, or return the cached copy
+    - The cache key is a fingerprint of every row in `bundle` (document, items, customer,
+      expenses, employee signature...), the template source and the stylesheets, so an
+      edited document never gets a stale PDF, and identical input is rendered only once
+    - Lookup order: memcached, disk, WeasyPrint
+    - The output must depend on the bundle and template only, not on request.user
+    - Static and media assets are read from disk (apps.common.pdf_fetcher), a render
+      never sends HTTP requests back to our own server
+    - Renders are capped and get a deadline (apps.common.pdf_admission), a cache hit is not
+    """
+    fingerprint, pdf = render_cached_pdf(template_name, context, bundle, stylesheets)
+    return pdf
+
+
+def render_cached_pdf(template_name, context, bundle, stylesheets=()):
+    """render_pdf() returning (fingerprint, pdf), used by the PDF worker processes"""
+    fingerprint = pdf_fingerprint(bundle, template_name, stylesheets)
+    return fingerprint, cached_pdf(bundle, fingerprint, lambda: admitted_render(build_pdf, template_name, context, stylesheets))
+
+
+def render_merged_pdf(bundle, parts):
+    """
+    Several documents of one bundle in a single PDF, cached like render_pdf()
+    - parts: (template_name, context, stylesheets) tuples, in page order
+    """
+    fingerprints = [pdf_fingerprint(bundle, template_name, stylesheets) for template_name, _, stylesheets in parts]
+    fingerprint = hashlib.sha256(':'.join(['merged', *fingerprints]).encode()).hexdigest()
+    return cached_pdf(bundle, fingerprint, lambda: admitted_render(build_merged_pdf, parts))
+
+
+def cached_pdf(bundle, fingerprint, build):
+    """The PDF stored under `fingerprint`: memcached, then disk, then build() and store it"""
+    cache_key = f'pdf:{fingerprint}'
+    path = pdf_cache_path(bundle.quotation.pk, fingerprint)
+
+    pdf = cache.get(cache_key)
+    if pdf is not None:
+        return pdf
+
+    try:
+        with open(path, 'rb') as f:
+            pdf = f.read()
+    except FileNotFoundError:
+        pdf = build()
+        write_atomic(path, pdf)
+
+    if len(pdf) <= PDF_CACHE_MAX_MEMCACHED:
+        cache.set(cache_key, pdf, PDF_CACHE_TIMEOUT)
+    return pdf
+
+
+def build_pdf(template_name, context, stylesheets=()):
+    """The WeasyPrint render itself, no cache"""
+    return _html(template_name, context).write_pdf(
+        stylesheets=[stylesheet(path) for path in stylesheets], font_config=font_config()
+    )
+
+
+def build_merged_pdf(parts):
+    """
+    One PDF out of several templates, no cache
+    - each template is laid out with its own stylesheets, then all the pages are written
+      by one write_pdf(): a font used by every part is embedded once, and a logo shared
+      by the parts is decoded once (shared image cache) and embedded once
+    """
+    images = {}
+    documents = [
+        _html(template_name, context).render(
+            stylesheets=[stylesheet(path) for path in stylesheets], font_config=font_config(), cache=images
+        )
+        for template_name, context, stylesheets in parts
+    ]
+    pages = [page for document in documents for page in document.pages]
+    return documents[0].copy(pages).write_pdf()
+
+
+def _html(template_name, context):
+    return HTML(
+        string=render_to_string(template_name, context),
+        base_url=PDF_BASE_URL,
+        url_fetcher=local_url_fetcher,
+    )
+
+
+def pdf_cache_path(quotation_id, fingerprint):
+    return os.path.join(PDF_CACHE_DIR, safe_name(quotation_id), f'{fingerprint}.pdf')
+
+
+def pdf_response(pdf, filename, attachment=True):
+    response = HttpResponse(pdf, content_type='application/pdf')
+    display = 'attachment' if attachment else 'inline'
+    response['Content-Disposition'] = f'{display}; filename="{filename}"'
+    return response
+
+
+def pdf_fingerprint(bundle, template_name, stylesheets=()):
+    state = [
+        PDF_CACHE_VERSION,
+        template_name,
+        template_version(template_name),
+        [file_version(path) for path in stylesheets],
+        [_row_state(obj) for obj in _bundle_rows(bundle)],
+    ]
+    return hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name):
+    template = get_template(template_name)
+    source = getattr(getattr(template, 'template', None), 'source', template_name)
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def evict_pdf_cache(quotation_ids):
+    """Delete the cached PDFs of these quotation chains (memcached entries are unreachable once the fingerprint changes)"""
+    for quotation_id in set(quotation_ids):
+        shutil.rmtree(os.path.join(PDF_CACHE_DIR, safe_name(quotation_id)), ignore_errors=True)
+
+
+def _bundle_rows(bundle):
+    quotation, po, invoice, contract = bundle.quotation, bundle.purchase_order, bundle.invoice, bundle.contract
+    rows = [quotation, quotation.customer, quotation.customer.tenant, quotation.created_by, bundle.additional_expense]
+    rows += bundle.items
+    if invoice:
+        rows += [invoice, invoice.created_by]
+    if po:
+        rows += [po, po.customer, po.tenant, po.supplier, po.approved_by, po.created_by]
+        rows += bundle.po_items
+    if contract:
+        rows += [contract, contract.customer, contract.created_by]
+    return rows
+
+
+def _row_state(obj):
+    if obj is None:
+        return None
+    return [obj._meta.label_lower, *(field.value_from_object(obj) for field in obj._meta.concrete_fields)]
+
+
+def safe_name(value):
+    return re.sub(r'[^\w.-]', '_', str(value))
+
+
+def write_atomic(path, data):
+    # Concurrent renders of the same document must never expose a half written file
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.exception('Could not write PDF cache file %s', path)
@@ -0,0 +1,123 @@
+# coding=utf-8
+import logging
+import signal
+import threading
+from concurrent.futures import TimeoutError
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# WeasyPrint renders running at once in one server process, the others wait for a slot
+PDF_MAX_RENDERS = getattr(settings, 'PDF_MAX_RENDERS', 2)
+# Seconds a render waits for a slot before the view answers 503
+PDF_QUEUE_TIMEOUT = getattr(settings, 'PDF_QUEUE_TIMEOUT', 10)
+# Seconds one render may take, then it is interrupted and the view answers 504
+PDF_RENDER_DEADLINE = getattr(settings, 'PDF_RENDER_DEADLINE', 60)
+PDF_RETRY_AFTER = getattr(settings, 'PDF_RETRY_AFTER', 5)
+
+_slots = threading.BoundedSemaphore(PDF_MAX_RENDERS)
+# Set in the PDF worker processes (apps.common.pdf_jobs), they render in their main thread
+_in_worker = False
+
+
+class PdfBusy(Exception):
+    """No render slot freed up within PDF_QUEUE_TIMEOUT"""
+
+
+class PdfDeadlineExceeded(Exception):
+    """A render ran longer than PDF_RENDER_DEADLINE"""
+
+
+def mark_pdf_worker():
+    global _in_worker
+    _in_worker = True
+
+
+def admitted_render(fn, *args):
+    """
+    fn(*args), a WeasyPrint render, under the per-process limits above
+    - at most PDF_MAX_RENDERS at once, PdfBusy after waiting PDF_QUEUE_TIMEOUT (the
+      worker processes are single threaded, no limit there)
+    - in a web process the render runs on the PDF worker pool, where the deadline is a
+      SIGALRM: a thread stuck in WeasyPrint can not be stopped, a worker's main thread can.
+      With PDF_WORKERS = 0 that pool has one process, only used for these renders
+    - inline only in a main thread (management commands), under the same SIGALRM deadline
+    - fn and args must be picklable (module level function, model instances, paths)
+    """
+    from .pdf_jobs import pdf_jobs_enabled, submit
+
+    if _in_worker:
+        with render_deadline(PDF_RENDER_DEADLINE):
+            return fn(*args)
+
+    if not _slots.acquire(timeout=PDF_QUEUE_TIMEOUT):
+        raise PdfBusy(f'{PDF_MAX_RENDERS} PDF renders already running')
+    try:
+        # Inline only where SIGALRM can enforce the deadline
+        inline = not PDF_RENDER_DEADLINE or threading.current_thread() is threading.main_thread()
+        if not pdf_jobs_enabled() and inline:
+            with render_deadline(PDF_RENDER_DEADLINE):
+                return fn(*args)
+
+        future = submit(_deadline_job, PDF_RENDER_DEADLINE, fn, *args)
+        try:
+            # The worker stops the render itself, the margin covers the pool queue and pickling
+            return future.result(timeout=PDF_RENDER_DEADLINE + PDF_QUEUE_TIMEOUT if PDF_RENDER_DEADLINE else None)
+        except TimeoutError:
+            if future.cancel():
+                # Still queued behind async jobs and exports
+                raise PdfBusy('PDF worker pool busy')
+            raise PdfDeadlineExceeded(f'PDF render took more than {PDF_RENDER_DEADLINE}s')
+    finally:
+        _slots.release()
+
+
+@contextmanager
+def render_deadline(seconds=PDF_RENDER_DEADLINE):
+    """
+    Raise PdfDeadlineExceeded in the block after `seconds`
+    - SIGALRM, so main thread only: PDF workers and management commands, the web
+      server's request threads hand their renders to a PDF worker (admitted_render)
+    """
+    if not seconds or not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expired(signum, frame):
+        raise PdfDeadlineExceeded(f'PDF render took more than {seconds}s')
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _deadline_job(seconds, fn, *args):
+    """Runs in a PDF worker process, with the deadline of the web process"""
+    from django.db import connections
+    try:
+        with render_deadline(seconds):
+            return fn(*args)
+    finally:
+        connections.close_all()
+
+
+class PdfAdmissionMixin:
+    """PDF view mixin: PdfBusy answers 503 with Retry-After, PdfDeadlineExceeded answers 504"""
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except PdfBusy as error:
+            logger.warning('PDF render refused for %s: %s', request.path, error)
+            response = HttpResponse('ເຊີບເວີກຳລັງສ້າງ PDF ຫຼາຍເກີນໄປ, ກະລຸນາລອງໃໝ່ອີກຄັ້ງ', status=503)
+            response['Retry-After'] = str(PDF_RETRY_AFTER)
+            return response
+        except PdfDeadlineExceeded as error:
+            logger.error('PDF render stopped for %s: %s', request.path, error)
+            return HttpResponse('ເອກະສານນີ້ໃຊ້ເວລາສ້າງ PDF ດົນເກີນໄປ', status=504)
@@ -0,0 +1,130 @@
+# coding=utf-8
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.http import FileResponse, HttpResponse
+
+from .bundles import load_document_bundle
+from .pdf import build_pdf, render_pdf, safe_name, write_atomic
+from .pdf_admission import admitted_render
+from .pdf_styles import register_stylesheets
+
+# Once a document reaches one of these statuses its PDF never changes
+FINALIZED_STATUSES = {
+    'quotation': ('completed',),
+    'invoice': ('paid',),
+    'po': ('completed',),
+}
+# Archived PDFs: <PDF_ARCHIVE_DIR>/<kind>/<template>/<document_id>.pdf
+PDF_ARCHIVE_DIR = getattr(settings, 'PDF_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'pdf_archive'))
+# None: Django streams the file, 'x-accel-redirect' (nginx) or 'x-sendfile' (apache, lighttpd)
+PDF_SENDFILE = getattr(settings, 'PDF_SENDFILE', None)
+PDF_ACCEL_PREFIX = getattr(settings, 'PDF_ACCEL_PREFIX', '/protected/pdf_archive/')
+# The PDF views, registered from the apps' ready(), the admin action re-renders with them
+PDF_VIEWS = []
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def register_pdf_views(*view_classes):
+    """
+    Make DocumentPdfMixin views known to the admin action, the PDF benchmark and the
+    stylesheet warm-up, called from the app's AppConfig.ready()
+    """
+    for view_class in view_classes:
+        if view_class not in PDF_VIEWS:
+            PDF_VIEWS.append(view_class)
+            register_stylesheets(*view_class.pdf_stylesheets)
+
+
+def is_finalized(kind, bundle):
+    document = bundle.document(kind)
+    return document is not None and document.status in FINALIZED_STATUSES.get(kind, ())
+
+
+def archive_path(view, document_id):
+    template = os.path.splitext(os.path.basename(view.template_name))[0]
+    return os.path.join(PDF_ARCHIVE_DIR, view.bundle_kind, template, f'{safe_name(document_id)}.pdf')
+
+
+def archived_pdf(view, bundle, document_id, rerender=False):
+    """
+    Path of the archived PDF of a finalized document, rendered the first time only
+    - the file is never replaced afterwards, except by the admin action (rerender=True),
+      which also skips the PDF cache so a new logo or font is picked up
+    """
+    path = archive_path(view, document_id)
+    if rerender:
+        write_atomic(path, admitted_render(build_pdf, view.template_name, view.get_pdf_context(bundle), view.get_stylesheets()))
+    elif not os.path.exists(path):
+        write_atomic(path, render_pdf(view.template_name, view.get_pdf_context(bundle), bundle, view.get_stylesheets()))
+    return path
+
+
+def archive_response(request, path, filename):
+    """
+    Download response of an archived PDF
+    - with PDF_SENDFILE the front web server sends the file (and handles Range itself)
+    - otherwise a FileResponse (wsgi.file_wrapper when the server has one), or a 206
+      for a single `Range: bytes=a-b` request
+    """
+    if PDF_SENDFILE == 'x-accel-redirect':
+        response = HttpResponse(content_type='application/pdf')
+        response['X-Accel-Redirect'] = PDF_ACCEL_PREFIX + quote(os.path.relpath(path, PDF_ARCHIVE_DIR))
+    elif PDF_SENDFILE == 'x-sendfile':
+        response = HttpResponse(content_type='application/pdf')
+        response['X-Sendfile'] = path
+    else:
+        response = _range_response(request, path)
+        if response is None:
+            response = FileResponse(open(path, 'rb'), content_type='application/pdf')
+        response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _range_response(request, path):
+    # Only a single range is supported, anything else gets the whole file (allowed by RFC 9110)
+    match = RANGE_RE.match(request.headers.get('Range', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+
+    size = os.path.getsize(path)
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start + 1)
+    response = HttpResponse(data, status=206, content_type='application/pdf')
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def rerender_archived_pdfs(kind, id_field):
+    """Admin action: render the archived PDFs of the selected finalized documents again"""
+    @admin.action(description='ສ້າງ PDF ທີ່ເກັບໄວ້ໃໝ່')
+    def action(modeladmin, request, queryset):
+        views = [view_class() for view_class in PDF_VIEWS if view_class.bundle_kind == kind]
+        rendered = 0
+        for document_id in queryset.values_list(id_field, flat=True):
+            bundle = load_document_bundle(kind, document_id)
+            if not is_finalized(kind, bundle):
+                continue
+            for view in views:
+                archived_pdf(view, bundle, document_id, rerender=True)
+            rendered += 1
+        modeladmin.message_user(request, f'ສ້າງ PDF ໃໝ່ {rendered} ລາຍການ', messages.SUCCESS)
+
+    action.__name__ = 'rerender_archived_pdfs'
+    return action
@@ -0,0 +1,131 @@
+# coding=utf-8
+import logging
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+from .bundles import load_document_bundle
+from .pdf import pdf_cache_path, render_cached_pdf
+from .pdf_archive import archived_pdf, is_finalized
+from .pdf_jobs import PDF_WORKERS, pdf_jobs_enabled, submit
+
+logger = logging.getLogger(__name__)
+
+# Renders queued on the worker pool ahead of the ZIP writer, so a month of invoices
+# does not push every ?async=1 download to the back of the queue
+EXPORT_QUEUE_PER_WORKER = 4
+
+
+def pdf_zip_response(view_class, document_ids, filename):
+    """Streaming ZIP download of the PDFs of `document_ids`, rendered with `view_class`"""
+    response = StreamingHttpResponse(stream_pdf_zip(view_class, document_ids), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_pdf_zip(view_class, document_ids):
+    """
+    Generator of ZIP bytes, each PDF is added as soon as it is rendered
+    - only the entry being written is in memory, never the whole archive
+    - PDFs that failed are listed in errors.txt at the end of the archive
+    """
+    buffer = _ZipBuffer()
+    errors = []
+    # PDFs are already compressed inside, the fastest level is enough
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for document_id, path, error in iter_document_pdfs(view_class, document_ids):
+            if error is None:
+                try:
+                    archive.write(path, view_class.pdf_filename.format(id=document_id))
+                except OSError as write_error:
+                    # Evicted between the render and now (the document was edited)
+                    error = write_error
+            if error is not None:
+                logger.error('PDF export of %s failed: %s', document_id, error)
+                errors.append(f'{document_id}: {error}')
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors))
+    yield buffer.drain()
+
+
+def iter_document_pdfs(view_class, document_ids):
+    """
+    (document_id, path, error) of every document, in the order the renders finish
+    - rendered on the PDF worker pool, or one by one here when PDF_WORKERS = 0
+    - archived and cached PDFs are reused, see document_pdf_path()
+    """
+    view_path = f'{view_class.__module__}.{view_class.__qualname__}'
+    if not pdf_jobs_enabled():
+        for document_id in document_ids:
+            try:
+                yield document_id, document_pdf_path(view_path, document_id), None
+            except Exception as error:
+                yield document_id, None, error
+        return
+
+    pending = {}
+    queue = iter(document_ids)
+    try:
+        while True:
+            for document_id in queue:
+                pending[submit(_export_job, view_path, document_id)] = document_id
+                if len(pending) >= PDF_WORKERS * EXPORT_QUEUE_PER_WORKER:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                document_id = pending.pop(future)
+                try:
+                    yield document_id, future.result(), None
+                except Exception as error:
+                    yield document_id, None, error
+    finally:
+        # The client went away, do not render the rest for nobody
+        for future in pending:
+            future.cancel()
+
+
+def document_pdf_path(view_path, document_id):
+    """Path of a document PDF: the archive for a finalized document, otherwise the PDF cache"""
+    view = import_string(view_path)()
+    bundle = load_document_bundle(view.bundle_kind, document_id)
+    if is_finalized(view.bundle_kind, bundle):
+        path = archived_pdf(view, bundle, document_id)
+        if os.path.exists(path):
+            return path
+    fingerprint, _ = render_cached_pdf(view.template_name, view.get_pdf_context(bundle), bundle, view.get_stylesheets())
+    return pdf_cache_path(bundle.quotation.pk, fingerprint)
+
+
+def _export_job(view_path, document_id):
+    """Runs in a PDF worker process"""
+    from django.db import connections
+    try:
+        return document_pdf_path(view_path, document_id)
+    finally:
+        connections.close_all()
+
+
+class _ZipBuffer:
+    """Write-only file for ZipFile, without tell() ZipFile writes a streamable archive"""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
@@ -0,0 +1,118 @@
+# coding=utf-8
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Print sized copies of the images embedded in PDFs: <PDF_IMAGE_DIR>/<sha256[:2]>/<sha256>.png|jpg
+PDF_IMAGE_DIR = getattr(settings, 'PDF_IMAGE_DIR', os.path.join(settings.BASE_DIR, 'pdf_images'))
+# Longest side in pixels, 1000px is ~8.5cm at 300dpi, more than any logo or signature box
+PDF_IMAGE_MAX_PX = getattr(settings, 'PDF_IMAGE_MAX_PX', 1000)
+PDF_IMAGE_JPEG_QUALITY = getattr(settings, 'PDF_IMAGE_JPEG_QUALITY', 85)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Static logos of the PDF templates, backfilled with the uploads by `manage.py build_pdf_images`
+PDF_STATIC_IMAGES = (
+    'app_quotations/images/tvs_text.png',
+    'app_quotations/images/partner.jpeg',
+    'app_invoices/images/topvalue.png',
+    'app_invoices/images/microsoft.png',
+)
+
+
+def pdf_image(path):
+    """
+    Path of the print sized copy of the image at `path`, what PDF renders should embed
+    - built on first use when the upload signal or the backfill did not build it yet
+    - anything that is not a PNG/JPEG, or that Pillow can not read, comes back unchanged
+    """
+    if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+        return path
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return path
+    derivative = _pdf_image(path, stat.st_size, stat.st_mtime_ns)
+    if derivative != path and not os.path.exists(derivative):
+        # PDF_IMAGE_DIR was cleaned up under us
+        _pdf_image.cache_clear()
+        derivative = _pdf_image(path, stat.st_size, stat.st_mtime_ns)
+    return derivative
+
+
+@lru_cache(maxsize=1024)
+def _pdf_image(path, size, mtime_ns):
+    try:
+        return build_pdf_image(path)
+    except Exception:
+        logger.exception('Could not build the PDF copy of %s', path)
+        return path
+
+
+def build_pdf_image(path):
+    """
+    Write the print sized copy of `path` unless it exists, and return its path
+    - named after the sha256 of the original bytes and the settings above, the same
+      upload saved twice is converted once, and changing a setting converts again
+    - EXIF orientation is applied, then EXIF, XMP and text chunks are dropped
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data)
+    digest.update(f'{PDF_IMAGE_MAX_PX}:{PDF_IMAGE_JPEG_QUALITY}'.encode())
+    digest = digest.hexdigest()
+
+    for extension in ('.png', '.jpg'):
+        target = os.path.join(PDF_IMAGE_DIR, digest[:2], digest + extension)
+        if os.path.exists(target):
+            return target
+
+    output, extension = _convert(data)
+    target = os.path.join(PDF_IMAGE_DIR, digest[:2], digest + extension)
+    _write_atomic(target, output)
+    return target
+
+
+def _convert(data):
+    image = Image.open(io.BytesIO(data))
+    is_jpeg = image.format in ('JPEG', 'MPO')
+    image = ImageOps.exif_transpose(image)
+    icc_profile = image.info.get('icc_profile')
+
+    if is_jpeg:
+        if image.mode not in ('RGB', 'L', 'CMYK'):
+            image = image.convert('RGB')
+    elif image.mode == 'P' or 'transparency' in image.info:
+        # Palette images resize badly, and the transparency key would not survive the info reset below
+        image = image.convert('RGBA')
+    size = image.size
+    image.thumbnail((PDF_IMAGE_MAX_PX, PDF_IMAGE_MAX_PX), Image.LANCZOS)
+    image.info = {}
+
+    output = io.BytesIO()
+    if is_jpeg:
+        image.save(output, 'JPEG', quality=PDF_IMAGE_JPEG_QUALITY, optimize=True, icc_profile=icc_profile)
+    else:
+        image.save(output, 'PNG', optimize=True, icc_profile=icc_profile)
+    output = output.getvalue()
+    extension = '.jpg' if is_jpeg else '.png'
+
+    # A small, well compressed original can beat the re-encode, keep it then
+    if image.size == size and len(output) >= len(data):
+        return data, extension
+    return output, extension
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,191 @@
+# coding=utf-8
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from .memory import rss_mb
+from .pdf import pdf_cache_path, pdf_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Worker processes per server process, 0 turns the async mode off (?async=1 renders inline),
+# the pool then has one process for the renders of the PDF views (apps.common.pdf_admission)
+PDF_WORKERS = getattr(settings, 'PDF_WORKERS', 2)
+# Pango/WeasyPrint memory is never given back, workers are replaced after this many renders,
+# and the whole pool once a worker grows past PDF_WORKER_MAX_RSS_MB (0 turns either off)
+PDF_WORKER_MAX_RENDERS = getattr(settings, 'PDF_WORKER_MAX_RENDERS', 200)
+PDF_WORKER_MAX_RSS_MB = getattr(settings, 'PDF_WORKER_MAX_RSS_MB', 400)
+PDF_JOB_TIMEOUT = 60 * 60 * 24
+PDF_JOBS_KEPT = 1000
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+_executor = None
+_executor_lock = threading.Lock()
+# Latest jobs submitted by this process, job_id -> record, so status works without a shared cache
+_jobs = {}
+
+
+def pdf_jobs_enabled():
+    return PDF_WORKERS > 0
+
+
+def submit_pdf_job(view, bundle, document_id, filename):
+    """
+    Queue a PDF render on the local worker pool, returns the job record
+    - job_id is the document fingerprint: the same document asked twice is one job,
+      and an already cached PDF is `done` straight away
+    - the record lives in this process and in the cache, so any server process
+      sharing memcached can answer the status endpoint
+    """
+    stylesheets = view.get_stylesheets()
+    job_id = pdf_fingerprint(bundle, view.template_name, stylesheets)
+    record = job_status(job_id)
+    if record and (record['status'] == PENDING or (record['status'] == DONE and job_file_exists(record))):
+        return record
+
+    record = {
+        'job_id': job_id,
+        'status': PENDING,
+        'quotation_id': bundle.quotation.pk,
+        'fingerprint': job_id,
+        'filename': filename,
+    }
+    if os.path.exists(pdf_cache_path(bundle.quotation.pk, job_id)):
+        record['status'] = DONE
+        _save(record)
+        return record
+
+    view_path = f'{view.__class__.__module__}.{view.__class__.__qualname__}'
+    future = submit(_render_job, view_path, document_id)
+    _save(record)
+    future.add_done_callback(lambda done: _finish(record, done))
+    return record
+
+
+def job_status(job_id):
+    """The job record, or None for an unknown (or expired) job id"""
+    return _jobs.get(job_id) or cache.get(_job_key(job_id))
+
+
+def job_file_exists(record):
+    return os.path.exists(pdf_cache_path(record['quotation_id'], record['fingerprint']))
+
+
+def _finish(record, future):
+    record = dict(record)
+    try:
+        quotation_id, fingerprint = future.result()
+    except Exception as error:
+        logger.error('PDF job %s failed: %s', record['job_id'], error)
+        record.update(status=FAILED, error=str(error))
+    else:
+        # The document may have changed while queued, the worker reports what it really rendered
+        record.update(status=DONE, quotation_id=quotation_id, fingerprint=fingerprint)
+    _save(record)
+
+
+def _save(record):
+    _jobs[record['job_id']] = record
+    while len(_jobs) > PDF_JOBS_KEPT:
+        del _jobs[next(iter(_jobs))]
+    cache.set(_job_key(record['job_id']), record, PDF_JOB_TIMEOUT)
+
+
+def _job_key(job_id):
+    return f'pdfjob:{job_id}'
+
+
+def submit(fn, *args):
+    """Submit to the PDF worker pool, restarting it once if a worker died (OOM kill...)"""
+    executor = pdf_executor()
+    try:
+        future = executor.submit(fn, *args)
+    except BrokenProcessPool:
+        _reset_executor()
+        executor = pdf_executor()
+        future = executor.submit(fn, *args)
+    future.add_done_callback(partial(_check_memory, executor))
+    return future
+
+
+def pdf_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: forking a threaded web server can copy held locks and open DB sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS or 1,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(settings.SETTINGS_MODULE,),
+                max_tasks_per_child=PDF_WORKER_MAX_RENDERS or None,
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _check_memory(executor, future):
+    """
+    After each job: retire the pool once one of its workers is over PDF_WORKER_MAX_RSS_MB
+    - the next submit() starts a new pool, the old one finishes its queued jobs, then exits
+    """
+    if not PDF_WORKER_MAX_RSS_MB:
+        return
+    # No public API lists the worker processes
+    sizes = [rss_mb(pid) or 0 for pid in list(getattr(executor, '_processes', None) or ())]
+    if max(sizes, default=0) <= PDF_WORKER_MAX_RSS_MB:
+        return
+
+    global _executor
+    with _executor_lock:
+        if _executor is not executor:
+            return
+        _executor = None
+    logger.info('PDF worker at %.0fMB, replacing the PDF worker pool', max(sizes))
+    executor.shutdown(wait=False)
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+    from .pdf_admission import mark_pdf_worker
+    from .pdf_styles import warm_pdf_assets
+    mark_pdf_worker()
+    warm_pdf_assets()
+
+
+def _render_job(view_path, document_id):
+    """Runs in a worker process: load the bundle and render it into the PDF cache"""
+    from django.db import connections
+    from .bundles import load_document_bundle
+    from .pdf import render_cached_pdf
+
+    try:
+        view = import_string(view_path)()
+        bundle = load_document_bundle(view.bundle_kind, document_id)
+        fingerprint, _ = render_cached_pdf(
+            view.template_name, view.get_pdf_context(bundle), bundle, view.get_stylesheets()
+        )
+        return bundle.quotation.pk, fingerprint
+    finally:
+        # Workers live long, do not keep idle DB connections between jobs
+        connections.close_all()
@@ -0,0 +1,81 @@
+# coding=utf-8
+import logging
+import os
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from weasyprint import CSS
+from weasyprint.text.fonts import FontConfiguration
+
+from .pdf_fetcher import local_url_fetcher
+
+logger = logging.getLogger(__name__)
+
+# Per process: one FontConfiguration (fontconfig/Pango font discovery is the slow part of a
+# first render) and every PDF stylesheet parsed once, path -> (file version, CSS)
+_font_config = None
+_stylesheets = {}
+_lock = threading.Lock()
+# Static names of the stylesheets used by the PDF views, filled by pdf_archive.register_pdf_views()
+PDF_STYLESHEETS = set()
+
+
+def register_stylesheets(*names):
+    PDF_STYLESHEETS.update(names)
+
+
+def font_config():
+    global _font_config
+    if _font_config is None:
+        with _lock:
+            if _font_config is None:
+                _font_config = FontConfiguration()
+    return _font_config
+
+
+@lru_cache(maxsize=None)
+def stylesheet_path(name):
+    """Absolute path of a static stylesheet such as 'app_po/css/app_po_pdf_generator.css'"""
+    if os.path.isabs(name):
+        return name
+    return finders.find(name) or os.path.join(settings.STATIC_ROOT, name)
+
+
+def file_version(path):
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def stylesheet(path):
+    """
+    The parsed CSS of `path`, parsed once per process
+    - re-parsed when the file size or mtime changes, so an edited stylesheet is
+      picked up without restarting the workers
+    """
+    version = file_version(path)
+    entry = _stylesheets.get(path)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    fonts = font_config()
+    with _lock:
+        entry = _stylesheets.get(path)
+        if entry is None or entry[0] != version:
+            css = CSS(filename=path, url_fetcher=local_url_fetcher, font_config=fonts)
+            entry = _stylesheets[path] = (version, css)
+    return entry[1]
+
+
+def warm_pdf_assets():
+    """
+    Build the font configuration and parse every registered stylesheet, called when a
+    web or PDF worker process starts so the first download does not pay for it
+    """
+    try:
+        font_config()
+        for name in sorted(PDF_STYLESHEETS):
+            stylesheet(stylesheet_path(name))
+    except Exception:
+        # A broken stylesheet must not stop the worker, the render will report it
+        logger.exception('Could not warm the PDF stylesheets')
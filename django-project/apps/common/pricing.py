@@ -0,0 +1,132 @@
+# coding=utf-8
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import router, transaction
+
+ZERO = Decimal('0.00')
+HUNDRED = Decimal('100')
+# Decimal places of the stored columns (apps.common.mixins), values are rounded like
+# PostgreSQL rounds a numeric: half away from zero
+CENTS = Decimal('0.01')
+KIP = Decimal('1')
+
+
+@dataclass(frozen=True)
+class ExpensesPrice:
+    """Derived figures of one additional expenses row"""
+    total_all_product_ref: Decimal
+    it_service_output: Decimal
+    vat_output: Decimal
+    exchange_rate_output: Decimal
+    grand_total: Decimal
+
+
+@dataclass(frozen=True)
+class QuotationPrice:
+    """Every derived figure of a quotation, see price_quotation()"""
+    line_totals: tuple
+    total_all_products: Decimal
+    expenses: tuple = ()
+
+    @property
+    def grand_total(self):
+        return self.expenses[0].grand_total if self.expenses else self.total_all_products
+
+
+def _value(row, name):
+    return row.get(name) if isinstance(row, Mapping) else getattr(row, name)
+
+
+def _decimal(value):
+    return Decimal(str(value)) if value is not None and not isinstance(value, Decimal) else value
+
+
+def line_total(price, qty, period):
+    """total_one_product of an item, 0 when a value is missing"""
+    price, qty, period = _decimal(price), _decimal(qty), _decimal(period)
+    if price is None or qty is None or period is None:
+        return ZERO
+    return (price * qty * period).quantize(CENTS, ROUND_HALF_UP)
+
+
+def price_expenses(total_all_products, it_service_percent, vat_percent, exchange_rate):
+    """
+    The outputs of an additional expenses row
+    - IT service on the items total, VAT on items + IT service, the exchange rate on
+      items + IT service + VAT; each step on the unrounded result of the one before
+    """
+    base = total_all_products if total_all_products is not None else ZERO
+    reference = base
+    it_service = base * (_decimal(it_service_percent) / HUNDRED) if it_service_percent is not None else ZERO
+    base += it_service
+    vat = base * (_decimal(vat_percent) / HUNDRED) if vat_percent is not None else ZERO
+    base += vat
+    exchange = base * _decimal(exchange_rate) if exchange_rate is not None else ZERO
+    return ExpensesPrice(
+        total_all_product_ref=reference.quantize(CENTS, ROUND_HALF_UP),
+        it_service_output=it_service.quantize(CENTS, ROUND_HALF_UP),
+        vat_output=vat.quantize(CENTS, ROUND_HALF_UP),
+        exchange_rate_output=exchange.quantize(KIP, ROUND_HALF_UP),
+        grand_total=base.quantize(KIP, ROUND_HALF_UP),
+    )
+
+
+def price_quotation(items, expenses=()):
+    """
+    Every derived figure of a quotation in one pass, no database needed
+    - items: mappings or objects with price, qty and period
+    - expenses: mappings or objects with it_service_percent, vat_percent and exchange_rate
+    - for live previews of a form and what-if runs, e.g.
+      price_quotation([{'price': '125.50', 'qty': 2, 'period': 12}], [{'it_service_percent': 10, ...}])
+    """
+    line_totals = tuple(line_total(_value(item, 'price'), _value(item, 'qty'), _value(item, 'period')) for item in items)
+    total = sum(line_totals, ZERO)
+    return QuotationPrice(
+        line_totals=line_totals,
+        total_all_products=total,
+        expenses=tuple(
+            price_expenses(total, _value(row, 'it_service_percent'), _value(row, 'vat_percent'), _value(row, 'exchange_rate'))
+            for row in expenses
+        ),
+    )
+
+
+def reprice_quotation(quotation):
+    """
+    Recompute and store every derived figure of a saved quotation from its items and expenses
+    - 2 reads, then at most one UPDATE per table, writing only the values that changed
+    - also updates the in-memory quotation.total_all_products
+    - no model signals: the rows' own signals already dropped the cached PDFs
+    """
+    items = list(quotation.items.all())
+    expenses = list(quotation.additional_payments.all())
+    pricing = price_quotation(items, expenses)
+
+    changed_items = []
+    for item, total in zip(items, pricing.line_totals):
+        if item.total_one_product != total:
+            item.total_one_product = total
+            changed_items.append(item)
+
+    changed_expenses = []
+    for row, price in zip(expenses, pricing.expenses):
+        values = asdict(price)
+        if any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            changed_expenses.append(row)
+
+    using = router.db_for_write(type(quotation), instance=quotation)
+    with transaction.atomic(using=using, savepoint=False):
+        if changed_items:
+            type(items[0])._base_manager.db_manager(using).bulk_update(changed_items, ['total_one_product'])
+        # Compared in the database, the quotation instance may predate the last recompute
+        type(quotation)._base_manager.db_manager(using).filter(pk=quotation.pk).exclude(
+            total_all_products=pricing.total_all_products
+        ).update(total_all_products=pricing.total_all_products)
+        if changed_expenses:
+            type(expenses[0])._base_manager.db_manager(using).bulk_update(changed_expenses, list(asdict(pricing.expenses[0])))
+    quotation.total_all_products = pricing.total_all_products
+    return pricing
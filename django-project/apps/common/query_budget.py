@@ -0,0 +1,45 @@
+# coding=utf-8
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in DEBUG when a view runs more SQL queries than its declared budget."""
+
+
+class QueryBudgetMixin:
+    """
+    Guard a view against N+1 regressions.
+    - Set `query_budget` on the view to the max number of queries one request may run
+    - The template is rendered inside the guard, so lazy lookups in the template are counted too
+    - DEBUG raises QueryBudgetExceeded, production only logs a warning
+    - Enable/disable with settings.QUERY_BUDGET_ENABLED (default: follow DEBUG)
+    """
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        enabled = getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG)
+        if self.query_budget is None or not enabled:
+            return super().dispatch(request, *args, **kwargs)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = super().dispatch(request, *args, **kwargs)
+            # TemplateResponse renders lazily, force it so template queries are counted
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+
+        used = len(captured.captured_queries)
+        if used > self.query_budget:
+            message = (
+                f"{self.__class__.__name__} ran {used} queries, "
+                f"budget is {self.query_budget} ({request.path})"
+            )
+            if settings.DEBUG:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,113 @@
+# coding=utf-8
+import re
+import unicodedata
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections, models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Cast, Greatest, Upper
+
+# Lao Unicode block
+LAO_RE = re.compile('[\u0e80-\u0eff]')
+# Zero width characters, often typed in Lao text as invisible word breaks
+ZERO_WIDTH_RE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+# 'simple' = no stemming and no stop words, the only config that does not mangle IDs and Lao words
+SEARCH_CONFIG = 'simple'
+# search_rank is stored as an integer so it can be a stable keyset pagination key
+RANK_SCALE = 1000
+
+
+def normalize_search_term(term):
+    """
+    Normalize user input before it reaches the database
+    - NFC puts Lao vowel and tone marks in one canonical order, so the same word typed
+      with a different mark order still matches
+    - zero width spaces are dropped, extra whitespace is collapsed
+    """
+    term = unicodedata.normalize('NFC', term or '')
+    term = ZERO_WIDTH_RE.sub('', term)
+    return ' '.join(term.split())
+
+
+def is_lao(term):
+    return bool(LAO_RE.search(term))
+
+
+def search_documents(queryset, term, fields, vector_fields=()):
+    """
+    Filter a list queryset by a search box term
+    - Every field is matched with icontains, which PostgreSQL serves from the trigram
+      GIN indexes declared with trigram_index()
+    - Latin terms also match the `vector_fields` tsvector (any word order), Lao is written
+      without spaces between words so it only uses the substring/trigram path
+    - On PostgreSQL the result is annotated with `search_rank`, use order_by_rank() to sort on it
+    - Other databases fall back to plain icontains without ranking
+    """
+    term = normalize_search_term(term)
+    if not term:
+        return queryset
+
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': term})
+
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(condition)
+
+    similarities = [TrigramWordSimilarity(Value(term), field) for field in fields]
+    rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+
+    if vector_fields and not is_lao(term):
+        query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+        queryset = queryset.annotate(search_vector=SearchVector(*vector_fields, config=SEARCH_CONFIG))
+        condition |= Q(search_vector=query)
+        rank = rank + SearchRank(F('search_vector'), query)
+
+    return queryset.filter(condition).annotate(
+        search_rank=Cast(rank * RANK_SCALE, output_field=models.IntegerField())
+    )
+
+
+def order_by_rank(queryset, *ordering):
+    """Order by the view's default ordering, best search matches first when the list is searched"""
+    if 'search_rank' in queryset.query.annotations:
+        ordering = ('-search_rank', *ordering)
+    return queryset.order_by(*ordering)
+
+
+def build_search_document(*values):
+    """Join the values a document is searched by into one normalized text for its `search_document` field"""
+    return ' '.join(normalize_search_term(str(value)) for value in values if value)
+
+
+def refresh_search_documents(queryset):
+    """
+    Rebuild `search_document` for every row of queryset (e.g. after a customer is renamed)
+    - The model provides build_search_document(), select_related() the rows it reads
+    - Only rows whose document changed are written, in one bulk UPDATE
+    """
+    changed = []
+    for obj in queryset:
+        document = obj.build_search_document()
+        if obj.search_document != document:
+            obj.search_document = document
+            changed.append(obj)
+    if changed:
+        queryset.model.objects.bulk_update(changed, ['search_document'])
+    return len(changed)
+
+
+def trigram_index(field, name):
+    """
+    GIN trigram index matching Django's icontains SQL on PostgreSQL: UPPER("field"::text) LIKE UPPER(%term%)
+    """
+    return GinIndex(
+        OpClass(Upper(Cast(field, output_field=models.TextField())), name='gin_trgm_ops'),
+        name=name,
+    )
+
+
+def search_vector_index(*fields, name):
+    """GIN index over the same tsvector expression search_documents() builds for `vector_fields`"""
+    return GinIndex(SearchVector(*fields, config=SEARCH_CONFIG), name=name)
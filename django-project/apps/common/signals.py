@@ -24,3 +24,79 @@
 #     event any update CommonAdditionalPaymentModel will recalculate all
 #     """
 #     pass
+
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.app_customers.models import CustomersModel, CustomerTenantModel
+from apps.app_employee.models import EmployeesModel
+from apps.app_quotations.models import QuotationInformationModel, QuotationItemsModel, AdditionalExpensesModel
+from apps.app_invoices.models import InvoiceModel
+from apps.app_po.models import PurchaseOrderModel, PurchaseOrderItemsModel, SuppliersModel, ApprovedPOModel
+from apps.app_contracts.models import ContractsModel
+from .conditional import touch_chains
+from .forms import formset_bulk_saved
+from .pdf import evict_pdf_cache
+from .pdf_images import pdf_image
+
+
+def _quotations(condition):
+    return QuotationInformationModel.objects.filter(condition).values_list('pk', flat=True).distinct()
+
+
+# Quotation chains (quotation_id) whose rendered PDFs show the saved/deleted row
+PDF_CHAINS = {
+    QuotationInformationModel: lambda obj: [obj.pk],
+    QuotationItemsModel: lambda obj: [obj.common_information_id],
+    AdditionalExpensesModel: lambda obj: [obj.common_information_id],
+    InvoiceModel: lambda obj: [obj.quotation_id],
+    PurchaseOrderModel: lambda obj: [obj.quotation_id],
+    PurchaseOrderItemsModel: lambda obj: PurchaseOrderModel.objects.filter(pk=obj.purchase_order_id).values_list('quotation_id', flat=True),
+    ContractsModel: lambda obj: [obj.quotation_id],
+    CustomersModel: lambda obj: _quotations(
+        Q(customer=obj) | Q(purchase_order__customer=obj) | Q(contract_quotation__customer=obj)
+    ),
+    CustomerTenantModel: lambda obj: _quotations(Q(customer__tenant=obj) | Q(purchase_order__tenant=obj)),
+    EmployeesModel: lambda obj: _quotations(
+        Q(created_by=obj) | Q(invoice__created_by=obj) | Q(purchase_order__created_by=obj)
+    ),
+    SuppliersModel: lambda obj: _quotations(Q(purchase_order__supplier=obj)),
+    ApprovedPOModel: lambda obj: _quotations(Q(purchase_order__approved_by=obj)),
+}
+
+
+# Drop cached PDFs and change the ETag of the chain (apps.common.conditional) once the change is committed
+@receiver([post_save, post_delete])
+def evict_rendered_pdfs(sender, instance, **kwargs):
+    chains = PDF_CHAINS.get(sender)
+    if chains is not None:
+        quotation_ids = list(chains(instance))
+        transaction.on_commit(partial(evict_pdf_cache, quotation_ids))
+        transaction.on_commit(partial(touch_chains, quotation_ids))
+
+
+# Rows saved by a BulkInlineFormSet, they share one parent so one row gives the chain
+@receiver(formset_bulk_saved)
+def evict_rendered_pdfs_bulk(sender, objects, **kwargs):
+    evict_rendered_pdfs(sender, objects[0])
+
+
+# Uploaded images embedded in the PDFs, their print sized copy is built on upload
+PDF_IMAGE_FIELDS = {
+    EmployeesModel: ('signature',),
+    ApprovedPOModel: ('signature', 'stamp'),
+}
+
+
+@receiver(post_save)
+def build_pdf_images(sender, instance, **kwargs):
+    fields = PDF_IMAGE_FIELDS.get(sender)
+    if fields is None:
+        return
+    paths = [getattr(instance, field).path for field in fields if getattr(instance, field)]
+    transaction.on_commit(lambda: [pdf_image(path) for path in paths])
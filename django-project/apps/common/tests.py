@@ -1,4 +1,568 @@
 # coding=utf-8
-from django.test import TestCase
+import datetime
+import io
+import random
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import docx
+from django.db import connection, transaction
+from django.forms import inlineformset_factory
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.http import Http404, QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from docxtpl import DocxTemplate
+
+from apps.app_customers.models import CustomersModel
+from apps.app_invoices.models import GenerateInvoiceNumber
+from apps.app_quotations import views as quotation_views
+from apps.app_employee.models import EmployeesModel
+from apps.app_quotations.forms import QuotationItemsForm, QuotationItemsFormSet
+from apps.app_quotations.models import (
+    AdditionalExpensesModel, GenerateQuotationID, QuotationInformationModel, QuotationItemsModel,
+)
+from apps.users.models import User
+from . import numbering, pdf_admission, pdf_jobs
+from .docx_render import docx_template_path, jinja_env, render_docx
+from .pagination import _encode_cursor
+from .search import order_by_rank, search_documents
+from .pdf_archive import PDF_VIEWS
+from .pdf_styles import PDF_STYLESHEETS
+from .pricing import line_total, price_expenses, price_quotation
+from .totals import _pending, mark_totals_dirty, settle_totals
+
+DOCX_TEMPLATES = ('app_contracts/docx/contract.docx', 'app_quotations/docx/quotation.docx')
+
+
+def docx_text(data):
+    """Paragraphs and table cells of a .docx, in order"""
+    document = docx.Document(io.BytesIO(data))
+    return [paragraph.text for paragraph in document.paragraphs] + [
+        [cell.text for cell in row.cells] for table in document.tables for row in table.rows
+    ]
+
+
+class DocxRenderTests(SimpleTestCase):
+    def docx_context(self, company_name):
+        employee = SimpleNamespace(employee_name='Somsack', employee_lastname='Phommavong')
+        return {
+            'bundle': SimpleNamespace(
+                total_price=Decimal('3012.00'), it_service_amount=Decimal('301.20'),
+                vat_amount=Decimal('331.32'), grand_total=Decimal('3644.52'),
+            ),
+            'quotation': SimpleNamespace(
+                quotation_id='QUO0000001', created_by=employee,
+                start_date=datetime.date(2026, 1, 1), end_date=datetime.date(2026, 12, 31),
+            ),
+            'contract': SimpleNamespace(
+                contract_id='TVS-CON0000001', created_by=employee,
+                start_contract=datetime.date(2026, 1, 1), end_contract=None,
+            ),
+            'invoice': None,
+            'po': None,
+            'customer': SimpleNamespace(
+                company_name=company_name, company_address='Vientiane <Lao PDR>',
+                contact_person_name='Noy', email='noy@example.com', phone_number='20000000',
+            ),
+            'items': [
+                SimpleNamespace(product_name='Microsoft 365 E3 & Teams', price=Decimal('125.50'), qty=2, period=12,
+                                total_one_product=Decimal('3012.00')),
+                SimpleNamespace(product_name='Setup', price=Decimal('0'), qty=1, period=1, total_one_product=Decimal('0')),
+            ],
+        }
+
+    def test_matches_docxtpl(self):
+        # CompiledDocx mirrors DocxTemplate.render(): same text, every value escaped
+        for name in DOCX_TEMPLATES:
+            for company_name in ('A & B <Trading>', 'Lao Telecom'):
+                with self.subTest(name=name, company_name=company_name):
+                    context = self.docx_context(company_name)
+                    template = DocxTemplate(docx_template_path(name))
+                    template.render(context, jinja_env)
+                    expected = io.BytesIO()
+                    template.save(expected)
+
+                    rendered = docx_text(render_docx(name, context))
+                    self.assertEqual(rendered, docx_text(expected.getvalue()))
+                    self.assertIn(company_name, str(rendered))
+
+
+def create_quotation(employee=None):
+    if employee is None:
+        employee = EmployeesModel.objects.create(
+            user=User.objects.create_user(username='sales', password='sales'),
+            employee_name='Somsack', employee_lastname='Phommavong', department='Sales', signature='',
+        )
+    customer = CustomersModel.objects.create(
+        company_name='Lao Telecom', contact_person_name='Noy', phone_number='20000000',
+        email='noy@example.com', company_address='Vientiane',
+    )
+    return QuotationInformationModel.objects.create(
+        customer=customer, created_by=employee,
+        start_date=datetime.date(2026, 1, 1), end_date=datetime.date(2026, 12, 31),
+    )
+
+
+class TotalsTests(TransactionTestCase):
+    """apps.common.totals: one recompute per transaction, none lost to a rollback"""
+    def setUp(self):
+        self.quotation = create_quotation()
+
+    def add_item(self, quotation, price):
+        return QuotationItemsModel.objects.create(
+            common_information=quotation, product_name='Microsoft 365', price=Decimal(price), qty=1, period=1,
+        )
+
+    def stored_total(self):
+        return QuotationInformationModel.objects.values_list('total_all_products', flat=True).get(pk=self.quotation.pk)
+
+    def recomputes(self):
+        return mock.patch.object(
+            QuotationInformationModel, 'calculate_total_all_products', autospec=True,
+            side_effect=QuotationInformationModel.calculate_total_all_products,
+        )
+
+    def test_commit(self):
+        with self.recomputes() as recompute:
+            with transaction.atomic():
+                for price in ('10.00', '20.00', '30.00'):
+                    self.add_item(self.quotation, price)
+                self.assertEqual(self.stored_total(), Decimal('0.00'))
+                self.assertEqual(recompute.call_count, 0)
+        self.assertEqual(recompute.call_count, 1)
+        self.assertEqual(self.stored_total(), Decimal('60.00'))
+        self.assertNotIn(('app_quotations.QuotationInformationModel', self.quotation.pk), _pending('default'))
+
+    def test_rollback(self):
+        with self.assertRaises(ZeroDivisionError), transaction.atomic():
+            self.add_item(self.quotation, '10.00')
+            1 / 0
+        self.assertEqual(self.stored_total(), Decimal('0.00'))
+        # The next transaction that changes the quotation still recomputes it
+        with transaction.atomic():
+            self.add_item(self.quotation, '20.00')
+        self.assertEqual(self.stored_total(), Decimal('20.00'))
+        # Keys left by a rollback go with the next change outside a transaction
+        with self.assertRaises(ZeroDivisionError), transaction.atomic():
+            self.add_item(self.quotation, '30.00')
+            1 / 0
+        self.assertTrue(_pending('default'))
+        mark_totals_dirty(self.quotation)
+        self.assertFalse(_pending('default'))
+        self.assertEqual(self.stored_total(), Decimal('20.00'))
+
+    def test_savepoint_rollback(self):
+        with transaction.atomic():
+            # First marked in the savepoint that rolls back, then outside of it
+            with self.assertRaises(ZeroDivisionError), transaction.atomic():
+                self.add_item(self.quotation, '10.00')
+                1 / 0
+            self.add_item(self.quotation, '20.00')
+            # Marked outside, settled in a savepoint that rolls back: the commit still recomputes
+            self.add_item(self.quotation, '30.00')
+            with self.assertRaises(ZeroDivisionError), transaction.atomic():
+                settle_totals(self.quotation)
+                self.add_item(self.quotation, '40.00')
+                1 / 0
+        self.assertEqual(self.stored_total(), Decimal('50.00'))
+
+    def test_stale_instance(self):
+        # An instance loaded before the last recompute still gets its total written
+        stale = QuotationInformationModel.objects.get(pk=self.quotation.pk)
+        with transaction.atomic():
+            self.add_item(self.quotation, '10.00')
+        self.assertEqual(self.stored_total(), Decimal('10.00'))
+        with transaction.atomic():
+            for item in stale.items.all():
+                item.delete()
+        self.assertEqual(self.stored_total(), Decimal('0.00'))
+
+
+class BulkInlineFormSetTests(TransactionTestCase):
+    """BulkInlineFormSet saves the same rows and totals as a plain inline formset"""
+    def create_quotation(self, employee=None):
+        quotation = create_quotation(employee)
+        QuotationItemsModel.objects.bulk_create([
+            QuotationItemsModel(common_information=quotation, product_name=name, price=Decimal(price), qty=qty, period=12)
+            for name, price, qty in (('Exchange Online', '40.00', 5), ('Teams', '12.50', 3), ('Intune', '80.00', 1))
+        ])
+        quotation.calculate_total_all_products()
+        return quotation
+
+    def post_data(self, quotation):
+        # Change the first row, delete the second, keep the third, add one
+        items = list(quotation.items.order_by('pk'))
+        data = {
+            'items-TOTAL_FORMS': len(items) + 1, 'items-INITIAL_FORMS': len(items),
+            'items-MIN_NUM_FORMS': 0, 'items-MAX_NUM_FORMS': 1000,
+        }
+        for i, item in enumerate(items):
+            data.update({
+                f'items-{i}-id': item.pk, f'items-{i}-product_name': item.product_name,
+                f'items-{i}-price': item.price, f'items-{i}-qty': item.qty, f'items-{i}-period': item.period,
+            })
+        data.update({'items-0-price': '99.99', 'items-1-DELETE': 'on'})
+        data.update({'items-3-product_name': 'Setup', 'items-3-price': '10.05', 'items-3-qty': 2, 'items-3-period': 3})
+        return data
+
+    def save(self, formset_class, quotation):
+        formset = formset_class(self.post_data(quotation), instance=quotation, prefix='items')
+        self.assertTrue(formset.is_valid(), formset.errors)
+        with transaction.atomic():
+            saved = formset.save()
+        quotation = QuotationInformationModel.objects.get(pk=quotation.pk)
+        rows = [
+            (item.product_name, item.price, item.qty, item.period, item.total_one_product)
+            for item in quotation.items.order_by('product_name')
+        ]
+        return rows, quotation.total_all_products, len(saved), [obj.pk for obj in formset.deleted_objects]
+
+    def test_same_as_plain_formset(self):
+        plain_formset = inlineformset_factory(
+            QuotationInformationModel, QuotationItemsModel, form=QuotationItemsForm, extra=1, can_delete=True,
+        )
+        plain = self.save(plain_formset, self.create_quotation())
+        bulk = self.save(QuotationItemsFormSet, self.create_quotation(EmployeesModel.objects.get()))
+        self.assertEqual(bulk, plain)
+        rows, total, saved, deleted = bulk
+        self.assertEqual([row[0] for row in rows], ['Exchange Online', 'Intune', 'Setup'])
+        self.assertEqual(total, sum(row[4] for row in rows))
+        self.assertEqual((saved, deleted), (2, [None]))
+
+
+def old_price(items, it_service_percent, vat_percent, exchange_rate):
+    """
+    The figures of the save() methods apps.common.pricing replaced, rounded like the database stored them
+    (total_one_product, total_all_products, it_service_output, vat_output, exchange_rate_output, grand_total)
+    """
+    line_totals = [
+        item['price'] * item['qty'] * item['period']
+        if item['price'] is not None and item['qty'] is not None and item['period'] is not None else Decimal('0.00')
+        for item in items
+    ]
+    base_amount = sum(line_totals, Decimal('0.00'))
+    total_all_products = base_amount
+    it_service_output = base_amount * (Decimal(it_service_percent) / Decimal('100')) if it_service_percent is not None else Decimal('0.00')
+    base_amount += it_service_output
+    vat_output = base_amount * (Decimal(vat_percent) / Decimal('100')) if vat_percent is not None else Decimal('0.00')
+    base_amount += vat_output
+    exchange_rate_output = base_amount * Decimal(exchange_rate) if exchange_rate is not None else Decimal('0.00')
+    cents, kip = Decimal('0.01'), Decimal('1')
+    return (
+        [total.quantize(cents, ROUND_HALF_UP) for total in line_totals], total_all_products.quantize(cents, ROUND_HALF_UP),
+        it_service_output.quantize(cents, ROUND_HALF_UP), vat_output.quantize(cents, ROUND_HALF_UP),
+        exchange_rate_output.quantize(kip, ROUND_HALF_UP), base_amount.quantize(kip, ROUND_HALF_UP),
+    )
+
+
+def new_price(items, it_service_percent, vat_percent, exchange_rate):
+    pricing = price_quotation(items, [
+        {'it_service_percent': it_service_percent, 'vat_percent': vat_percent, 'exchange_rate': exchange_rate},
+    ])
+    expenses = pricing.expenses[0]
+    return (
+        list(pricing.line_totals), pricing.total_all_products, expenses.it_service_output, expenses.vat_output,
+        expenses.exchange_rate_output, expenses.grand_total,
+    )
+
+
+class PricingTests(SimpleTestCase):
+    def test_matches_old_formula(self):
+        rng = random.Random(1)
+        for _ in range(1000):
+            items = [
+                {'price': Decimal(rng.randint(0, 10 ** 6)) / 100, 'qty': rng.randint(0, 50), 'period': rng.randint(0, 36)}
+                for _ in range(rng.randint(0, 8))
+            ]
+            figures = (items, rng.randint(0, 30), rng.randint(0, 15), rng.randint(0, 30000))
+            self.assertEqual(new_price(*figures), old_price(*figures), figures)
+
+    def test_rounding_half_up(self):
+        # Half away from zero like a PostgreSQL numeric, not the banker's rounding of Decimal
+        self.assertEqual(line_total('0.005', 1, 1), Decimal('0.01'))
+        self.assertEqual(line_total('0.125', 1, 1), Decimal('0.13'))
+        self.assertEqual(line_total('0.0049', 1, 1), Decimal('0.00'))
+        expenses = price_expenses(Decimal('0.05'), 10, 0, 0)
+        self.assertEqual((expenses.it_service_output, expenses.grand_total), (Decimal('0.01'), Decimal('0')))
+        expenses = price_expenses(Decimal('2.50'), 0, 0, 1)
+        self.assertEqual((expenses.exchange_rate_output, expenses.grand_total), (Decimal('3'), Decimal('3')))
+        # Each step on the unrounded result of the one before: 0.05 + 0.005 + 0.00055 = 0.05555 -> 555.5 kip
+        expenses = price_expenses(Decimal('0.05'), 10, 1, 10000)
+        self.assertEqual(
+            (expenses.it_service_output, expenses.vat_output, expenses.exchange_rate_output),
+            (Decimal('0.01'), Decimal('0.00'), Decimal('556')),
+        )
+
+    def test_none_fields(self):
+        for price, qty, period in ((None, 1, 12), ('10.00', None, 12), ('10.00', 1, None)):
+            self.assertEqual(line_total(price, qty, period), Decimal('0.00'))
+        items = [{'price': None, 'qty': 1, 'period': 12}, {'price': Decimal('10.00'), 'qty': 2, 'period': 3}]
+        self.assertEqual(new_price(items, None, None, None), old_price(items, None, None, None))
+        self.assertEqual(
+            new_price(items, None, None, None),
+            ([Decimal('0.00'), Decimal('60.00')], Decimal('60.00'), Decimal('0.00'), Decimal('0.00'), Decimal('0'), Decimal('60')),
+        )
+        self.assertEqual(price_expenses(None, 10, 10, 21500), price_expenses(Decimal('0'), 10, 10, 21500))
+
+    def test_multiple_expense_rows(self):
+        items = [{'price': Decimal('125.50'), 'qty': 2, 'period': 12}]
+        rows = [
+            {'it_service_percent': 10, 'vat_percent': 10, 'exchange_rate': 21500},
+            {'it_service_percent': 0, 'vat_percent': 7, 'exchange_rate': 1},
+        ]
+        pricing = price_quotation(items, rows)
+        self.assertEqual(len(pricing.expenses), 2)
+        for row, expenses in zip(rows, pricing.expenses):
+            self.assertEqual(expenses, price_expenses(Decimal('3012.00'), **row))
+        self.assertEqual(pricing.grand_total, pricing.expenses[0].grand_total)
+        self.assertEqual(price_quotation(items).grand_total, Decimal('3012.00'))
+
+
+class RepriceQuotationTests(TransactionTestCase):
+    def setUp(self):
+        self.quotation = create_quotation()
+
+    def test_expenses_saved_before_items(self):
+        # The rows are priced on 0 when saved, the commit reprices them on the items
+        with transaction.atomic():
+            rows = [
+                AdditionalExpensesModel.objects.create(
+                    common_information=self.quotation, it_service_percent=10, vat_percent=10, exchange_rate=21500,
+                ),
+                AdditionalExpensesModel.objects.create(
+                    common_information=self.quotation, it_service_percent=5, vat_percent=0, exchange_rate=1,
+                ),
+            ]
+            self.assertEqual(rows[0].grand_total, Decimal('0'))
+            for price in ('100.00', '0.05', '33.33'):
+                QuotationItemsModel.objects.create(
+                    common_information=self.quotation, product_name='Microsoft 365', price=Decimal(price), qty=1, period=12,
+                )
+        self.quotation.refresh_from_db()
+        self.assertEqual(self.quotation.total_all_products, Decimal('1600.56'))
+        items = [{'price': Decimal(price), 'qty': 1, 'period': 12} for price in ('100.00', '0.05', '33.33')]
+        for row in rows:
+            row.refresh_from_db()
+            self.assertEqual(
+                (row.total_all_product_ref, row.it_service_output, row.vat_output, row.exchange_rate_output, row.grand_total),
+                old_price(items, row.it_service_percent, row.vat_percent, row.exchange_rate)[1:],
+            )
+
+
+class PdfViewRegistryTests(SimpleTestCase):
+    def test_registered_by_the_apps(self):
+        # From the apps' ready(), whether or not the URLconf was loaded
+        self.assertEqual(
+            sorted(view_class.__name__ for view_class in PDF_VIEWS),
+            ['GenerateInvoicePDF', 'GenerateInvoicePDFNoSig', 'GeneratePoPdfView', 'GenerateQuotationPDF', 'GenerateQuotationPDFNoSig'],
+        )
+        self.assertEqual(
+            PDF_STYLESHEETS, {name for view_class in PDF_VIEWS for name in view_class.pdf_stylesheets},
+        )
+
+
+@mock.patch.object(pdf_jobs, 'PDF_WORKERS', 0)
+@mock.patch.object(pdf_admission, 'PDF_QUEUE_TIMEOUT', 30)
+@mock.patch.object(pdf_admission, 'PDF_RENDER_DEADLINE', 1)
+class PdfDeadlineTests(SimpleTestCase):
+    """PDF_WORKERS = 0 keeps the render deadline"""
+    def test_main_thread(self):
+        started = time.monotonic()
+        with self.assertRaises(pdf_admission.PdfDeadlineExceeded):
+            pdf_admission.admitted_render(time.sleep, 30)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_request_thread(self):
+        # SIGALRM can not reach a request thread, the render goes to a one process pool
+        self.addCleanup(pdf_jobs._reset_executor)
+        errors = []
+
+        def request():
+            try:
+                pdf_admission.admitted_render(time.sleep, 60)
+            except Exception as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join(45)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([type(error) for error in errors], [pdf_admission.PdfDeadlineExceeded])
+
+
+class NumberingTests(TestCase):
+    """apps.common.numbering on SQLite: the counter rows"""
+    def test_formats(self):
+        self.assertEqual(
+            [numbering.next_number(kind) for kind in ('quotation', 'invoice', 'po', 'contract', 'customer')],
+            ['QUO0000001', 'INV0000001', 'PO-0000001', 'TVS-CON0000001', 'CUS_ID00001'],
+        )
+        self.assertEqual(numbering.next_number('quotation'), 'QUO0000002')
+        self.assertEqual(create_quotation().quotation_id, 'QUO0000003')
+
+    def test_continues_from_the_counter_row(self):
+        GenerateInvoiceNumber.objects.create(pk=1, auto_invoice_number=41)
+        self.assertEqual(numbering.next_number('invoice'), 'INV0000042')
+        self.assertEqual(GenerateInvoiceNumber.objects.get(pk=1).auto_invoice_number, 42)
+
+    @mock.patch.object(numbering, 'DOCUMENT_NUMBER_YEARLY', {'quotation'})
+    def test_yearly_series(self):
+        GenerateQuotationID.objects.create(pk=1, qotation_id_generator=41)
+        with mock.patch.object(numbering.timezone, 'localdate', return_value=datetime.date(2026, 5, 1)):
+            self.assertEqual(numbering.next_number('quotation'), 'QUO2026-0000001')
+            self.assertEqual(numbering.next_number('quotation'), 'QUO2026-0000002')
+        with mock.patch.object(numbering.timezone, 'localdate', return_value=datetime.date(2027, 1, 1)):
+            self.assertEqual(numbering.next_number('quotation'), 'QUO2027-0000001')
+        self.assertEqual(
+            dict(GenerateQuotationID.objects.values_list('pk', 'qotation_id_generator')), {1: 41, 2026: 2, 2027: 1},
+        )
+        # Not yearly
+        self.assertEqual(numbering.next_number('invoice'), 'INV0000001')
+
+    def test_sequence_created_only_on_commit(self):
+        # The CREATE SEQUENCE fails on SQLite, the bookkeeping around it is the same
+        series = numbering.SERIES['invoice']
+        key = ('default', 'docnum_invoice')
+        self.addCleanup(numbering._sequences.discard, key)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ZeroDivisionError), transaction.atomic():
+                numbering._create_sequence('default', 'docnum_invoice', GenerateInvoiceNumber, series, None)
+                1 / 0
+        self.assertNotIn(key, numbering._sequences)
+        with self.captureOnCommitCallbacks(execute=True):
+            numbering._create_sequence('default', 'docnum_invoice', GenerateInvoiceNumber, series, None)
+        self.assertIn(key, numbering._sequences)
+
+
+def create_quotations(count):
+    """`count` quotations of one customer, end_date on 3 days only: many ties on the sort key"""
+    first = create_quotation()
+    for n in range(1, count):
+        QuotationInformationModel.objects.create(
+            customer=first.customer, created_by=first.created_by,
+            status=QuotationInformationModel.Status.COMPLETED if n % 2 else QuotationInformationModel.Status.PENDING,
+            start_date=datetime.date(2026, 1, 1 + n), end_date=datetime.date(2026, 12, 29 + n % 3),
+            total_all_products=Decimal(n * 7 % 5),
+        )
+    return QuotationInformationModel.objects.all()
+
+
+class PagedQuotationList(quotation_views.HomeView):
+    paginate_by = 3
+
+
+class RankedQuotationList(PagedQuotationList):
+    # search_rank as the leading key, like order_by_rank() on PostgreSQL
+    def get_queryset(self):
+        return (
+            QuotationInformationModel.objects
+            .annotate(search_rank=Cast(F('total_all_products'), FloatField()))
+            .order_by('-search_rank', '-end_date')
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_quotations(11)
+
+    def page(self, params='', view_class=PagedQuotationList):
+        view = view_class()
+        view.setup(RequestFactory().get('/', QueryDict(params)))
+        paginator, page, rows, is_paginated = view.paginate_queryset(view.get_queryset(), view.paginate_by)
+        return page
+
+    def walk(self, params='', view_class=PagedQuotationList):
+        """Every page forward, then back again from the last one"""
+        forward = [self.page(params, view_class)]
+        while forward[-1].has_next():
+            forward.append(self.page(forward[-1].next_querystring, view_class))
+        backward = [forward[-1]]
+        while backward[-1].has_previous():
+            backward.append(self.page(backward[-1].previous_querystring, view_class))
+        pages = lambda walked: [[row.pk for row in page] for page in walked]
+        return pages(forward), pages(reversed(backward))
+
+    def test_round_trip_with_ties(self):
+        forward, backward = self.walk()
+        self.assertEqual(forward, backward)
+        self.assertEqual([len(page) for page in forward], [3, 3, 3, 2])
+        expected = QuotationInformationModel.objects.order_by('-end_date', '-pk').values_list('pk', flat=True)
+        self.assertEqual(sum(forward, []), list(expected))
+
+    def test_cursor_keeps_the_filters(self):
+        params = 'search=QUO&status=completed&start_date=2026-01-03&end_date=2026-01-31'
+        first = self.page(params)
+        for name, value in QueryDict(params).items():
+            self.assertEqual(QueryDict(first.next_querystring)[name], value)
+        forward, backward = self.walk(params)
+        self.assertEqual(forward, backward)
+        expected = QuotationInformationModel.objects.filter(
+            status='completed', start_date__range=['2026-01-03', '2026-01-31'],
+        ).order_by('-end_date', '-pk').values_list('pk', flat=True)
+        self.assertEqual(sum(forward, []), list(expected))
+        self.assertEqual([len(page) for page in forward], [3, 1])
+
+    def test_search_rank_leading_key(self):
+        forward, backward = self.walk(view_class=RankedQuotationList)
+        self.assertEqual(forward, backward)
+        expected = RankedQuotationList().get_queryset().order_by('-search_rank', '-end_date', '-pk')
+        self.assertEqual(sum(forward, []), [row.pk for row in expected])
+
+    def test_malformed_cursor(self):
+        for cursor in ('abc', '!!!', _encode_cursor('x', ['2026-12-31', 'QUO0000001']),
+                       _encode_cursor('n', ['2026-12-31']), _encode_cursor('n', ['not a date', 'QUO0000001'])):
+            with self.subTest(cursor=cursor), self.assertRaises(Http404):
+                self.page(f'cursor={cursor}')
+
+
+class SearchTests(TestCase):
+    fields = ('quotation_id', 'customer__company_name', 'customer__contact_person_name')
+    vector_fields = ('customer__company_name', 'customer__contact_person_name')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.quotation = create_quotation()
+        lao = CustomersModel.objects.create(
+            company_name='ບໍລິສັດ ລາວໂທລະຄົມ', contact_person_name='ນ້ອຍ', phone_number='20000001',
+            email='lao@example.com', company_address='ວຽງຈັນ',
+        )
+        cls.lao_quotation = QuotationInformationModel.objects.create(
+            customer=lao, created_by=cls.quotation.created_by,
+            start_date=datetime.date(2026, 1, 1), end_date=datetime.date(2026, 6, 30),
+        )
+
+    def search(self, term):
+        return search_documents(QuotationInformationModel.objects.all(), term, self.fields, self.vector_fields)
+
+    def test_sqlite_icontains(self):
+        queryset = self.search('lao tele')
+        self.assertNotIn('search_rank', queryset.query.annotations)
+        self.assertEqual(list(queryset), [self.quotation])
+        self.assertEqual(list(self.search(' ລາວໂທ ')), [self.lao_quotation])
+        # Zero width spaces typed between Lao words are dropped
+        self.assertEqual(list(self.search('ລາວ\u200bໂທ')), [self.lao_quotation])
+        self.assertEqual(self.search('').count(), 2)
+
+    def test_lao_term_skips_the_tsvector(self):
+        # Only builds the PostgreSQL query, nothing is run
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            lao = self.search('ລາວໂທ')
+            latin = self.search('lao telecom')
+        self.assertIn('search_rank', lao.query.annotations)
+        self.assertNotIn('search_vector', lao.query.annotations)
+        self.assertIn('search_rank', latin.query.annotations)
+        self.assertIn('search_vector', latin.query.annotations)
+
+    def test_order_by_rank(self):
+        queryset = QuotationInformationModel.objects.all()
+        self.assertEqual(order_by_rank(queryset, '-end_date').query.order_by, ('-end_date',))
+        # icontains on SQLite, no rank to order on
+        self.assertEqual(order_by_rank(self.search('lao'), '-end_date').query.order_by, ('-end_date',))
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            searched = self.search('lao')
+        self.assertEqual(order_by_rank(searched, '-end_date').query.order_by, ('-search_rank', '-end_date'))
@@ -0,0 +1,72 @@
+# coding=utf-8
+import threading
+
+from django.db import router, transaction
+
+# Parents (quotations, POs) whose items changed, recomputed once when the transaction commits
+# - per thread and database alias, like the connections: alias -> {(model label, pk)}
+# - every change registers an on_commit callback bound to its parent, the first one of a
+#   parent to run after the commit takes the key out and recomputes, the others find nothing.
+#   Django drops the callbacks of a rolled back transaction or savepoint, their keys can stay
+#   behind: they only cost settle_totals() a recompute, and are cleared outside transactions
+_dirty = threading.local()
+
+
+def _pending(alias):
+    if not hasattr(_dirty, 'parents'):
+        _dirty.parents = {}
+    return _dirty.parents.setdefault(alias, set())
+
+
+def _key(parent):
+    return parent._meta.label, parent.pk
+
+
+def _alias(parent):
+    return router.db_for_write(type(parent), instance=parent)
+
+
+class _FlushTotals:
+    """on_commit callback recomputing the total of one parent"""
+    def __init__(self, alias, parent):
+        self.alias = alias
+        self.parent = parent
+        self.key = _key(parent)
+
+    def __call__(self):
+        pending = _pending(self.alias)
+        if self.key not in pending:
+            return
+        pending.discard(self.key)
+        # pk is None: deleted through this instance, its items went with it
+        if self.parent.pk is not None:
+            self.parent.calculate_total_all_products()
+
+
+def mark_totals_dirty(parent):
+    """
+    Recompute parent.total_all_products once the transaction commits, whatever the number of
+    items saved or deleted in it (right away outside a transaction)
+    - every call registers a callback, so a parent marked in a savepoint that rolled back is
+      still picked up by a later one
+    """
+    if parent.pk is None:
+        return
+    alias = _alias(parent)
+    if not transaction.get_connection(alias).in_atomic_block:
+        # No transaction open: whatever is left was rolled back
+        _pending(alias).clear()
+        parent.calculate_total_all_products()
+        return
+    _pending(alias).add(_key(parent))
+    transaction.on_commit(_FlushTotals(alias, parent), using=alias)
+
+
+def settle_totals(parent):
+    """
+    Recompute a dirty parent now, for code in the transaction that reads its total
+    - the key stays: when this runs in a savepoint that rolls back, the commit must still
+      recompute the total; otherwise it finds nothing to update
+    """
+    if parent.pk is not None and _key(parent) in _pending(_alias(parent)):
+        parent.calculate_total_all_products()
@@ -15,6 +15,8 @@ router = DefaultRouter()
 
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('pdf_jobs/<str:job_id>/', views.PdfJobStatusView.as_view(), name='pdf_job_status'),
+    path('pdf_jobs/<str:job_id>/download/', views.PdfJobDownloadView.as_view(), name='pdf_job_download'),
 ]
 
 # when user go to path /app_name/ it will show api root page (endpoints list)
@@ -1,2 +1,198 @@
 # coding=utf-8
-from django.shortcuts import render
+import io
+import os
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, JsonResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.module_loading import import_string
+from django.views.generic import View
+
+from django_ratelimit.decorators import ratelimit
+
+from .bundles import load_document_bundle
+from .conditional import ConditionalDocumentMixin
+from .docx_render import DOCX_CONTENT_TYPE, docx_template_path, render_docx
+from .pdf import PDF_CACHE_VERSION, pdf_cache_path, pdf_response, render_merged_pdf, render_pdf, template_version
+from .pdf_admission import PdfAdmissionMixin
+from .pdf_archive import archive_response, archived_pdf, is_finalized
+from .pdf_styles import file_version, stylesheet_path
+from .pdf_jobs import DONE, job_file_exists, job_status, pdf_jobs_enabled, submit_pdf_job
+
+
+class DocumentPdfMixin(PdfAdmissionMixin, ConditionalDocumentMixin):
+    """
+    PDF download view: the document comes from load_document_bundle()
+    - bundle_kind / pdf_url_kwarg pick the document, pdf_filename is formatted with its id
+    - pdf_stylesheets are static names, parsed once per process (apps.common.pdf_styles)
+      instead of a <link> in the template fetched and parsed on every render
+    - get_pdf_context() and get_stylesheets() must not use self.request: with ?async=1
+      they run again in a PDF worker process, where there is no request
+    - ?async=1 answers 202 with a job id instead of the file, poll status_url then
+      fetch download_url (falls back to rendering inline when PDF_WORKERS = 0)
+    - finalized documents (pdf_archive.FINALIZED_STATUSES) are rendered once into the
+      PDF archive and served from there
+    - a browser that has the PDF already gets a 304 (apps.common.conditional)
+    - too many renders at once answer 503, a render over the deadline 504 (apps.common.pdf_admission)
+    - register each view with pdf_archive.register_pdf_views() in its app's ready()
+    """
+    bundle_kind = None
+    template_name = None
+    pdf_url_kwarg = None
+    pdf_filename = None
+    pdf_stylesheets = ()
+
+    def get_stylesheets(self):
+        return [stylesheet_path(name) for name in self.pdf_stylesheets]
+
+    def get_document_id(self):
+        return self.kwargs.get(self.pdf_url_kwarg)
+
+    def get_validators(self):
+        # The 202 of ?async=1 is a job, not the PDF
+        if self.request.GET.get('async') == '1':
+            return None
+        return super().get_validators()
+
+    def get_etag_parts(self):
+        return [PDF_CACHE_VERSION, template_version(self.template_name), [file_version(path) for path in self.get_stylesheets()]]
+
+    def get_pdf_context(self, bundle):
+        return {'bundle': bundle}
+
+    def get(self, request, *args, **kwargs):
+        document_id = kwargs.get(self.pdf_url_kwarg)
+        bundle = load_document_bundle(self.bundle_kind, document_id)
+        filename = self.pdf_filename.format(id=document_id)
+
+        if is_finalized(self.bundle_kind, bundle):
+            path = archived_pdf(self, bundle, document_id)
+            # A failed archive write is logged by write_atomic, render inline below
+            if os.path.exists(path):
+                return archive_response(request, path, filename)
+
+        if request.GET.get('async') == '1' and pdf_jobs_enabled():
+            job = submit_pdf_job(self, bundle, document_id, filename)
+            return JsonResponse(job_payload(job), status=202)
+
+        pdf = render_pdf(self.template_name, self.get_pdf_context(bundle), bundle, self.get_stylesheets())
+        return pdf_response(pdf, filename)
+
+
+class DealPackPdfMixin(PdfAdmissionMixin, ConditionalDocumentMixin):
+    """
+    "Deal pack" download: the quotation, invoice and PO of one chain in a single PDF
+    - bundle_kind / pdf_url_kwarg pick the document the chain is loaded from ('contract', 'po')
+    - pack_views are the PDF views of the parts, in page order, a part not created yet is left out
+    """
+    bundle_kind = None
+    pdf_url_kwarg = None
+    pdf_filename = 'deal_pack_{id}.pdf'
+    pack_views = (
+        'apps.app_quotations.views.GenerateQuotationPDF',
+        'apps.app_invoices.views.GenerateInvoicePDF',
+        'apps.app_po.views.GeneratePoPdfView',
+    )
+
+    def get_document_id(self):
+        return self.kwargs.get(self.pdf_url_kwarg)
+
+    def get_etag_parts(self):
+        views = [import_string(view_path)() for view_path in self.pack_views]
+        return [view.get_etag_parts() for view in views]
+
+    def get(self, request, *args, **kwargs):
+        document_id = kwargs.get(self.pdf_url_kwarg)
+        bundle = load_document_bundle(self.bundle_kind, document_id)
+
+        parts = []
+        for view_path in self.pack_views:
+            view = import_string(view_path)()
+            if bundle.document(view.bundle_kind) is not None:
+                parts.append((view.template_name, view.get_pdf_context(bundle), view.get_stylesheets()))
+
+        pdf = render_merged_pdf(bundle, parts)
+        return pdf_response(pdf, self.pdf_filename.format(id=document_id))
+
+
+class DocumentDocxMixin(ConditionalDocumentMixin):
+    """
+    Editable Word download of a document, filled from load_document_bundle()
+    - bundle_kind / docx_url_kwarg pick the document, docx_filename is formatted with its id
+    - docx_template is a .docx in a templates/ directory, with docxtpl (Jinja) tags,
+      parsed and compiled once per process (apps.common.docx_render)
+    """
+    bundle_kind = None
+    docx_url_kwarg = None
+    docx_template = None
+    docx_filename = None
+
+    def get_document_id(self):
+        return self.kwargs.get(self.docx_url_kwarg)
+
+    def get_etag_parts(self):
+        return [self.docx_template, file_version(docx_template_path(self.docx_template))]
+
+    def get_docx_context(self, bundle):
+        return {
+            'bundle': bundle,
+            'quotation': bundle.quotation,
+            'invoice': bundle.invoice,
+            'po': bundle.purchase_order,
+            'contract': bundle.contract,
+            'customer': bundle.customer,
+            'items': bundle.items,
+        }
+
+    def get(self, request, *args, **kwargs):
+        document_id = kwargs.get(self.docx_url_kwarg)
+        bundle = load_document_bundle(self.bundle_kind, document_id)
+        docx = render_docx(self.docx_template, self.get_docx_context(bundle))
+        return FileResponse(
+            io.BytesIO(docx),
+            as_attachment=True,
+            filename=self.docx_filename.format(id=document_id),
+            content_type=DOCX_CONTENT_TYPE,
+        )
+
+
+def job_payload(job):
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'error': job.get('error'),
+        'status_url': reverse('common:pdf_job_status', kwargs={'job_id': job['job_id']}),
+        'download_url': reverse('common:pdf_job_download', kwargs={'job_id': job['job_id']}),
+    }
+
+
+# Status of a PDF job started with ?async=1
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class PdfJobStatusView(LoginRequiredMixin, View):
+    login_url = 'users:login'
+
+    def get(self, request, *args, **kwargs):
+        job = job_status(kwargs['job_id'])
+        if job is None:
+            raise Http404('Unknown PDF job')
+        return JsonResponse(job_payload(job))
+
+
+# Download the PDF of a finished job
+@method_decorator(ratelimit(key='header:X-Forwarded-For', rate=settings.RATE_LIMIT, block=True), name='dispatch')
+class PdfJobDownloadView(LoginRequiredMixin, View):
+    login_url = 'users:login'
+
+    def get(self, request, *args, **kwargs):
+        job = job_status(kwargs['job_id'])
+        # The file is gone when the document was edited after the job ran, start a new job
+        if job is None or job['status'] != DONE or not job_file_exists(job):
+            raise Http404('PDF not ready')
+        return FileResponse(
+            open(pdf_cache_path(job['quotation_id'], job['fingerprint']), 'rb'),
+            as_attachment=True,
+            filename=job['filename'],
+            content_type='application/pdf',
+        )
@@ -2,23 +2,82 @@
 - This script replaces Django's built-in development server with a production-ready CherryPy web server.
 - It handles the deployment of a Django application in a production environment.
 - It gives the option to serve static files through CherryPy, or WhiteNoise. This template default to WhiteNoise.
+- `python3 cpserver.py` starts a small supervisor process: it opens the port and runs the CherryPy
+  server in a child process. A child that grows past SERVER_MAX_RSS_MB or serves SERVER_MAX_REQUESTS
+  requests asks for a replacement, the supervisor starts a new child on the same socket, then stops
+  the old one, which finishes its requests in flight before exiting (no downtime, bounded memory).
 '''
 
+import itertools
 import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 import cherrypy
 import django
-from django.core.wsgi import get_wsgi_application
-from whitenoise import WhiteNoise
 
-# tells where to find Django settings, load settings.py in the same dir
-os.environ["DJANGO_SETTINGS_MODULE"] = 'settings'
+# set in the child processes started by the supervisor, holds the supervisor pid
+SUPERVISOR_ENV = 'CPSERVER_SUPERVISOR'
 
-# initializes Django and loads the settings specified by DJANGO_SETTINGS_MODULE above
-django.setup()
 
-# Wrap WSGI application with Whitenoise for static file serving
-application = WhiteNoise(get_wsgi_application())
+def load_application():
+    from django.core.wsgi import get_wsgi_application
+    from whitenoise import WhiteNoise
+
+    # tells where to find Django settings, load settings.py in the same dir
+    os.environ["DJANGO_SETTINGS_MODULE"] = 'settings'
+
+    # initializes Django and loads the settings specified by DJANGO_SETTINGS_MODULE above
+    django.setup()
+    application = get_wsgi_application()
+
+    # parse the PDF stylesheets and load the fonts once per server process, not on the first download
+    from apps.common.pdf_styles import warm_pdf_assets
+    warm_pdf_assets()
+
+    # Wrap WSGI application with Whitenoise for static file serving
+    return WhiteNoise(application)
+
+
+class RecycleOnGrowth:
+    """
+    WSGI wrapper checking the memory of this process after each request
+    - over max_rss_mb, or after max_requests requests, it asks the supervisor for a
+      replacement once (SIGUSR1), the supervisor then stops this process gracefully
+    """
+    def __init__(self, application, max_rss_mb, max_requests):
+        self.application = application
+        self.max_rss_mb = max_rss_mb
+        self.max_requests = max_requests
+        self.requests = itertools.count(1)
+        self.retiring = False
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        try:
+            return self.application(environ, start_response)
+        finally:
+            self.check(next(self.requests))
+
+    def check(self, served):
+        from apps.common.memory import rss_mb
+
+        rss = rss_mb()
+        too_many = self.max_requests and served >= self.max_requests
+        too_big = self.max_rss_mb and rss and rss > self.max_rss_mb
+        if not (too_many or too_big):
+            return
+        with self.lock:
+            if self.retiring:
+                return
+            self.retiring = True
+        cherrypy.log(f"Recycling this server process: {served} requests, {rss or 0:.0f}MB")
+        os.kill(int(os.environ[SUPERVISOR_ENV]), signal.SIGUSR1)
+
 
 # run server using CherryPy as web server
 class DjangoApplication(object):
@@ -29,6 +88,17 @@ class DjangoApplication(object):
     PORT = 8000
 
     def run(self):
+        from django.conf import settings
+
+        application = load_application()
+        supervised = os.environ.get(SUPERVISOR_ENV)
+        if supervised:
+            application = RecycleOnGrowth(
+                application,
+                getattr(settings, 'SERVER_MAX_RSS_MB', 0),
+                getattr(settings, 'SERVER_MAX_REQUESTS', 0),
+            )
+
         # Configures CherryPy with host, port, SSL certificates, and logging
         cherrypy.config.update({
             'server.socket_host': self.HOST,
@@ -36,10 +106,12 @@ class DjangoApplication(object):
             'server.ssl_module': 'pyopenssl',
             'server.ssl_certificate': '/django-project/certs/cpserver_ssl.cert',
             'server.ssl_private_key': '/django-project/certs/cpserver_ssl.key',
+            'server.shutdown_timeout': getattr(settings, 'SERVER_DRAIN_TIMEOUT', 90),
             'engine.autoreload_on': True,
             'log.screen': True,
         })
         # pyopenssl: function of pyOpenSSL lib in requirement file
+        # server.shutdown_timeout: seconds a stopping server waits for the requests in flight
         # engine.autoreload_on: automatically reloads the server when code changes.
         # log.screen: display in text in console window
 
@@ -51,15 +123,115 @@ class DjangoApplication(object):
         # Mounts the Django application to CherryPy, allowing it to handle Django requests
         cherrypy.tree.graft(application)
 
+        # SIGTERM from the supervisor: stop accepting, finish the requests in flight, exit
+        cherrypy.engine.signal_handler.subscribe()
+        if supervised:
+            # The socket is shared with the supervisor, it never becomes free: stop the HTTP
+            # server without CherryPy's wait for the port to be released
+            cherrypy.engine.unsubscribe('stop', cherrypy.server.stop)
+            cherrypy.engine.subscribe('stop', lambda: cherrypy.server.httpserver.stop(), priority=25)
+
         # Starts the CherryPy server
         cherrypy.engine.start()
 
+        # Tell the supervisor this process is serving, it can stop the one being replaced
+        if supervised:
+            os.kill(int(supervised), signal.SIGUSR2)
+
         # Keeps the server running
         cherrypy.engine.block()
 
+
+class Supervisor:
+    """
+    Keeps one DjangoApplication child process serving, replaces it when it asks to (SIGUSR1)
+    - the listening socket is opened here and handed to every child as fd 3 (the systemd
+      socket activation protocol, supported by CherryPy), so the old and the new child
+      accept from the same socket while they overlap
+    - a child that dies is started again
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.current = None
+        self.replacement = None
+        self.draining = []
+        self.replace_requested = False
+        self.replacement_ready = False
+        self.stopping = False
+
+    def run(self):
+        self.listen()
+        signal.signal(signal.SIGUSR1, self.on_replace_request)
+        signal.signal(signal.SIGUSR2, self.on_ready)
+        signal.signal(signal.SIGTERM, self.on_stop)
+        signal.signal(signal.SIGINT, self.on_stop)
+
+        self.current = self.spawn()
+        while not self.stopping:
+            self.step()
+            time.sleep(0.5)
+
+        for child in [self.current, self.replacement, *self.draining]:
+            if child and child.poll() is None:
+                child.terminate()
+        for child in [self.current, self.replacement, *self.draining]:
+            if child:
+                child.wait()
+
+    def listen(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(socket.SOMAXCONN)
+        # CherryPy reads the activated socket from fd 3
+        if sock.fileno() != 3:
+            os.dup2(sock.fileno(), 3)
+            sock.close()
+        else:
+            self.socket = sock
+
+    def spawn(self):
+        env = dict(os.environ, **{SUPERVISOR_ENV: str(os.getpid()), 'LISTEN_PID': str(os.getpid()), 'LISTEN_FDS': '1'})
+        return subprocess.Popen([sys.executable, str(Path(__file__).resolve())], env=env, pass_fds=(3,))
+
+    def step(self):
+        if self.replace_requested and self.replacement is None:
+            self.replace_requested = False
+            self.replacement = self.spawn()
+
+        if self.replacement is not None:
+            if self.replacement_ready:
+                # The new child is serving, the old one drains and exits
+                self.draining.append(self.current)
+                self.current.terminate()
+                self.current, self.replacement = self.replacement, None
+                self.replacement_ready = False
+            elif self.replacement.poll() is not None:
+                print(f"cpserver: replacement exited with {self.replacement.returncode}", flush=True)
+                self.replacement = None
+
+        self.draining = [child for child in self.draining if child.poll() is None]
+        if self.current.poll() is not None:
+            print(f"cpserver: server process exited with {self.current.returncode}, starting a new one", flush=True)
+            time.sleep(1)
+            self.current = self.spawn()
+
+    def on_replace_request(self, signum, frame):
+        self.replace_requested = True
+
+    def on_ready(self, signum, frame):
+        self.replacement_ready = self.replacement is not None
+
+    def on_stop(self, signum, frame):
+        self.stopping = True
+
 # that the server starts only when the script is executed directly
 if __name__ == "__main__":
-    DjangoApplication().run()
+    if os.environ.get(SUPERVISOR_ENV):
+        DjangoApplication().run()
+    else:
+        Supervisor(DjangoApplication.HOST, DjangoApplication.PORT).run()
 
 '''
 you can also use cherrypy to server static files (param url: Relative url,
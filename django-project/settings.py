@@ -285,3 +285,56 @@ AXES_ADMIN_INTERFACE_ENABLED = True # enable the Django admin interface for mana
 # Use case: set to False when you are using other DDOS protection such as Web Application Firewall or cloudflare
 RATELIMIT_ENABLE = True
 RATE_LIMIT = '1000/5m' # 1000 requests within 5 minutes from single IP
+
+# Query budget guard for list views (apps.common.query_budget.QueryBudgetMixin)
+# when not set, it follows DEBUG: raise in development, disabled in production.
+# uncomment in production to log a warning when a view goes over its budget
+# QUERY_BUDGET_ENABLED = True
+
+# Rendered document PDFs (apps.common.pdf), keyed by a fingerprint of the document
+# keep it outside MEDIA_ROOT, media is served publicly
+PDF_CACHE_DIR = os.path.join(BASE_DIR, 'pdf_cache')
+# bump to drop every cached PDF after changing a logo or a CSS file used by the PDF templates
+PDF_CACHE_VERSION = '2'
+# bump after a deploy that changes the document detail pages, browsers then stop getting 304s for them
+# (apps.common.conditional)
+DOCUMENT_ETAG_VERSION = '1'
+
+# Immutable PDFs of finalized documents (apps.common.pdf_archive), re-rendered only from the admin
+# keep it outside MEDIA_ROOT too, downloads go through the login protected PDF views
+PDF_ARCHIVE_DIR = os.path.join(BASE_DIR, 'pdf_archive')
+# let the front web server send archived PDFs: None, 'x-accel-redirect' or 'x-sendfile'
+# for nginx: location /protected/pdf_archive/ { internal; alias <PDF_ARCHIVE_DIR>/; }
+PDF_SENDFILE = None
+PDF_ACCEL_PREFIX = '/protected/pdf_archive/'
+
+# Print sized, metadata free copies of the signatures, stamps and logos embedded in PDFs
+# (apps.common.pdf_images), built on upload, backfill with `manage.py build_pdf_images`
+PDF_IMAGE_DIR = os.path.join(BASE_DIR, 'pdf_images')
+PDF_IMAGE_MAX_PX = 1000
+
+# Worker processes for ?async=1 PDF downloads (apps.common.pdf_jobs), per server process
+# set to 0 to turn the async mode off, ?async=1 then renders inline; one worker is still started
+# for the PDF views, so PDF_RENDER_DEADLINE can stop a render
+PDF_WORKERS = 2
+# a PDF worker is replaced after this many renders, the pool once a worker is over this many MB
+PDF_WORKER_MAX_RENDERS = 200
+PDF_WORKER_MAX_RSS_MB = 400
+
+# cpserver.py replaces its server process once it uses more than SERVER_MAX_RSS_MB of memory or has
+# served SERVER_MAX_REQUESTS requests (0 turns either off), the old process gets SERVER_DRAIN_TIMEOUT
+# seconds to finish its requests
+SERVER_MAX_RSS_MB = 600
+SERVER_MAX_REQUESTS = 20000
+SERVER_DRAIN_TIMEOUT = 90
+
+# Limits of the PDF views (apps.common.pdf_admission), per server process:
+# renders at once, seconds waiting for a slot before a 503, seconds a render may take before a 504
+PDF_MAX_RENDERS = 2
+PDF_QUEUE_TIMEOUT = 10
+PDF_RENDER_DEADLINE = 60
+
+# Document numbers (apps.common.numbering) come from PostgreSQL sequences, from the counter rows on SQLite
+# series listed here restart every year and carry the year (QUO2026-0000001), the others run on forever
+# choices: 'quotation', 'invoice', 'po', 'contract', 'customer'
+DOCUMENT_NUMBER_YEARLY = []
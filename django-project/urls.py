@@ -23,6 +23,7 @@ urlpatterns = [
     path('app_invoices/', include('apps.app_invoices.urls', namespace='app_invoices')),
     path('app_po/', include('apps.app_po.urls', namespace='app_po')),
     path('app_contracts/', include('apps.app_contracts.urls', namespace='app_contracts')),
+    path('common/', include('apps.common.urls', namespace='common')),
 ]
 
 # Static and Media files handling